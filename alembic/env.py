@@ -11,6 +11,8 @@ from app.domain.models.school import School
 from app.domain.models.student import Student
 from app.domain.models.invoice import Invoice
 from app.domain.models.payment import Payment
+from app.domain.models.student_balance import StudentBalance
+from app.domain.models.school_balance import SchoolBalance
 
 # Importar configuración
 from app.infrastructure.config.settings import settings
@@ -0,0 +1,48 @@
+"""student balances ledger
+
+Revision ID: 8e72bedd6cf0
+Revises: a62ff7229d0d
+Create Date: 2026-10-17 11:29:38.033709-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e72bedd6cf0'
+down_revision: Union[str, None] = 'a62ff7229d0d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('student_balances',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('total_invoiced', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'),
+        sa.Column('total_paid', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id')
+    )
+
+    # Cargar saldos iniciales desde facturas y pagos existentes
+    op.execute("""
+        INSERT INTO student_balances (student_id, total_invoiced, total_paid)
+        SELECT
+            i.student_id,
+            SUM(i.amount),
+            SUM(COALESCE((
+                SELECT SUM(p.amount) FROM payments p
+                WHERE p.invoice_id = i.id AND p.is_confirmed
+            ), 0))
+        FROM invoices i
+        WHERE i.status <> 'CANCELLED'
+        GROUP BY i.student_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('student_balances')
@@ -0,0 +1,110 @@
+"""initial schema
+
+Revision ID: a62ff7229d0d
+Revises: 
+Create Date: 2026-10-17 11:29:29.479404-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a62ff7229d0d'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    upgrade_from_base()
+
+
+def upgrade_from_base() -> None:
+    """Create all tables from scratch - useful for first migration"""
+    # Schools table
+    op.create_table('schools',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.text('true')),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_schools_email'), 'schools', ['email'], unique=True)
+    op.create_index(op.f('ix_schools_id'), 'schools', ['id'], unique=False)
+    op.create_index(op.f('ix_schools_name'), 'schools', ['name'], unique=False)
+
+    # Students table
+    op.create_table('students',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('student_id', sa.String(length=50), nullable=False),
+        sa.Column('enrollment_date', sa.Date(), nullable=False),
+        sa.Column('birth_date', sa.Date(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.text('true')),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_students_email'), 'students', ['email'], unique=True)
+    op.create_index(op.f('ix_students_id'), 'students', ['id'], unique=False)
+    op.create_index(op.f('ix_students_student_id'), 'students', ['student_id'], unique=True)
+
+    # Invoices table
+    op.create_table('invoices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('invoice_number', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('issue_date', sa.Date(), nullable=False, server_default=sa.text('CURRENT_DATE')),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('paid_date', sa.Date(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'PAID', 'OVERDUE', 'CANCELLED', name='invoicestatus'), nullable=False, server_default='PENDING'),
+        sa.Column('invoice_type', sa.Enum('TUITION', 'REGISTRATION', 'MATERIALS', 'TRANSPORT', 'FOOD', 'EXTRA', name='invoicetype'), nullable=False, server_default='TUITION'),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_invoices_id'), 'invoices', ['id'], unique=False)
+    op.create_index(op.f('ix_invoices_invoice_number'), 'invoices', ['invoice_number'], unique=True)
+    op.create_index(op.f('ix_invoices_status'), 'invoices', ['status'], unique=False)
+
+    # Payments table
+    op.create_table('payments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('payment_date', sa.Date(), nullable=False),
+        sa.Column('payment_method', sa.Enum('CASH', 'CREDIT_CARD', 'DEBIT_CARD', 'BANK_TRANSFER', 'CHECK', name='paymentmethod'), nullable=False),
+        sa.Column('reference_number', sa.String(length=100), nullable=True),
+        sa.Column('notes', sa.String(length=500), nullable=True),
+        sa.Column('is_confirmed', sa.Boolean(), nullable=False, server_default=sa.text('true')),
+        sa.Column('invoice_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payments_id'), 'payments', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('payments')
+    op.drop_table('invoices')
+    op.drop_table('students')
+    op.drop_table('schools')
+    sa.Enum(name='paymentmethod').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='invoicetype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='invoicestatus').drop(op.get_bind(), checkfirst=True)
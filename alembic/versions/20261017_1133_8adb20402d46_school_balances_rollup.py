@@ -0,0 +1,83 @@
+"""school balances rollup
+
+Revision ID: 8adb20402d46
+Revises: 8e72bedd6cf0
+Create Date: 2026-10-17 11:33:05.744181-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8adb20402d46'
+down_revision: Union[str, None] = '8e72bedd6cf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('school_balances',
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('total_students', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('active_students', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_invoiced', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('total_paid', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('overdue_amount', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('overdue_as_of', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('school_id')
+    )
+
+    # Cargar el resumen inicial desde estudiantes, facturas y pagos existentes
+    op.execute("""
+        WITH paid AS (
+            SELECT invoice_id, SUM(amount) AS paid
+            FROM payments
+            WHERE is_confirmed
+            GROUP BY invoice_id
+        ),
+        students_totals AS (
+            SELECT
+                school_id,
+                COUNT(*) AS total_students,
+                COUNT(*) FILTER (WHERE is_active) AS active_students
+            FROM students
+            GROUP BY school_id
+        ),
+        invoice_totals AS (
+            SELECT
+                s.school_id,
+                SUM(i.amount) AS total_invoiced,
+                SUM(COALESCE(p.paid, 0)) AS total_paid,
+                SUM(CASE WHEN i.status IN ('PENDING', 'OVERDUE') AND i.due_date < CURRENT_DATE
+                         THEN i.amount - COALESCE(p.paid, 0) ELSE 0 END) AS overdue_amount
+            FROM invoices i
+            JOIN students s ON s.id = i.student_id
+            LEFT JOIN paid p ON p.invoice_id = i.id
+            WHERE i.status <> 'CANCELLED'
+            GROUP BY s.school_id
+        )
+        INSERT INTO school_balances (
+            school_id, total_students, active_students, total_invoiced,
+            total_paid, overdue_amount, overdue_as_of
+        )
+        SELECT
+            sc.id,
+            COALESCE(st.total_students, 0),
+            COALESCE(st.active_students, 0),
+            COALESCE(it.total_invoiced, 0),
+            COALESCE(it.total_paid, 0),
+            COALESCE(it.overdue_amount, 0),
+            now()
+        FROM schools sc
+        LEFT JOIN students_totals st ON st.school_id = sc.id
+        LEFT JOIN invoice_totals it ON it.school_id = sc.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('school_balances')
@@ -0,0 +1,37 @@
+"""invoice number sequence
+
+Revision ID: 0654b9edf75c
+Revises: 8adb20402d46
+Create Date: 2026-10-17 11:34:09.568163-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0654b9edf75c'
+down_revision: Union[str, None] = '8adb20402d46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CACHE: cada conexión reserva un bloque de números, sin contención en cargas masivas
+    op.execute("CREATE SEQUENCE invoice_number_seq CACHE 50")
+    op.execute("""
+        CREATE FUNCTION next_invoice_number() RETURNS varchar
+        LANGUAGE sql VOLATILE AS $$
+            SELECT 'INV-' || to_char(CURRENT_DATE, 'YYYYMMDD') || '-' || lpad(n::text, greatest(8, length(n::text)), '0')
+            FROM nextval('invoice_number_seq') AS n
+        $$
+    """)
+    op.alter_column('invoices', 'invoice_number', server_default=sa.text('next_invoice_number()'))
+
+
+def downgrade() -> None:
+    op.alter_column('invoices', 'invoice_number', server_default=None)
+    op.execute("DROP FUNCTION next_invoice_number()")
+    op.execute("DROP SEQUENCE invoice_number_seq")
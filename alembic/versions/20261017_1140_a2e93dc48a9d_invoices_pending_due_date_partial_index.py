@@ -0,0 +1,30 @@
+"""invoices pending due date partial index
+
+Revision ID: a2e93dc48a9d
+Revises: 0654b9edf75c
+Create Date: 2026-10-17 11:40:39.139029-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2e93dc48a9d'
+down_revision: Union[str, None] = '0654b9edf75c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Solo facturas pendientes: el barrido de vencidas recorre únicamente las que aún no se marcaron
+    op.create_index(
+        'ix_invoices_pending_due_date', 'invoices', ['due_date', 'id'],
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoices_pending_due_date', table_name='invoices')
@@ -0,0 +1,57 @@
+"""workload composite indexes
+
+Revision ID: be5f33d0419a
+Revises: a2e93dc48a9d
+Create Date: 2026-10-17 11:42:37.093963-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'be5f33d0419a'
+down_revision: Union[str, None] = 'a2e93dc48a9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nombre, tabla, columnas, opciones) según los filtros y claves de orden de los repositorios
+INDEXES = [
+    # Facturas por estudiante, más recientes primero (estado de cuenta, listados)
+    ('ix_invoices_student_created', 'invoices', [sa.text('student_id'), sa.text('created_at DESC'), sa.text('id DESC')], {}),
+    # Listado general y por colegio ordenados por fecha de creación
+    ('ix_invoices_created', 'invoices', ['created_at', 'id'], {}),
+    ('ix_invoices_status_created', 'invoices', ['status', 'created_at', 'id'], {}),
+    # Facturas abiertas por vencimiento (listado de vencidas)
+    ('ix_invoices_open_due_date', 'invoices', ['due_date', 'id'],
+     {'postgresql_where': sa.text("status IN ('PENDING', 'OVERDUE')")}),
+    ('ix_invoices_issue_date', 'invoices', ['issue_date', 'id'], {}),
+    # Total pagado por factura (paid_amount, saldo restante): index-only scan
+    ('ix_payments_invoice_confirmed', 'payments', ['invoice_id'],
+     {'postgresql_where': sa.text('is_confirmed'), 'postgresql_include': ['amount']}),
+    # Pagos de una factura (y borrado en cascada desde invoices)
+    ('ix_payments_invoice_date', 'payments', ['invoice_id', 'payment_date'], {}),
+    ('ix_payments_created', 'payments', ['created_at', 'id'], {}),
+    ('ix_payments_payment_date', 'payments', ['payment_date', 'id'], {}),
+    ('ix_payments_method_date', 'payments', ['payment_method', 'payment_date', 'id'], {}),
+    # Estudiantes de un colegio por nombre (listado, búsqueda y conteo de activos)
+    ('ix_students_school_active_name', 'students', ['school_id', 'is_active', 'first_name', 'last_name', 'id'], {}),
+    ('ix_students_created', 'students', ['created_at', 'id'], {}),
+    ('ix_schools_created', 'schools', ['created_at', 'id'], {}),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **options)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,60 @@
+"""name search indexes
+
+Revision ID: 052348836452
+Revises: be5f33d0419a
+Create Date: 2026-10-17 11:47:56.124210-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '052348836452'
+down_revision: Union[str, None] = 'be5f33d0419a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Sin acentos ni mayúsculas; translate() en lugar de la extensión unaccent para
+# que la función sea IMMUTABLE y pueda usarse en un índice
+NORMALIZE_SQL = """
+    CREATE OR REPLACE FUNCTION search_normalize(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS $$
+        SELECT lower(translate(value,
+            'ÁÀÂÄÃÅÉÈÊËÍÌÎÏÓÒÔÖÕÚÙÛÜÑÇáàâäãåéèêëíìîïóòôöõúùûüñç',
+            'AAAAAAEEEEIIIIOOOOOUUUUNCaaaaaaeeeeiiiiooooouuuunc'))
+    $$
+"""
+
+VECTOR_SQL = """
+    CREATE OR REPLACE FUNCTION search_vector(value text) RETURNS tsvector
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS $$
+        SELECT to_tsvector('simple'::regconfig, search_normalize(value))
+    $$
+"""
+
+INDEXES = [
+    ('ix_students_search', 'students', [sa.text("search_vector(first_name || ' ' || last_name)")]),
+    ('ix_schools_search', 'schools', [sa.text('search_vector(name)')]),
+]
+
+
+def upgrade() -> None:
+    op.execute(NORMALIZE_SQL)
+    op.execute(VECTOR_SQL)
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_using='gin',
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.execute("DROP FUNCTION IF EXISTS search_vector(text)")
+    op.execute("DROP FUNCTION IF EXISTS search_normalize(text)")
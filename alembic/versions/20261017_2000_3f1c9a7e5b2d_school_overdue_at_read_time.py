@@ -0,0 +1,34 @@
+"""school overdue at read time
+
+Revision ID: 3f1c9a7e5b2d
+Revises: 052348836452
+Create Date: 2026-10-17 20:00:00.000000-06:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e5b2d'
+down_revision: Union[str, None] = '052348836452'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lo vencido de estudiantes y colegios se suma al leer, sobre las facturas abiertas de cada estudiante
+    op.create_index(
+        'ix_invoices_student_open_due', 'invoices', ['student_id', 'due_date'],
+        postgresql_where=sa.text("status IN ('PENDING', 'OVERDUE')")
+    )
+    op.drop_column('school_balances', 'overdue_as_of')
+    op.drop_column('school_balances', 'overdue_amount')
+
+
+def downgrade() -> None:
+    op.add_column('school_balances', sa.Column('overdue_amount', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'))
+    op.add_column('school_balances', sa.Column('overdue_as_of', sa.DateTime(timezone=True), nullable=True))
+    op.drop_index('ix_invoices_student_open_due', table_name='invoices')
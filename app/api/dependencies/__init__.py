@@ -1,11 +1,14 @@
-from .invoice_dependency import get_invoice_service
+from .invoice_dependency import get_invoice_service, account_statement_cache
 from .payment_dependency import get_payment_service
 from .student_dependency import get_student_service
 from .school_dependency import get_school_service
+from .snapshot_dependency import get_snapshot_service
 
 __all__ = [
     "get_invoice_service",
+    "account_statement_cache",
     "get_payment_service",
     "get_student_service",
-    "get_school_service"
+    "get_school_service",
+    "get_snapshot_service"
 ]
\ No newline at end of file
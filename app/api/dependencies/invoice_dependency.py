@@ -1,13 +1,44 @@
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
+from app.domain.repositories.account_statement_cache import CachedStatement
 from app.domain.services.invoice_service import InvoiceService
-from app.infrastructure.database.database import get_db
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.database import AsyncSessionLocal, get_db
 from app.infrastructure.repositories.invoice_repository import SQLAlchemyInvoiceRepository
 from app.infrastructure.repositories.student_repository import SQLAlchemyStudentRepository
+from app.infrastructure.repositories.school_repository import SQLAlchemySchoolRepository
+from app.infrastructure.repositories.student_balance_repository import SQLAlchemyStudentBalanceRepository
+from app.infrastructure.repositories.school_balance_repository import SQLAlchemySchoolBalanceRepository
+from app.infrastructure.repositories.account_statement_cache import InMemoryAccountStatementCache
+from app.infrastructure.repositories.unit_of_work import SQLAlchemyUnitOfWork
+
+
+async def revalidate_account_statement(key: tuple, cached_version: str) -> Optional[CachedStatement]:
+    # Revalidación en segundo plano: sesión propia, independiente del request que la disparó
+    async with AsyncSessionLocal() as session:
+        service = await get_invoice_service(session)
+        return await service.revalidate_account_statement(key, cached_version)
+
+
+# Instancia del proceso, compartida por los servicios de facturas y pagos
+account_statement_cache = InMemoryAccountStatementCache(
+    ttl=settings.ACCOUNT_STATEMENT_CACHE_TTL_SECONDS,
+    stale_ttl=settings.ACCOUNT_STATEMENT_CACHE_STALE_SECONDS,
+    max_entries=settings.ACCOUNT_STATEMENT_CACHE_MAX_ENTRIES,
+    revalidate=revalidate_account_statement
+)
 
 
 async def get_invoice_service(db: AsyncSession = Depends(get_db)) -> InvoiceService:
     invoice_repo = SQLAlchemyInvoiceRepository(db)
     student_repo = SQLAlchemyStudentRepository(db)
-    return InvoiceService(invoice_repo, student_repo)
\ No newline at end of file
+    school_repo = SQLAlchemySchoolRepository(db)
+    balance_repo = SQLAlchemyStudentBalanceRepository(db)
+    school_balance_repo = SQLAlchemySchoolBalanceRepository(db)
+    uow = SQLAlchemyUnitOfWork(db)
+    return InvoiceService(
+        invoice_repo, student_repo, school_repo, balance_repo, school_balance_repo, account_statement_cache, uow
+    )
\ No newline at end of file
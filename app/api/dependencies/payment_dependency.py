@@ -1,13 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.params import Depends
 
+from app.api.dependencies.invoice_dependency import account_statement_cache
 from app.domain.services.payment_service import PaymentService
 from app.infrastructure.database.database import get_db
 from app.infrastructure.repositories.invoice_repository import SQLAlchemyInvoiceRepository
 from app.infrastructure.repositories.payment_repository import SQLAlchemyPaymentRepository
+from app.infrastructure.repositories.student_balance_repository import SQLAlchemyStudentBalanceRepository
+from app.infrastructure.repositories.unit_of_work import SQLAlchemyUnitOfWork
 
 
 async def get_payment_service(db: AsyncSession = Depends(get_db)) -> PaymentService:
     payment_repo = SQLAlchemyPaymentRepository(db)
     invoice_repo = SQLAlchemyInvoiceRepository(db)
-    return PaymentService(payment_repo, invoice_repo)
\ No newline at end of file
+    balance_repo = SQLAlchemyStudentBalanceRepository(db)
+    uow = SQLAlchemyUnitOfWork(db)
+    return PaymentService(payment_repo, invoice_repo, balance_repo, account_statement_cache, uow)
\ No newline at end of file
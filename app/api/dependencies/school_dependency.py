@@ -4,9 +4,11 @@ from fastapi.params import Depends
 from app.domain.services.school_service import SchoolService
 from app.infrastructure.database.database import get_db
 from app.infrastructure.repositories.school_repository import SQLAlchemySchoolRepository
+from app.infrastructure.repositories.unit_of_work import SQLAlchemyUnitOfWork
 
 
 
 async def get_school_service(db: AsyncSession = Depends(get_db)) -> SchoolService:
     school_repo = SQLAlchemySchoolRepository(db)
-    return SchoolService(school_repo)
\ No newline at end of file
+    uow = SQLAlchemyUnitOfWork(db)
+    return SchoolService(school_repo, uow)
\ No newline at end of file
@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends
+
+from app.domain.services.snapshot_service import SnapshotService
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.database import get_db
+from app.infrastructure.repositories.snapshot_repository import SQLAlchemySnapshotRepository
+
+
+async def get_snapshot_service(db: AsyncSession = Depends(get_db)) -> SnapshotService:
+    # Sin destino en disco: el endpoint solo transmite lotes (los archivos los escribe la CLI)
+    return SnapshotService(SQLAlchemySnapshotRepository(db), lag_seconds=settings.SNAPSHOT_LAG_SECONDS)
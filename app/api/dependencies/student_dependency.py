@@ -5,9 +5,14 @@ from app.domain.services.student_service import StudentService
 from app.infrastructure.database.database import get_db
 from app.infrastructure.repositories.school_repository import SQLAlchemySchoolRepository
 from app.infrastructure.repositories.student_repository import SQLAlchemyStudentRepository
+from app.infrastructure.repositories.school_balance_repository import SQLAlchemySchoolBalanceRepository
+from app.infrastructure.repositories.student_lookup_index import student_lookup_index
+from app.infrastructure.repositories.unit_of_work import SQLAlchemyUnitOfWork
 
 
 async def get_student_service(db: AsyncSession = Depends(get_db)) -> StudentService:
     student_repo = SQLAlchemyStudentRepository(db)
     school_repo = SQLAlchemySchoolRepository(db)
-    return StudentService(student_repo, school_repo)
\ No newline at end of file
+    school_balance_repo = SQLAlchemySchoolBalanceRepository(db)
+    uow = SQLAlchemyUnitOfWork(db)
+    return StudentService(student_repo, school_repo, school_balance_repo, student_lookup_index, uow)
\ No newline at end of file
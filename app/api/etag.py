@@ -0,0 +1,40 @@
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag fuerte: hash de las versiones que determinan el cuerpo de la respuesta"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def row_version(row: Any) -> str:
+    """Versión de una fila: id y updated_at (lo derivado de otras tablas se agrega aparte)"""
+    return f"{row.id}@{row.updated_at.isoformat()}"
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def is_conditional(request: Request) -> bool:
+    """El cliente envió If-None-Match: solo entonces conviene sondear la versión antes de leer"""
+    return "if-none-match" in request.headers
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Publicar el ETag y devolver 304 si el cliente ya tiene esta versión.
+
+    Uso: ``return not_modified(request, response, etag) or cuerpo``; con 304 no
+    se serializa nada y se conservan las cabeceras ya fijadas (p. ej. X-Next-Cursor).
+    """
+    response.headers[ETAG_HEADER] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
@@ -0,0 +1,61 @@
+"""Métricas HTTP por ruta: histograma de latencias y requests en curso.
+
+La etiqueta ``route`` es la plantilla de la ruta (``/api/v1/invoices/{invoice_id}``),
+no el path con ids, para que la cantidad de series no crezca con los datos;
+los paths que no corresponden a ninguna ruta se agrupan en ``unmatched``.
+"""
+import time
+
+from starlette.routing import Match
+
+from app.infrastructure.metrics import gauge, histogram
+
+HTTP_REQUEST_DURATION = histogram(
+    "http_request_duration_seconds", "Latencia de los requests HTTP hasta enviar la respuesta completa",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_PROGRESS = gauge(
+    "http_requests_in_progress", "Requests HTTP en curso", ("method", "route"),
+)
+
+
+def route_template(scope) -> str:
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            # Misma ruta con otro método (405)
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro; se registra por fuera de los demás para medir el request completo"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], route_template(scope)
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(method, route, status).observe(time.perf_counter() - started)
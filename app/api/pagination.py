@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import Query, Response
+
+from app.domain.repositories.pagination import Page
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CursorQuery = Query(
+    None,
+    description=(
+        "Opaque keyset cursor taken from the X-Next-Cursor header of the previous page. "
+        "When present, skip is ignored."
+    ),
+)
+
+
+def set_next_cursor(response: Response, page: Page) -> Page:
+    """Publicar el cursor de la siguiente página en la cabecera de la respuesta"""
+    next_cursor: Optional[str] = getattr(page, "next_cursor", None)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return page
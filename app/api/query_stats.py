@@ -0,0 +1,79 @@
+"""Sentencias SQL y tiempo de BD por request: cabeceras, log y presupuestos por ruta.
+
+``QueryStatsMiddleware`` instrumenta cada request (``track_queries``), publica
+``X-DB-Queries`` y ``Server-Timing: db;dur=...`` (lo ejecutado hasta que empieza
+la respuesta) y al terminar registra un log con los totales. Las rutas declaran
+su presupuesto con ``dependencies=[Depends(query_budget(n))]``; con
+``QUERY_STATS_STRICT`` (pruebas) exceder el presupuesto o repetir una sentencia
+más de ``QUERY_REPEAT_THRESHOLD`` veces hace fallar el request, sin él solo se
+registra un warning.
+"""
+import logging
+
+from fastapi import Request
+
+from app.api.etag import is_conditional
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.query_stats import current_query_stats, track_queries
+
+logger = logging.getLogger(__name__)
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+def query_budget(max_queries: int, version_probe: bool = False):
+    """Dependencia que declara cuántas sentencias puede ejecutar una ruta.
+
+    ``version_probe`` marca los listados que, si llega ``If-None-Match``, sondean
+    la versión de la página antes de leerla: solo esos requests tienen una
+    sentencia más de presupuesto.
+    """
+
+    async def declare_query_budget(request: Request) -> None:
+        stats = current_query_stats()
+        if stats is not None:
+            stats.budget = max_queries + (1 if version_probe and is_conditional(request) else 0)
+
+    return declare_query_budget
+
+
+class QueryStatsMiddleware:
+    """Middleware ASGI puro: el contexto del request es el mismo que el de los endpoints"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+                           strict=settings.QUERY_STATS_STRICT) as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start" and settings.QUERY_STATS_HEADERS:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (DB_QUERIES_HEADER.lower().encode(), str(stats.count).encode()),
+                        (SERVER_TIMING_HEADER.lower().encode(),
+                         f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"'.encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                self._log(scope, stats)
+
+    @staticmethod
+    def _log(scope, stats) -> None:
+        fields = {"method": scope["method"], "path": scope["path"],
+                  "db_queries": stats.count, "db_time_ms": round(stats.duration_ms, 1)}
+        problems = stats.problems()
+        if problems:
+            logger.warning("%s %s: %s", scope["method"], scope["path"], "; ".join(problems),
+                           extra={**fields, "db_budget": stats.budget})
+        else:
+            logger.debug("%s %s: %d queries, %.1f ms in the database", scope["method"], scope["path"],
+                         stats.count, stats.duration_ms, extra=fields)
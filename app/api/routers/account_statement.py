@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.routers.invoice import get_invoice_service
+from app.api.dependencies.invoice_dependency import account_statement_cache
+from app.api.etag import make_etag, not_modified
+from app.api.serialization import fast_json
+from app.api.query_stats import query_budget
+from app.api.schemas.account_statement import StudentAccountStatement, SchoolAccountStatement
 from app.infrastructure.database.database import get_db
 from app.domain.services.invoice_service import InvoiceService
 from app.infrastructure.repositories.invoice_repository import SQLAlchemyInvoiceRepository
@@ -14,9 +19,17 @@ router = APIRouter(prefix="/account-statements", tags=["account-statements"])
 #     student_repo = SQLAlchemyStudentRepository(db)
 #     return InvoiceService(invoice_repo, student_repo)
 
-@router.get("/student/{student_id}")
+@router.get("/cache/stats")
+async def get_account_statement_cache_stats():
+    """Contadores de la caché de estados de cuenta de este proceso (aciertos, fallos, desalojos)"""
+    return account_statement_cache.stats()
+
+@router.get("/student/{student_id}", response_model=StudentAccountStatement,
+            dependencies=[Depends(query_budget(5))])
 async def get_student_account_statement(
     student_id: int,
+    request: Request,
+    response: Response,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """
@@ -28,16 +41,23 @@ async def get_student_account_statement(
     - Saldo pendiente
     - Facturas vencidas
     - Lista de facturas
+
+    Responde 304 si la versión del estado (sonda barata sobre updated_at) coincide con If-None-Match;
+    con una entrada vigente en la caché no se consulta la base de datos.
     """
     try:
-        statement = await service.get_student_account_statement(student_id)
-        return statement
+        statement, version = await service.get_student_account_statement(student_id)
+        etag = make_etag("student-statement", version)
+        return not_modified(request, response, etag) or fast_json(response, StudentAccountStatement, statement)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-@router.get("/school/{school_id}")
+@router.get("/school/{school_id}", response_model=SchoolAccountStatement,
+            dependencies=[Depends(query_budget(3))])
 async def get_school_account_statement(
     school_id: int,
+    request: Request,
+    response: Response,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """
@@ -50,9 +70,13 @@ async def get_school_account_statement(
     - Saldo pendiente
     - Facturas vencidas
     - Facturas recientes
+
+    Responde 304 si la versión del estado (sonda barata sobre updated_at) coincide con If-None-Match;
+    con una entrada vigente en la caché no se consulta la base de datos.
     """
     try:
-        statement = await service.get_school_account_statement(school_id)
-        return statement
+        statement, version = await service.get_school_account_statement(school_id)
+        etag = make_etag("school-statement", version)
+        return not_modified(request, response, etag) or fast_json(response, SchoolAccountStatement, statement)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
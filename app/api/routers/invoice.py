@@ -1,15 +1,20 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 
 from app.api.dependencies.invoice_dependency import get_invoice_service
-from app.infrastructure.database.database import get_db
+from app.infrastructure.database.database import get_db, get_stream_db
 from app.domain.services.invoice_service import InvoiceService
 from app.infrastructure.repositories.invoice_repository import SQLAlchemyInvoiceRepository
 from app.infrastructure.repositories.student_repository import SQLAlchemyStudentRepository
 from app.domain.models.invoice import InvoiceStatus
-from app.api.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from app.api.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse, BillingRunRequest, BillingRunResponse
+from app.api.pagination import CursorQuery, set_next_cursor
+from app.api.etag import is_conditional, make_etag, not_modified, row_version
+from app.api.serialization import fast_json
+from app.api.query_stats import query_budget
+from app.api.export import ExportFormat, export_response
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
@@ -18,6 +23,10 @@ router = APIRouter(prefix="/invoices", tags=["invoices"])
 #     student_repo = SQLAlchemyStudentRepository(db)
 #     return InvoiceService(invoice_repo, student_repo)
 
+def invoice_etag(*invoices) -> str:
+    # paid_amount sale de los pagos y is_overdue de la fecha: ambos forman parte de la versión
+    return make_etag("invoices", date.today(), *(f"{row_version(i)}:{i.paid_amount}" for i in invoices))
+
 @router.post("/", response_model=InvoiceResponse, status_code=201)
 async def create_invoice(
     invoice_data: InvoiceCreate,
@@ -30,89 +39,168 @@ async def create_invoice(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/billing-run", response_model=BillingRunResponse)
+async def run_billing(
+    billing: BillingRunRequest,
+    service: InvoiceService = Depends(get_invoice_service)
+):
+    """Facturar a todos los estudiantes activos de una escuela"""
+    try:
+        return await service.run_billing(billing)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/export")
+async def export_invoices(
+    school_id: int = Query(..., gt=0),
+    date_from: Optional[date] = Query(None, description="Issue date from (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Issue date to (inclusive)"),
+    status: Optional[InvoiceStatus] = Query(None),
+    format: ExportFormat = Query(ExportFormat.CSV),
+    db: AsyncSession = Depends(get_stream_db)
+):
+    """Exportar las facturas de una escuela en CSV o NDJSON, en streaming desde un cursor del servidor"""
+    service = await get_invoice_service(db)
+    try:
+        rows = service.export_invoices(school_id, date_from=date_from, date_to=date_to, status=status)
+    except ValueError as e:
+        await db.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    return export_response(rows, format, f"invoices-school-{school_id}", db)
+
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 async def get_invoice(
     invoice_id: int,
+    request: Request,
+    response: Response,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """Obtener factura por ID"""
     invoice = await service.get_invoice_by_id(invoice_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    return invoice
+    return not_modified(request, response, invoice_etag(invoice)) or invoice
 
 @router.get("/by-number/{invoice_number}", response_model=InvoiceResponse)
 async def get_invoice_by_number(
     invoice_number: str,
+    request: Request,
+    response: Response,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """Obtener factura por número"""
     invoice = await service.get_invoice_by_number(invoice_number)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    return invoice
+    return not_modified(request, response, invoice_etag(invoice)) or invoice
 
-@router.get("/", response_model=List[InvoiceResponse])
+@router.get("/", response_model=List[InvoiceResponse],
+            dependencies=[Depends(query_budget(1, version_probe=True))])
 async def get_invoices(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """Listar facturas con paginación"""
-    invoices = await service.get_all_invoices(skip=skip, limit=limit)
-    return invoices
+    # Con If-None-Match primero la sonda de versión: si el cliente ya tiene la página se responde 304 sin leerla
+    if is_conditional(request):
+        rows = await service.get_all_invoices_version(skip=skip, limit=limit, cursor=cursor)
+        cached = not_modified(request, response, invoice_etag(*rows))
+        if cached:
+            return cached
+    invoices = set_next_cursor(response, await service.get_all_invoices(skip=skip, limit=limit, cursor=cursor))
+    return not_modified(request, response, invoice_etag(*invoices)) or fast_json(response, InvoiceResponse, invoices)
 
-@router.get("/student/{student_id}", response_model=List[InvoiceResponse])
+@router.get("/student/{student_id}", response_model=List[InvoiceResponse],
+            dependencies=[Depends(query_budget(3, version_probe=True))])
 async def get_invoices_by_student(
     student_id: int,
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """Obtener facturas por estudiante"""
     try:
-        invoices = await service.get_invoices_by_student(
-            student_id, skip=skip, limit=limit
-        )
-        return invoices
+        if is_conditional(request):
+            rows = await service.get_invoices_by_student_version(student_id, skip=skip, limit=limit, cursor=cursor)
+            cached = not_modified(request, response, invoice_etag(*rows))
+            if cached:
+                return cached
+        invoices = set_next_cursor(response, await service.get_invoices_by_student(
+            student_id, skip=skip, limit=limit, cursor=cursor
+        ))
+        return not_modified(request, response, invoice_etag(*invoices)) or fast_json(response, InvoiceResponse, invoices)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-@router.get("/school/{school_id}", response_model=List[InvoiceResponse])
+@router.get("/school/{school_id}", response_model=List[InvoiceResponse],
+            dependencies=[Depends(query_budget(1, version_probe=True))])
 async def get_invoices_by_school(
     school_id: int,
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """Obtener facturas por escuela"""
-    invoices = await service.get_invoices_by_school(
-        school_id, skip=skip, limit=limit
-    )
-    return invoices
+    if is_conditional(request):
+        rows = await service.get_invoices_by_school_version(school_id, skip=skip, limit=limit, cursor=cursor)
+        cached = not_modified(request, response, invoice_etag(*rows))
+        if cached:
+            return cached
+    invoices = set_next_cursor(response, await service.get_invoices_by_school(
+        school_id, skip=skip, limit=limit, cursor=cursor
+    ))
+    return not_modified(request, response, invoice_etag(*invoices)) or fast_json(response, InvoiceResponse, invoices)
 
-@router.get("/status/{status}", response_model=List[InvoiceResponse])
+@router.get("/status/{status}", response_model=List[InvoiceResponse],
+            dependencies=[Depends(query_budget(1, version_probe=True))])
 async def get_invoices_by_status(
     status: InvoiceStatus,
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """Obtener facturas por estado"""
-    invoices = await service.get_invoices_by_status(
-        status, skip=skip, limit=limit
-    )
-    return invoices
+    if is_conditional(request):
+        rows = await service.get_invoices_by_status_version(status, skip=skip, limit=limit, cursor=cursor)
+        cached = not_modified(request, response, invoice_etag(*rows))
+        if cached:
+            return cached
+    invoices = set_next_cursor(response, await service.get_invoices_by_status(
+        status, skip=skip, limit=limit, cursor=cursor
+    ))
+    return not_modified(request, response, invoice_etag(*invoices)) or fast_json(response, InvoiceResponse, invoices)
 
-@router.get("/overdue/list", response_model=List[InvoiceResponse])
+@router.get("/overdue/list", response_model=List[InvoiceResponse],
+            dependencies=[Depends(query_budget(1, version_probe=True))])
 async def get_overdue_invoices(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: InvoiceService = Depends(get_invoice_service)
 ):
     """Obtener facturas vencidas"""
-    invoices = await service.get_overdue_invoices(skip=skip, limit=limit)
-    return invoices
+    if is_conditional(request):
+        rows = await service.get_overdue_invoices_version(skip=skip, limit=limit, cursor=cursor)
+        cached = not_modified(request, response, invoice_etag(*rows))
+        if cached:
+            return cached
+    invoices = set_next_cursor(response, await service.get_overdue_invoices(skip=skip, limit=limit, cursor=cursor))
+    return not_modified(request, response, invoice_etag(*invoices)) or fast_json(response, InvoiceResponse, invoices)
 
 @router.put("/{invoice_id}", response_model=InvoiceResponse)
 async def update_invoice(
@@ -1,13 +1,19 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.payment_dependency import get_payment_service
-from app.infrastructure.database.database import get_db
+from app.infrastructure.database.database import get_db, get_stream_db
 from app.domain.services.payment_service import PaymentService
 from app.infrastructure.repositories.payment_repository import SQLAlchemyPaymentRepository
 from app.infrastructure.repositories.invoice_repository import SQLAlchemyInvoiceRepository
 from app.api.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
+from app.api.pagination import CursorQuery, set_next_cursor
+from app.api.etag import is_conditional, make_etag, not_modified, row_version
+from app.api.serialization import fast_json
+from app.api.query_stats import query_budget
+from app.api.export import ExportFormat, export_response
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -28,51 +34,97 @@ async def create_payment(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/export")
+async def export_payments(
+    school_id: int = Query(..., gt=0),
+    date_from: Optional[date] = Query(None, description="Payment date from (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Payment date to (inclusive)"),
+    is_confirmed: Optional[bool] = Query(None),
+    format: ExportFormat = Query(ExportFormat.CSV),
+    db: AsyncSession = Depends(get_stream_db)
+):
+    """Exportar los pagos de una escuela en CSV o NDJSON, en streaming desde un cursor del servidor"""
+    service = await get_payment_service(db)
+    try:
+        rows = service.export_payments(school_id, date_from=date_from, date_to=date_to, is_confirmed=is_confirmed)
+    except ValueError as e:
+        await db.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    return export_response(rows, format, f"payments-school-{school_id}", db)
+
 @router.get("/{payment_id}", response_model=PaymentResponse)
 async def get_payment(
     payment_id: int,
+    request: Request,
+    response: Response,
     service: PaymentService = Depends(get_payment_service)
 ):
     """Obtener pago por ID"""
     payment = await service.get_payment_by_id(payment_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
-    return payment
+    return not_modified(request, response, make_etag("payment", row_version(payment))) or payment
 
-@router.get("/", response_model=List[PaymentResponse])
+@router.get("/", response_model=List[PaymentResponse],
+            dependencies=[Depends(query_budget(2, version_probe=True))])
 async def get_payments(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: PaymentService = Depends(get_payment_service)
 ):
     """Listar pagos con paginación"""
-    payments = await service.get_all_payments(skip=skip, limit=limit)
-    return payments
+    if is_conditional(request):
+        rows = await service.get_all_payments_version(skip=skip, limit=limit, cursor=cursor)
+        cached = not_modified(request, response, make_etag("payments", *map(row_version, rows)))
+        if cached:
+            return cached
+    payments = set_next_cursor(response, await service.get_all_payments(skip=skip, limit=limit, cursor=cursor))
+    return not_modified(request, response, make_etag("payments", *map(row_version, payments))) or fast_json(response, PaymentResponse, payments)
 
-@router.get("/invoice/{invoice_id}", response_model=List[PaymentResponse])
+@router.get("/invoice/{invoice_id}", response_model=List[PaymentResponse],
+            dependencies=[Depends(query_budget(4, version_probe=True))])
 async def get_payments_by_invoice(
     invoice_id: int,
+    request: Request,
+    response: Response,
     service: PaymentService = Depends(get_payment_service)
 ):
     """Obtener pagos por factura"""
     try:
+        if is_conditional(request):
+            rows = await service.get_payments_by_invoice_version(invoice_id)
+            cached = not_modified(request, response, make_etag("payments", *map(row_version, rows)))
+            if cached:
+                return cached
         payments = await service.get_payments_by_invoice(invoice_id)
-        return payments
+        return not_modified(request, response, make_etag("payments", *map(row_version, payments))) or fast_json(response, PaymentResponse, payments)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-@router.get("/student/{student_id}", response_model=List[PaymentResponse])
+@router.get("/student/{student_id}", response_model=List[PaymentResponse],
+            dependencies=[Depends(query_budget(2, version_probe=True))])
 async def get_payments_by_student(
     student_id: int,
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: PaymentService = Depends(get_payment_service)
 ):
     """Obtener pagos por estudiante"""
-    payments = await service.get_payments_by_student(
-        student_id, skip=skip, limit=limit
-    )
-    return payments
+    if is_conditional(request):
+        rows = await service.get_payments_by_student_version(student_id, skip=skip, limit=limit, cursor=cursor)
+        cached = not_modified(request, response, make_etag("payments", *map(row_version, rows)))
+        if cached:
+            return cached
+    payments = set_next_cursor(response, await service.get_payments_by_student(
+        student_id, skip=skip, limit=limit, cursor=cursor
+    ))
+    return not_modified(request, response, make_etag("payments", *map(row_version, payments))) or fast_json(response, PaymentResponse, payments)
 
 @router.put("/{payment_id}", response_model=PaymentResponse)
 async def update_payment(
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.school_dependency import get_school_service
@@ -7,6 +7,10 @@ from app.infrastructure.database.database import get_db
 from app.domain.services.school_service import SchoolService
 from app.infrastructure.repositories.school_repository import SQLAlchemySchoolRepository
 from app.api.schemas.school import SchoolCreate, SchoolUpdate, SchoolResponse
+from app.api.pagination import CursorQuery, set_next_cursor
+from app.api.etag import is_conditional, make_etag, not_modified, row_version
+from app.api.serialization import fast_json
+from app.api.query_stats import query_budget
 
 router = APIRouter(prefix="/schools", tags=["schools"])
 
@@ -29,24 +33,37 @@ async def create_school(
 @router.get("/{school_id}", response_model=SchoolResponse)
 async def get_school(
     school_id: int,
+    request: Request,
+    response: Response,
     service: SchoolService = Depends(get_school_service)
 ):
     """Obtener escuela por ID"""
     school = await service.get_school_by_id(school_id)
     if not school:
         raise HTTPException(status_code=404, detail="School not found")
-    return school
+    return not_modified(request, response, make_etag("school", row_version(school))) or school
 
-@router.get("/", response_model=List[SchoolResponse])
+@router.get("/", response_model=List[SchoolResponse],
+            dependencies=[Depends(query_budget(1, version_probe=True))])
 async def get_schools(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     active_only: bool = Query(True),
     service: SchoolService = Depends(get_school_service)
 ):
     """Listar escuelas con paginación"""
-    schools = await service.get_all_schools(skip=skip, limit=limit, active_only=active_only)
-    return schools
+    if is_conditional(request):
+        rows = await service.get_all_schools_version(skip=skip, limit=limit, active_only=active_only, cursor=cursor)
+        cached = not_modified(request, response, make_etag("schools", *map(row_version, rows)))
+        if cached:
+            return cached
+    schools = set_next_cursor(response, await service.get_all_schools(
+        skip=skip, limit=limit, active_only=active_only, cursor=cursor
+    ))
+    return not_modified(request, response, make_etag("schools", *map(row_version, schools))) or fast_json(response, SchoolResponse, schools)
 
 @router.put("/{school_id}", response_model=SchoolResponse)
 async def update_school(
@@ -88,16 +105,19 @@ async def deactivate_school(
         raise HTTPException(status_code=404, detail="School not found")
     return school
 
-@router.get("/search/", response_model=List[SchoolResponse])
+@router.get("/search/", response_model=List[SchoolResponse],
+            dependencies=[Depends(query_budget(1))])
 async def search_schools(
+    response: Response,
     name: str = Query(..., min_length=1),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: SchoolService = Depends(get_school_service)
 ):
     """Buscar escuelas por nombre"""
-    schools = await service.search_schools(name, skip=skip, limit=limit)
-    return schools
+    schools = await service.search_schools(name, skip=skip, limit=limit, cursor=cursor)
+    return fast_json(response, SchoolResponse, set_next_cursor(response, schools))
 
 @router.get("/{school_id}/statistics")
 async def get_school_statistics(
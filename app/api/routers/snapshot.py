@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from app.api.dependencies.snapshot_dependency import get_snapshot_service
+from app.api.export import ARROW_STREAM_MEDIA_TYPE, arrow_ipc_chunks
+from app.infrastructure.database.database import get_stream_db
+
+router = APIRouter(prefix="/snapshots", tags=["snapshots"])
+
+SNAPSHOT_WATERMARK_HEADER = "X-Snapshot-Watermark"
+
+@router.get("/{table}")
+async def get_table_snapshot(
+    table: str,
+    since: Optional[datetime] = Query(None, description="Only rows with updated_at after this instant (previous X-Snapshot-Watermark)"),
+    db: AsyncSession = Depends(get_stream_db)
+):
+    """Tabla completa o sus cambios en formato Arrow IPC stream, en lotes columnares.
+
+    Los cambios (``since``) no incluyen filas borradas: para reflejarlos se vuelve a pedir la tabla completa.
+    """
+    service = await get_snapshot_service(db)
+    try:
+        schema, until, batches = await service.stream_table(table, since=since)
+    except ValueError as e:
+        await db.close()
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(
+        arrow_ipc_chunks(schema, batches),
+        media_type=ARROW_STREAM_MEDIA_TYPE,
+        headers={
+            SNAPSHOT_WATERMARK_HEADER: until.isoformat(),
+            "Content-Disposition": f'attachment; filename="{table}.arrows"'
+        },
+        # Los lotes se leen con db mientras se envía el cuerpo: se cierra al terminar
+        background=BackgroundTask(db.close)
+    )
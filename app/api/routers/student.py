@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.student_dependency import get_student_service
@@ -7,7 +7,11 @@ from app.infrastructure.database.database import get_db
 from app.domain.services.student_service import StudentService
 from app.infrastructure.repositories.student_repository import SQLAlchemyStudentRepository
 from app.infrastructure.repositories.school_repository import SQLAlchemySchoolRepository
-from app.api.schemas.student import StudentCreate, StudentUpdate, StudentResponse
+from app.api.schemas.student import StudentCreate, StudentUpdate, StudentResponse, StudentAutocompleteResponse
+from app.api.pagination import CursorQuery, set_next_cursor
+from app.api.etag import is_conditional, make_etag, not_modified, row_version
+from app.api.serialization import fast_json
+from app.api.query_stats import query_budget
 
 router = APIRouter(prefix="/students", tags=["students"])
 
@@ -28,53 +32,89 @@ async def create_student(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/autocomplete", response_model=List[StudentAutocompleteResponse])
+async def autocomplete_students(
+    school_id: int = Query(..., gt=0),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    service: StudentService = Depends(get_student_service)
+):
+    """Autocompletar estudiantes activos de un colegio por nombre, apellido o código (índice en memoria)"""
+    return service.autocomplete_students(school_id, q, limit)
+
 @router.get("/{student_id}", response_model=StudentResponse)
 async def get_student(
     student_id: int,
+    request: Request,
+    response: Response,
     service: StudentService = Depends(get_student_service)
 ):
     """Obtener estudiante por ID"""
     student = await service.get_student_by_id(student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return student
+    return not_modified(request, response, make_etag("student", row_version(student))) or student
 
 @router.get("/by-student-id/{student_id}", response_model=StudentResponse)
 async def get_student_by_student_id(
     student_id: str,
+    request: Request,
+    response: Response,
     service: StudentService = Depends(get_student_service)
 ):
     """Obtener estudiante por Student ID"""
     student = await service.get_student_by_student_id(student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return student
+    return not_modified(request, response, make_etag("student", row_version(student))) or student
 
-@router.get("/", response_model=List[StudentResponse])
+@router.get("/", response_model=List[StudentResponse],
+            dependencies=[Depends(query_budget(2, version_probe=True))])
 async def get_students(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     active_only: bool = Query(True),
     service: StudentService = Depends(get_student_service)
 ):
     """Listar estudiantes con paginación"""
-    students = await service.get_all_students(skip=skip, limit=limit, active_only=active_only)
-    return students
+    if is_conditional(request):
+        rows = await service.get_all_students_version(skip=skip, limit=limit, active_only=active_only, cursor=cursor)
+        cached = not_modified(request, response, make_etag("students", *map(row_version, rows)))
+        if cached:
+            return cached
+    students = set_next_cursor(response, await service.get_all_students(
+        skip=skip, limit=limit, active_only=active_only, cursor=cursor
+    ))
+    return not_modified(request, response, make_etag("students", *map(row_version, students))) or fast_json(response, StudentResponse, students)
 
-@router.get("/school/{school_id}", response_model=List[StudentResponse])
+@router.get("/school/{school_id}", response_model=List[StudentResponse],
+            dependencies=[Depends(query_budget(2, version_probe=True))])
 async def get_students_by_school(
     school_id: int,
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     active_only: bool = Query(True),
     service: StudentService = Depends(get_student_service)
 ):
     """Obtener estudiantes por escuela"""
     try:
-        students = await service.get_students_by_school(
-            school_id, skip=skip, limit=limit, active_only=active_only
-        )
-        return students
+        if is_conditional(request):
+            rows = await service.get_students_by_school_version(
+                school_id, skip=skip, limit=limit, active_only=active_only, cursor=cursor
+            )
+            cached = not_modified(request, response, make_etag("students", *map(row_version, rows)))
+            if cached:
+                return cached
+        students = set_next_cursor(response, await service.get_students_by_school(
+            school_id, skip=skip, limit=limit, active_only=active_only, cursor=cursor
+        ))
+        return not_modified(request, response, make_etag("students", *map(row_version, students))) or fast_json(response, StudentResponse, students)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -115,19 +155,22 @@ async def deactivate_student(
         raise HTTPException(status_code=404, detail="Student not found")
     return student
 
-@router.get("/search/", response_model=List[StudentResponse])
+@router.get("/search/", response_model=List[StudentResponse],
+            dependencies=[Depends(query_budget(1))])
 async def search_students(
+    response: Response,
     name: str = Query(..., min_length=1),
     school_id: Optional[int] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CursorQuery,
     service: StudentService = Depends(get_student_service)
 ):
     """Buscar estudiantes por nombre"""
     students = await service.search_students(
-        name, school_id=school_id, skip=skip, limit=limit
+        name, school_id=school_id, skip=skip, limit=limit, cursor=cursor
     )
-    return students
+    return fast_json(response, StudentResponse, set_next_cursor(response, students))
 
 @router.patch("/{student_id}/transfer", response_model=StudentResponse)
 async def transfer_student(
@@ -1,5 +1,5 @@
 from .school import SchoolCreate, SchoolUpdate, SchoolResponse, SchoolWithStudents
-from .student import StudentCreate, StudentUpdate, StudentResponse, StudentWithSchool, StudentWithInvoices
+from .student import StudentCreate, StudentUpdate, StudentResponse, StudentAutocompleteResponse, StudentWithSchool, StudentWithInvoices
 from .invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceWithStudent, InvoiceWithPayments
 from .payment import PaymentCreate, PaymentUpdate, PaymentResponse
 from .account_statement import StudentAccountStatement, SchoolAccountStatement
@@ -14,6 +14,7 @@ __all__ = [
     "StudentCreate",
     "StudentUpdate",
     "StudentResponse", 
+    "StudentAutocompleteResponse",
     "StudentWithSchool",
     "StudentWithInvoices",
     # Invoice schemas
@@ -1,12 +1,13 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 from app.api.schemas.invoice import InvoiceResponse
 
 class StudentAccountStatement(BaseModel):
     student_id: int
     student_name: str
+    school_id: int
     school_name: str
     total_invoiced: Decimal
     total_paid: Decimal
@@ -23,4 +24,5 @@ class SchoolAccountStatement(BaseModel):
     total_paid: Decimal
     total_pending: Decimal
     overdue_amount: Decimal
+    rollup_updated_at: Optional[datetime] = None
     recent_invoices: List[InvoiceResponse]
\ No newline at end of file
@@ -25,6 +25,27 @@ class InvoiceUpdate(BaseModel):
     status: Optional[InvoiceStatus] = None
     invoice_type: Optional[InvoiceType] = None
 
+class BillingRunRequest(BaseModel):
+    school_id: int = Field(..., gt=0, description="School ID")
+    invoice_type: InvoiceType = Field(default=InvoiceType.TUITION, description="Type of invoice")
+    amount: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2, description="Amount billed to each active student")
+    due_date: date = Field(..., description="Invoice due date")
+    description: Optional[str] = Field(None, max_length=500, description="Invoice description")
+    dry_run: bool = Field(default=False, description="Only count the invoices that would be created")
+
+    @validator('due_date')
+    def due_date_validation(cls, v):
+        if v < date.today():
+            raise ValueError('Due date cannot be in the past')
+        return v
+
+class BillingRunResponse(BillingRunRequest):
+    active_students: int
+    already_billed: int = Field(..., description="Active students that already have this invoice (skipped)")
+    invoices_created: int = Field(..., description="Invoices created, or that would be created on a dry run")
+    total_amount: Decimal
+    elapsed_ms: float
+
 class InvoiceResponse(InvoiceBase):
     model_config = ConfigDict(from_attributes=True)
     
@@ -43,6 +43,16 @@ class StudentResponse(StudentBase):
     updated_at: datetime
     full_name: str
 
+class StudentAutocompleteResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    school_id: int
+    student_id: str
+    first_name: str
+    last_name: str
+    full_name: str
+
 class StudentWithSchool(StudentResponse):
     school: "SchoolResponse"
 
@@ -0,0 +1,73 @@
+from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, List, Type, get_args, get_origin
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _json_default(value: Any) -> Any:
+    # Mismo formato que Pydantic en modo JSON: Decimal como texto, sin perder la escala
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON con orjson; fechas ISO 8601 con "Z" en UTC, igual que Pydantic"""
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_UTC_Z)
+
+
+def _list_item_model(annotation: Any) -> Any:
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item
+    return None
+
+
+@lru_cache(maxsize=None)
+def row_serializer(model: Type[BaseModel]) -> Callable[[Any], dict]:
+    """Función que copia a un dict los campos de ``model`` desde un objeto ORM (o un dict).
+
+    Los datos vienen de la base de datos y ya cumplen el esquema, así que no se
+    validan otra vez: solo se leen los atributos (incluidas propiedades como
+    ``is_overdue``) en el orden de los campos. Los campos ``List[OtroModelo]``
+    se serializan con el serializador de ese modelo.
+    """
+    names = tuple(model.model_fields)
+    nested = {
+        name: row_serializer(item_model)
+        for name, field in model.model_fields.items()
+        if (item_model := _list_item_model(field.annotation)) is not None
+    }
+    get_attributes = attrgetter(*names)
+    get_items = itemgetter(*names)
+
+    def serialize(row: Any) -> dict:
+        data = dict(zip(names, get_items(row) if isinstance(row, dict) else get_attributes(row)))
+        for name, serialize_item in nested.items():
+            data[name] = [serialize_item(item) for item in data[name]]
+        return data
+
+    return serialize
+
+
+def fast_json(response: Response, model: Type[BaseModel], content: Any) -> Response:
+    """Respuesta JSON de filas de confianza sin pasar por ``response_model``.
+
+    ``content`` es un objeto o una lista de objetos con los campos de ``model``.
+    Uso: ``return not_modified(...) or fast_json(response, Modelo, filas)``; se
+    conservan las cabeceras ya fijadas (ETag, X-Next-Cursor). El ``response_model``
+    de la ruta se mantiene para la documentación OpenAPI.
+    """
+    serialize = row_serializer(model)
+    if isinstance(content, (list, tuple)):
+        body = dumps([serialize(row) for row in content])
+    else:
+        body = dumps(serialize(content))
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=dict(response.headers))
@@ -0,0 +1,22 @@
+"""Tareas de mantenimiento: ``python -m app.cli <comando> ...``"""
+import argparse
+import asyncio
+import sys
+
+from app.cli import balances, billing, overdue, rollups, snapshot
+
+COMMANDS = [balances, rollups, billing, overdue, snapshot]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Tareas de mantenimiento de Mattilda")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in COMMANDS:
+        command.register(subparsers)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(args.handler(args)) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
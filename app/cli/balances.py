@@ -0,0 +1,35 @@
+"""Verificar o reconstruir el saldo acumulado por estudiante (``student_balances``)"""
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories.student_balance_repository import SQLAlchemyStudentBalanceRepository
+from app.infrastructure.repositories.unit_of_work import SQLAlchemyUnitOfWork
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser("balances", help=__doc__)
+    parser.add_argument("action", choices=["verify", "rebuild"],
+                        help="verify: reportar diferencias; rebuild: recalcular desde facturas y pagos")
+    parser.add_argument("--student-id", type=int, default=None, help="Limitar a un estudiante")
+    parser.set_defaults(handler=run)
+
+
+async def run(args) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            repo = SQLAlchemyStudentBalanceRepository(session)
+            if args.action == "rebuild":
+                async with SQLAlchemyUnitOfWork(session):
+                    count = await repo.rebuild(student_id=args.student_id)
+                print(f"Rebuilt {count} student balances")
+                return 0
+
+            drift = await repo.find_drift(student_id=args.student_id)
+            for row in drift:
+                print(
+                    f"student {row['student_id']}: "
+                    f"invoiced ledger={row['ledger_invoiced']} expected={row['expected_invoiced']}, "
+                    f"paid ledger={row['ledger_paid']} expected={row['expected_paid']}"
+                )
+            print(f"{len(drift)} student balances out of sync")
+            return 1 if drift else 0
+    finally:
+        await async_engine.dispose()
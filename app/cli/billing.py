@@ -0,0 +1,48 @@
+"""Facturación masiva: una factura por cada estudiante activo de un colegio"""
+from datetime import date
+from decimal import Decimal
+
+from app.api.dependencies.invoice_dependency import get_invoice_service
+from app.api.schemas.invoice import BillingRunRequest
+from app.domain.models.invoice import InvoiceType
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser("billing-run", help=__doc__)
+    parser.add_argument("--school-id", type=int, required=True)
+    parser.add_argument("--amount", type=Decimal, required=True, help="Monto por estudiante")
+    parser.add_argument("--due-date", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument("--type", dest="invoice_type", choices=[t.value for t in InvoiceType], default=InvoiceType.TUITION.value)
+    parser.add_argument("--description", default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar las facturas que se crearían")
+    parser.set_defaults(handler=run)
+
+
+async def run(args) -> int:
+    billing = BillingRunRequest(
+        school_id=args.school_id,
+        invoice_type=args.invoice_type,
+        amount=args.amount,
+        due_date=args.due_date,
+        description=args.description,
+        dry_run=args.dry_run
+    )
+    try:
+        async with AsyncSessionLocal() as session:
+            service = await get_invoice_service(session)
+            try:
+                result = await service.run_billing(billing)
+            except ValueError as e:
+                print(e)
+                return 1
+
+            verb = "would create" if billing.dry_run else "created"
+            print(
+                f"school {result['school_id']}: {verb} {result['invoices_created']} invoices "
+                f"({result['total_amount']}) for {result['active_students']} active students, "
+                f"{result['already_billed']} already billed, {result['elapsed_ms']} ms"
+            )
+            return 0
+    finally:
+        await async_engine.dispose()
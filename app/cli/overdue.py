@@ -0,0 +1,36 @@
+"""Marcar como vencidas (OVERDUE) las facturas pendientes con fecha de vencimiento pasada"""
+import asyncio
+from datetime import date
+
+from app.api.dependencies.invoice_dependency import get_invoice_service
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser("overdue-sweep", help=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Facturas por UPDATE (un commit por lote)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="Fecha de corte YYYY-MM-DD (por defecto hoy)")
+    parser.add_argument("--interval", type=int, default=None,
+                        help="Repetir cada N segundos en lugar de ejecutar una sola vez")
+    parser.set_defaults(handler=run)
+
+
+async def sweep(args) -> None:
+    async with AsyncSessionLocal() as session:
+        service = await get_invoice_service(session)
+        result = await service.sweep_overdue_invoices(batch_size=args.batch_size, as_of=args.as_of)
+    print(
+        f"as of {result['as_of']}: {result['invoices_updated']} invoices marked overdue "
+        f"in {result['batches']} batches, {result['elapsed_ms']} ms"
+    )
+
+
+async def run(args) -> int:
+    try:
+        await sweep(args)
+        while args.interval:
+            await asyncio.sleep(args.interval)
+            await sweep(args)
+        return 0
+    finally:
+        await async_engine.dispose()
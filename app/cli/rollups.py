@@ -0,0 +1,37 @@
+"""Verificar o refrescar el resumen pre-agregado por colegio (``school_balances``)"""
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories.school_balance_repository import SQLAlchemySchoolBalanceRepository
+from app.infrastructure.repositories.unit_of_work import SQLAlchemyUnitOfWork
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser("rollups", help=__doc__)
+    parser.add_argument("action", choices=["verify", "refresh"],
+                        help="verify: reportar diferencias; refresh: recalcular")
+    parser.add_argument("--school-id", type=int, default=None, help="Limitar a un colegio")
+    parser.set_defaults(handler=run)
+
+
+async def run(args) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            repo = SQLAlchemySchoolBalanceRepository(session)
+            if args.action == "refresh":
+                async with SQLAlchemyUnitOfWork(session):
+                    count = await repo.refresh(school_id=args.school_id)
+                print(f"Refreshed {count} school rollups")
+                return 0
+
+            drift = await repo.find_drift(school_id=args.school_id)
+            for row in drift:
+                print(
+                    f"school {row['school_id']}: "
+                    f"students rollup={row['rollup_students']} expected={row['expected_students']}, "
+                    f"active rollup={row['rollup_active']} expected={row['expected_active']}, "
+                    f"invoiced rollup={row['rollup_invoiced']} expected={row['expected_invoiced']}, "
+                    f"paid rollup={row['rollup_paid']} expected={row['expected_paid']}"
+                )
+            print(f"{len(drift)} school rollups out of sync")
+            return 1 if drift else 0
+    finally:
+        await async_engine.dispose()
@@ -0,0 +1,41 @@
+"""Exportar escuelas, estudiantes, facturas y pagos a Parquet para analítica (incremental por updated_at)"""
+from datetime import timedelta
+
+from app.domain.repositories.snapshot_repository import SNAPSHOT_TABLES
+from app.domain.services.snapshot_service import SnapshotService
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories.snapshot_repository import SQLAlchemySnapshotRepository
+from app.infrastructure.repositories.snapshot_store import ParquetSnapshotStore
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser("snapshot", help=__doc__)
+    parser.add_argument("--output", default="snapshots", help="Directorio de los archivos Parquet y manifest.json")
+    parser.add_argument("--tables", nargs="+", choices=SNAPSHOT_TABLES, default=list(SNAPSHOT_TABLES))
+    parser.add_argument("--full", action="store_true",
+                        help="Exportar las tablas completas aunque exista una marca de agua previa")
+    parser.add_argument("--full-every-hours", type=float, default=settings.SNAPSHOT_FULL_EVERY_HOURS,
+                        help="Exportar completa una tabla si su última exportación completa es más vieja (0 = nunca)")
+    parser.add_argument("--lag-seconds", type=float, default=settings.SNAPSHOT_LAG_SECONDS,
+                        help="Margen del corte respecto de la hora de la base de datos")
+    parser.set_defaults(handler=run)
+
+
+async def run(args) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            service = SnapshotService(
+                SQLAlchemySnapshotRepository(session),
+                ParquetSnapshotStore(args.output),
+                lag_seconds=args.lag_seconds,
+                full_every=timedelta(hours=args.full_every_hours) if args.full_every_hours > 0 else None
+            )
+            for result in await service.export_snapshots(args.tables, full=args.full):
+                print(
+                    f"{result['table']}: {result['kind']} {result['rows']} rows, "
+                    f"{result['bytes'] / 1e6:.1f} MB, {result['elapsed_ms']} ms -> {result['file']}"
+                )
+            return 0
+    finally:
+        await async_engine.dispose()
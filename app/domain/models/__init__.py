@@ -1,14 +1,19 @@
 from .school import School
 from .student import Student
-from .invoice import Invoice, InvoiceStatus, InvoiceType
+from .invoice import Invoice, InvoiceRow, InvoiceStatus, InvoiceType
 from .payment import Payment, PaymentMethod
+from .student_balance import StudentBalance
+from .school_balance import SchoolBalance
 
 __all__ = [
     "School",
     "Student", 
     "Invoice",
+    "InvoiceRow",
     "InvoiceStatus",
     "InvoiceType",
     "Payment",
-    "PaymentMethod"
+    "PaymentMethod",
+    "StudentBalance",
+    "SchoolBalance"
 ]
\ No newline at end of file
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, Date, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, Date, Enum as SQLEnum, Index, select, text
+from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.sql import func
 from app.infrastructure.database.database import Base
+from app.domain.models.payment import Payment
 from enum import Enum
 from decimal import Decimal
+from datetime import date, datetime
+from typing import NamedTuple, Optional
 
 class InvoiceStatus(str, Enum):
     PENDING = "PENDING"
@@ -21,9 +24,23 @@ class InvoiceType(str, Enum):
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Barrido de vencidas: solo las facturas aún pendientes
+        Index("ix_invoices_pending_due_date", "due_date", "id", postgresql_where=text("status = 'PENDING'")),
+        # Listados: por estudiante, generales, por estado, vencidas y por fecha de emisión
+        Index("ix_invoices_student_created", "student_id", text("created_at DESC"), text("id DESC")),
+        Index("ix_invoices_created", "created_at", "id"),
+        Index("ix_invoices_status_created", "status", "created_at", "id"),
+        Index("ix_invoices_open_due_date", "due_date", "id", postgresql_where=text("status IN ('PENDING', 'OVERDUE')")),
+        # Monto vencido de los estados de cuenta: facturas abiertas de cada estudiante por vencimiento
+        Index("ix_invoices_student_open_due", "student_id", "due_date", postgresql_where=text("status IN ('PENDING', 'OVERDUE')")),
+        Index("ix_invoices_issue_date", "issue_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    invoice_number = Column(String(50), nullable=False, unique=True, index=True)
+    # Asignado por la base de datos (secuencia invoice_number_seq): INV-YYYYMMDD-00000001
+    invoice_number = Column(String(50), nullable=False, unique=True, index=True,
+                            server_default=func.next_invoice_number())
     description = Column(String(500), nullable=True)
     amount = Column(Numeric(10, 2), nullable=False)
     
@@ -47,18 +64,58 @@ class Invoice(Base):
     student = relationship("Student", back_populates="invoices")
     payments = relationship("Payment", back_populates="invoice", cascade="all, delete-orphan")
     
-    @property
-    def is_overdue(self):
-        from datetime import date
-        return self.status == InvoiceStatus.PENDING and self.due_date < date.today()
+    # Total pagado calculado en SQL (subconsulta correlacionada), se carga
+    # junto con la factura sin recorrer la relación payments
+    paid_amount = column_property(
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.invoice_id == id, Payment.is_confirmed == True)
+        .correlate_except(Payment)
+        .scalar_subquery()
+    )
     
     @property
-    def paid_amount(self):
-        return sum(payment.amount for payment in self.payments if payment.is_confirmed)
+    def is_overdue(self):
+        return invoice_is_overdue(self.status, self.due_date)
     
     @property
     def pending_amount(self):
         return self.amount - self.paid_amount
     
     def __repr__(self):
-        return f"<Invoice(id={self.id}, number='{self.invoice_number}', amount={self.amount}, status='{self.status}')>"
\ No newline at end of file
+        return f"<Invoice(id={self.id}, number='{self.invoice_number}', amount={self.amount}, status='{self.status}')>"
+
+
+def invoice_is_overdue(status: InvoiceStatus, due_date: date) -> bool:
+    return status == InvoiceStatus.OVERDUE or (
+        status == InvoiceStatus.PENDING and due_date < date.today()
+    )
+
+
+class InvoiceRow(NamedTuple):
+    """Proyección de solo lectura de una factura para listados.
+
+    Solo las columnas de la respuesta, en una tupla: sin estado de SQLAlchemy,
+    sin identity map ni relaciones. Expone las mismas propiedades derivadas que
+    ``Invoice`` (``is_overdue``, ``pending_amount``).
+    """
+    id: int
+    invoice_number: str
+    description: Optional[str]
+    amount: Decimal
+    issue_date: date
+    due_date: date
+    paid_date: Optional[date]
+    status: InvoiceStatus
+    invoice_type: InvoiceType
+    student_id: int
+    created_at: datetime
+    updated_at: datetime
+    paid_amount: Decimal
+
+    @property
+    def is_overdue(self) -> bool:
+        return invoice_is_overdue(self.status, self.due_date)
+
+    @property
+    def pending_amount(self) -> Decimal:
+        return self.amount - self.paid_amount
\ No newline at end of file
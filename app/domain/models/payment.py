@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, Date, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, Date, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.infrastructure.database.database import Base
@@ -13,6 +13,14 @@ class PaymentMethod(str, Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Total pagado por factura (paid_amount, saldo restante) sin leer la tabla
+        Index("ix_payments_invoice_confirmed", "invoice_id", postgresql_where=text("is_confirmed"), postgresql_include=["amount"]),
+        Index("ix_payments_invoice_date", "invoice_id", "payment_date"),
+        Index("ix_payments_created", "created_at", "id"),
+        Index("ix_payments_payment_date", "payment_date", "id"),
+        Index("ix_payments_method_date", "payment_method", "payment_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Numeric(10, 2), nullable=False)
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.infrastructure.database.database import Base
 
 class School(Base):
     __tablename__ = "schools"
+    __table_args__ = (
+        Index("ix_schools_created", "created_at", "id"),
+        # Búsqueda por nombre (search_vector se define en la migración)
+        Index("ix_schools_search", text("search_vector(name)"), postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
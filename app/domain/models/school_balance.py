@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric
+from sqlalchemy.sql import func
+from app.infrastructure.database.database import Base
+
+class SchoolBalance(Base):
+    """Resumen acumulado por colegio para el estado de cuenta"""
+    __tablename__ = "school_balances"
+
+    school_id = Column(Integer, ForeignKey("schools.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Mantenidos en cada escritura de estudiantes, facturas y pagos (lo vencido no se
+    # acumula: depende de la fecha y se calcula al leer el estado de cuenta)
+    total_students = Column(Integer, nullable=False, default=0, server_default="0")
+    active_students = Column(Integer, nullable=False, default=0, server_default="0")
+    total_invoiced = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    total_paid = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    @property
+    def total_pending(self):
+        return self.total_invoiced - self.total_paid
+    
+    def __repr__(self):
+        return f"<SchoolBalance(school_id={self.school_id}, students={self.total_students}, invoiced={self.total_invoiced})>"
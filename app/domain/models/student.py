@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Date, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.infrastructure.database.database import Base
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # Estudiantes de un colegio por nombre (listado, búsqueda y conteo de activos)
+        Index("ix_students_school_active_name", "school_id", "is_active", "first_name", "last_name", "id"),
+        Index("ix_students_created", "created_at", "id"),
+        # Búsqueda por nombre completo (search_vector se define en la migración)
+        Index("ix_students_search", text("search_vector(first_name || ' ' || last_name)"), postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(100), nullable=False)
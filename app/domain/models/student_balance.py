@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric
+from sqlalchemy.sql import func
+from app.infrastructure.database.database import Base
+
+class StudentBalance(Base):
+    """Saldo acumulado por estudiante, mantenido en cada escritura de facturas y pagos"""
+    __tablename__ = "student_balances"
+
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Totales (facturas canceladas excluidas)
+    total_invoiced = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    total_paid = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    @property
+    def total_pending(self):
+        return self.total_invoiced - self.total_paid
+    
+    def __repr__(self):
+        return f"<StudentBalance(student_id={self.student_id}, invoiced={self.total_invoiced}, paid={self.total_paid})>"
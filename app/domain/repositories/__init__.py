@@ -2,10 +2,25 @@ from .school_repository import SchoolRepositoryInterface
 from .student_repository import StudentRepositoryInterface
 from .invoice_repository import InvoiceRepositoryInterface
 from .payment_repository import PaymentRepositoryInterface
+from .student_balance_repository import StudentBalanceRepositoryInterface
+from .school_balance_repository import SchoolBalanceRepositoryInterface
+from .student_lookup_index import StudentLookupEntry, StudentLookupIndexInterface
+from .account_statement_cache import AccountStatementCacheInterface
+from .unit_of_work import UnitOfWorkInterface
+from .snapshot_repository import SNAPSHOT_TABLES, SnapshotRepositoryInterface, SnapshotStoreInterface
 
 __all__ = [
     "SchoolRepositoryInterface",
     "StudentRepositoryInterface", 
     "InvoiceRepositoryInterface",
-    "PaymentRepositoryInterface"
+    "PaymentRepositoryInterface",
+    "StudentBalanceRepositoryInterface",
+    "SchoolBalanceRepositoryInterface",
+    "StudentLookupEntry",
+    "StudentLookupIndexInterface",
+    "AccountStatementCacheInterface",
+    "UnitOfWorkInterface",
+    "SNAPSHOT_TABLES",
+    "SnapshotRepositoryInterface",
+    "SnapshotStoreInterface"
 ]
\ No newline at end of file
@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Estado de cuenta y la versión de la sonda con la que se calculó (la del ETag)
+CachedStatement = Tuple[dict, str]
+StatementLoader = Callable[[], Awaitable[CachedStatement]]
+# Recarga en segundo plano: recibe la versión cacheada y devuelve None si la sonda no cambió
+StatementRevalidator = Callable[[Hashable, str], Awaitable[Optional[CachedStatement]]]
+
+
+def student_statement_key(student_id: int) -> tuple:
+    return ("student", student_id)
+
+
+def school_statement_key(school_id: int) -> tuple:
+    return ("school", school_id)
+
+
+class AccountStatementCacheInterface(ABC):
+    """Caché de estados de cuenta; los servicios la invalidan después de cada commit que los afecta"""
+
+    @abstractmethod
+    async def get(self, key: Hashable, loader: StatementLoader) -> CachedStatement:
+        """Devolver el estado cacheado, con su versión, o cargarlo con ``loader``.
+
+        El ETag se arma con la versión guardada junto al estado, así el cuerpo
+        siempre corresponde al ETag que se envía aunque la entrada no se sondee.
+        """
+        pass
+
+    @abstractmethod
+    def invalidate(self, *keys: Hashable) -> None:
+        pass
+
+    @abstractmethod
+    def invalidate_school(self, school_id: int) -> None:
+        """Invalidar el estado del colegio y los de todos sus estudiantes"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        pass
+
+    def invalidate_account(self, student_id: int, school_id: int) -> None:
+        """Invalidar el estado del estudiante y el del colegio al que pertenece"""
+        self.invalidate(student_statement_key(student_id), school_statement_key(school_id))
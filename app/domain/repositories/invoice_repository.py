@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence
 from datetime import date
 from decimal import Decimal
-from app.domain.models.invoice import Invoice, InvoiceStatus, InvoiceType
+from app.domain.models.invoice import Invoice, InvoiceRow, InvoiceStatus, InvoiceType
+from app.domain.repositories.pagination import Page, PageVersion
 
 class InvoiceRepositoryInterface(ABC):
     @abstractmethod
@@ -13,32 +14,61 @@ class InvoiceRepositoryInterface(ABC):
     async def get_by_id(self, invoice_id: int) -> Optional[Invoice]:
         pass
     
+    @abstractmethod
+    async def lock_for_payment(self, invoice_id: int) -> Optional[dict]:
+        pass
+    
     @abstractmethod
     async def get_by_invoice_number(self, invoice_number: str) -> Optional[Invoice]:
         pass
     
     @abstractmethod
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_all(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        pass
+    
+    @abstractmethod
+    async def get_all_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        """``id`` y ``updated_at`` de las filas de la misma página, sin leer el resto de sus columnas"""
+        pass
+    
+    @abstractmethod
+    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        pass
+    
+    @abstractmethod
+    async def get_by_student_version(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        pass
+    
+    @abstractmethod
+    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
         pass
     
     @abstractmethod
-    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_by_school_version(self, school_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
         pass
     
     @abstractmethod
-    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_by_status(self, status: InvoiceStatus, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
         pass
     
     @abstractmethod
-    async def get_by_status(self, status: InvoiceStatus, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_by_status_version(self, status: InvoiceStatus, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
         pass
     
     @abstractmethod
-    async def get_overdue_invoices(self, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_overdue_invoices(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
         pass
     
     @abstractmethod
-    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_overdue_invoices_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        pass
+    
+    @abstractmethod
+    async def mark_overdue(self, as_of: date, batch_size: int = 1000) -> int:
+        pass
+    
+    @abstractmethod
+    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
         pass
     
     @abstractmethod
@@ -50,9 +80,12 @@ class InvoiceRepositoryInterface(ABC):
         pass
     
     @abstractmethod
-    async def get_student_account_summary(self, student_id: int) -> dict:
+    async def bill_school(self, school_id: int, invoice_type: InvoiceType, amount: Decimal, due_date: date,
+                          description: Optional[str] = None, dry_run: bool = False) -> dict:
         pass
     
     @abstractmethod
-    async def get_school_account_summary(self, school_id: int) -> dict:
-        pass
\ No newline at end of file
+    def stream_for_export(self, school_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                          status: Optional[InvoiceStatus] = None) -> AsyncIterator[Sequence]:
+        """Lotes de filas planas por fecha de emisión, leídas con un cursor del servidor"""
+        pass
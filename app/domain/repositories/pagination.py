@@ -0,0 +1,24 @@
+from typing import Any, Generic, Iterable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+# Resultado de la sonda de versión de un listado: ``id`` y ``updated_at`` de cada
+# fila de la página, en el orden de la página (en facturas, también ``paid_amount``)
+PageVersion = Sequence[Any]
+
+
+class InvalidCursorError(Exception):
+    """El cursor de paginación recibido no es válido para esta consulta"""
+
+
+class Page(list, Generic[T]):
+    """Lista de resultados que además conoce el cursor de la página siguiente.
+
+    Hereda de ``list`` para que el código que ya consume los repositorios como
+    listas siga funcionando sin cambios.
+    """
+
+    def __init__(self, items: Iterable[T] = (), next_cursor: Optional[str] = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
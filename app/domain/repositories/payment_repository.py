@@ -1,20 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from datetime import date
 from decimal import Decimal
 from app.domain.models.payment import Payment, PaymentMethod
+from app.domain.repositories.pagination import Page, PageVersion
 
 class PaymentRepositoryInterface(ABC):
     @abstractmethod
     async def create(self, payment: Payment) -> Payment:
         pass
     
+    @abstractmethod
+    async def post(self, payment: Payment) -> Tuple[Optional[Payment], Decimal]:
+        pass
+    
     @abstractmethod
     async def get_by_id(self, payment_id: int) -> Optional[Payment]:
         pass
     
     @abstractmethod
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Payment]:
+    async def get_all(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
+        pass
+    
+    @abstractmethod
+    async def get_all_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
         pass
     
     @abstractmethod
@@ -22,15 +31,23 @@ class PaymentRepositoryInterface(ABC):
         pass
     
     @abstractmethod
-    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100) -> List[Payment]:
+    async def get_by_invoice_version(self, invoice_id: int) -> PageVersion:
+        pass
+    
+    @abstractmethod
+    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
+        pass
+    
+    @abstractmethod
+    async def get_by_student_version(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
         pass
     
     @abstractmethod
-    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100) -> List[Payment]:
+    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
         pass
     
     @abstractmethod
-    async def get_by_method(self, method: PaymentMethod, skip: int = 0, limit: int = 100) -> List[Payment]:
+    async def get_by_method(self, method: PaymentMethod, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
         pass
     
     @abstractmethod
@@ -43,4 +60,10 @@ class PaymentRepositoryInterface(ABC):
     
     @abstractmethod
     async def get_total_by_invoice(self, invoice_id: int) -> Decimal:
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def stream_for_export(self, school_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                          is_confirmed: Optional[bool] = None) -> AsyncIterator[Sequence]:
+        """Lotes de filas planas por fecha de pago, leídas con un cursor del servidor"""
+        pass
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from decimal import Decimal
+
+class SchoolBalanceRepositoryInterface(ABC):
+    @abstractmethod
+    async def apply(self, school_id: int, students_delta: int = 0, active_delta: int = 0,
+                    invoiced_delta: Decimal = Decimal("0"), paid_delta: Decimal = Decimal("0")) -> None:
+        pass
+    
+    @abstractmethod
+    async def move_student_balance(self, student_id: int, from_school_id: int, to_school_id: Optional[int]) -> None:
+        pass
+    
+    @abstractmethod
+    async def get_account_summary(self, school_id: int) -> dict:
+        pass
+    
+    @abstractmethod
+    async def get_statement_version(self, school_id: int, recent_invoices: int) -> Optional[str]:
+        """Versión barata del estado de cuenta (None si el colegio no existe)"""
+        pass
+
+    @abstractmethod
+    async def find_drift(self, school_id: Optional[int] = None) -> List[dict]:
+        pass
+    
+    @abstractmethod
+    async def refresh(self, school_id: Optional[int] = None) -> int:
+        pass
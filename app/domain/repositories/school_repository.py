@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from app.domain.models.school import School
+from app.domain.repositories.pagination import Page, PageVersion
 
 class SchoolRepositoryInterface(ABC):
     @abstractmethod
@@ -16,7 +17,11 @@ class SchoolRepositoryInterface(ABC):
         pass
     
     @abstractmethod
-    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[School]:
+    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[School]:
+        pass
+    
+    @abstractmethod
+    async def get_all_version(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
         pass
     
     @abstractmethod
@@ -32,5 +37,5 @@ class SchoolRepositoryInterface(ABC):
         pass
     
     @abstractmethod
-    async def search_by_name(self, name: str, skip: int = 0, limit: int = 100) -> List[School]:
+    async def search_by_name(self, name: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[School]:
         pass
\ No newline at end of file
@@ -0,0 +1,45 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+# Tablas que se exportan a los snapshots columnares para analítica
+SNAPSHOT_TABLES = ("schools", "students", "invoices", "payments")
+
+
+class SnapshotRepositoryInterface(ABC):
+    """Lectura de tablas completas o de sus cambios, en lotes columnares"""
+
+    @abstractmethod
+    async def get_database_time(self) -> datetime:
+        """Hora del servidor de base de datos (la de updated_at)"""
+        pass
+
+    @abstractmethod
+    def get_schema(self, table: str) -> Any:
+        """Esquema columnar de la tabla (pyarrow.Schema)"""
+        pass
+
+    @abstractmethod
+    def stream_changes(self, table: str, since: Optional[datetime] = None,
+                       until: Optional[datetime] = None) -> AsyncIterator[Any]:
+        """Lotes (pyarrow.RecordBatch) de filas con since < updated_at <= until"""
+        pass
+
+
+class SnapshotStoreInterface(ABC):
+    """Destino de los snapshots y marca de agua de la última exportación por tabla"""
+
+    @abstractmethod
+    def get_watermark(self, table: str) -> Optional[datetime]:
+        pass
+
+    @abstractmethod
+    def get_last_full(self, table: str) -> Optional[datetime]:
+        """Corte de la última exportación completa de la tabla (la base de los incrementales)"""
+        pass
+
+    @abstractmethod
+    async def write(self, table: str, schema: Any, batches: AsyncIterator[Any],
+                    since: Optional[datetime], until: datetime) -> dict:
+        """Escribir los lotes y avanzar la marca de agua a ``until``; devuelve archivo y filas"""
+        pass
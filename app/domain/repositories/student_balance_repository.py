@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from decimal import Decimal
+
+class StudentBalanceRepositoryInterface(ABC):
+    @abstractmethod
+    async def apply(self, student_id: int, invoiced_delta: Decimal = Decimal("0"), paid_delta: Decimal = Decimal("0")) -> None:
+        pass
+    
+    @abstractmethod
+    async def get_account_summary(self, student_id: int) -> dict:
+        """Totales del ledger y monto vencido calculado en la lectura (no se acumula)"""
+        pass
+    
+    @abstractmethod
+    async def get_statement_version(self, student_id: int) -> Optional[str]:
+        """Versión barata del estado de cuenta (None si el estudiante no existe)"""
+        pass
+    
+    @abstractmethod
+    async def find_drift(self, student_id: Optional[int] = None) -> List[dict]:
+        pass
+    
+    @abstractmethod
+    async def rebuild(self, student_id: Optional[int] = None) -> int:
+        pass
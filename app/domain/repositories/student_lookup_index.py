@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Sequence
+from app.domain.models.student import Student
+
+
+@dataclass(frozen=True)
+class StudentLookupEntry:
+    """Datos mínimos de un estudiante activo para autocompletar"""
+    id: int
+    school_id: int
+    student_id: str
+    first_name: str
+    last_name: str
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+LookupEntriesLoader = Callable[[], Awaitable[Sequence[StudentLookupEntry]]]
+
+
+class StudentLookupIndexInterface(ABC):
+    """Índice de prefijos por colegio sobre nombres y códigos de estudiantes activos"""
+
+    @abstractmethod
+    def replace_all(self, entries: Iterable[StudentLookupEntry]) -> None:
+        pass
+
+    @abstractmethod
+    async def reload(self, load: LookupEntriesLoader) -> int:
+        """Reemplazar el contenido con lo que devuelve ``load``, sin perder los cambios hechos mientras tanto"""
+        pass
+
+    @abstractmethod
+    def upsert(self, student: Student) -> None:
+        """Agregar o actualizar un estudiante; si está inactivo se retira del índice"""
+        pass
+
+    @abstractmethod
+    def remove(self, student_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def search(self, school_id: int, prefix: str, limit: int = 10) -> List[StudentLookupEntry]:
+        pass
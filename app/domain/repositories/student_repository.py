@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from app.domain.models.student import Student
+from app.domain.repositories.pagination import Page, PageVersion
+from app.domain.repositories.student_lookup_index import StudentLookupEntry
 
 class StudentRepositoryInterface(ABC):
     @abstractmethod
@@ -20,11 +22,19 @@ class StudentRepositoryInterface(ABC):
         pass
     
     @abstractmethod
-    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Student]:
+    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[Student]:
         pass
     
     @abstractmethod
-    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Student]:
+    async def get_all_version(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
+        pass
+    
+    @abstractmethod
+    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[Student]:
+        pass
+    
+    @abstractmethod
+    async def get_by_school_version(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
         pass
     
     @abstractmethod
@@ -36,5 +46,9 @@ class StudentRepositoryInterface(ABC):
         pass
     
     @abstractmethod
-    async def search_by_name(self, name: str, school_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Student]:
-        pass
\ No newline at end of file
+    async def search_by_name(self, name: str, school_id: Optional[int] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Student]:
+        pass
+
+    @abstractmethod
+    async def get_lookup_entries(self) -> List[StudentLookupEntry]:
+        pass
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+
+class UnitOfWorkInterface(ABC):
+    """Transacción de una operación de servicio: confirma al salir del bloque o revierte si hubo error"""
+
+    async def __aenter__(self) -> "UnitOfWorkInterface":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+    @abstractmethod
+    async def commit(self) -> None:
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        pass
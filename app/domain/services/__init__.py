@@ -2,10 +2,12 @@ from .school_service import SchoolService
 from .student_service import StudentService
 from .invoice_service import InvoiceService
 from .payment_service import PaymentService
+from .snapshot_service import SnapshotService
 
 __all__ = [
     "SchoolService",
     "StudentService",
     "InvoiceService", 
-    "PaymentService"
+    "PaymentService",
+    "SnapshotService"
 ]
\ No newline at end of file
@@ -1,24 +1,48 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence
 from datetime import date, datetime
+import time
 from decimal import Decimal
-from app.domain.models.invoice import Invoice, InvoiceStatus, InvoiceType
+from app.domain.models.invoice import Invoice, InvoiceRow, InvoiceStatus, InvoiceType
 from app.domain.repositories.invoice_repository import InvoiceRepositoryInterface
 from app.domain.repositories.student_repository import StudentRepositoryInterface
-from app.api.schemas.invoice import InvoiceCreate, InvoiceUpdate
-import uuid
+from app.domain.repositories.school_repository import SchoolRepositoryInterface
+from app.domain.repositories.student_balance_repository import StudentBalanceRepositoryInterface
+from app.domain.repositories.school_balance_repository import SchoolBalanceRepositoryInterface
+from app.domain.repositories.account_statement_cache import (
+    AccountStatementCacheInterface, CachedStatement, student_statement_key, school_statement_key
+)
+from app.domain.repositories.pagination import Page, PageVersion
+from app.domain.repositories.unit_of_work import UnitOfWorkInterface
+from app.api.schemas.invoice import InvoiceCreate, InvoiceUpdate, BillingRunRequest
+
+# Facturas recientes del estado de cuenta del colegio (la sonda del ETag versiona las mismas)
+SCHOOL_STATEMENT_RECENT_INVOICES = 20
 
 class InvoiceService:
     def __init__(self, 
                  invoice_repo: InvoiceRepositoryInterface,
-                 student_repo: StudentRepositoryInterface):
+                 student_repo: StudentRepositoryInterface,
+                 school_repo: SchoolRepositoryInterface,
+                 balance_repo: StudentBalanceRepositoryInterface,
+                 school_balance_repo: SchoolBalanceRepositoryInterface,
+                 statement_cache: AccountStatementCacheInterface,
+                 uow: UnitOfWorkInterface):
         self.invoice_repo = invoice_repo
         self.student_repo = student_repo
+        self.school_repo = school_repo
+        self.balance_repo = balance_repo
+        self.school_balance_repo = school_balance_repo
+        self.statement_cache = statement_cache
+        self.uow = uow
 
-    def _generate_invoice_number(self) -> str:
-        """Generar número de factura único"""
-        today = date.today()
-        unique_id = str(uuid.uuid4())[:8].upper()
-        return f"INV-{today.strftime('%Y%m%d')}-{unique_id}"
+    async def _apply_balance_change(self, invoice: Invoice, amount: Decimal, status: InvoiceStatus) -> None:
+        """Reflejar en el saldo del estudiante el cambio de monto o estado de una factura"""
+        was_counted = invoice.status != InvoiceStatus.CANCELLED
+        is_counted = status != InvoiceStatus.CANCELLED
+        
+        invoiced_delta = (amount if is_counted else 0) - (invoice.amount if was_counted else 0)
+        paid_delta = (int(is_counted) - int(was_counted)) * invoice.paid_amount
+        await self.balance_repo.apply(invoice.student_id, invoiced_delta, paid_delta)
 
     async def create_invoice(self, invoice_data: InvoiceCreate) -> Invoice:
         # Verificar que el estudiante existe y está activo
@@ -28,14 +52,8 @@ class InvoiceService:
         if not student.is_active:
             raise ValueError("Cannot create invoice for inactive student")
         
-        # Generar número de factura único
-        invoice_number = self._generate_invoice_number()
-        while await self.invoice_repo.get_by_invoice_number(invoice_number):
-            invoice_number = self._generate_invoice_number()
-        
-        # Crear nueva factura
+        # Crear nueva factura; el número lo asigna la base de datos en el mismo INSERT
         invoice = Invoice(
-            invoice_number=invoice_number,
             description=invoice_data.description,
             amount=invoice_data.amount,
             due_date=invoice_data.due_date,
@@ -44,7 +62,46 @@ class InvoiceService:
             issue_date=date.today()
         )
         
-        return await self.invoice_repo.create(invoice)
+        async with self.uow:
+            await self.balance_repo.apply(invoice.student_id, invoiced_delta=invoice.amount)
+            invoice = await self.invoice_repo.create(invoice)
+        # Los estados de cuenta se invalidan solo después del commit
+        self.statement_cache.invalidate_account(student.id, student.school_id)
+        return invoice
+
+    async def run_billing(self, billing: BillingRunRequest) -> dict:
+        """Facturar a todos los estudiantes activos de un colegio en una sola operación"""
+        school = await self.school_repo.get_by_id(billing.school_id)
+        if not school:
+            raise ValueError(f"School with id {billing.school_id} not found")
+        if not school.is_active:
+            raise ValueError("Cannot bill students of inactive school")
+        
+        started = time.perf_counter()
+        async with self.uow:
+            result = await self.invoice_repo.bill_school(
+                billing.school_id,
+                billing.invoice_type,
+                billing.amount,
+                billing.due_date,
+                description=billing.description,
+                dry_run=billing.dry_run
+            )
+        if not billing.dry_run:
+            self.statement_cache.invalidate_school(billing.school_id)
+        
+        return {
+            **billing.model_dump(),
+            **result,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def export_invoices(self, school_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                        status: Optional[InvoiceStatus] = None) -> AsyncIterator[Sequence]:
+        """Lotes de filas de facturas del colegio para exportar; se leen a medida que se consumen"""
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must be on or before date_to")
+        return self.invoice_repo.stream_for_export(school_id, date_from, date_to, status)
 
     async def get_invoice_by_id(self, invoice_id: int) -> Optional[Invoice]:
         return await self.invoice_repo.get_by_id(invoice_id)
@@ -52,25 +109,69 @@ class InvoiceService:
     async def get_invoice_by_number(self, invoice_number: str) -> Optional[Invoice]:
         return await self.invoice_repo.get_by_invoice_number(invoice_number)
 
-    async def get_all_invoices(self, skip: int = 0, limit: int = 100) -> List[Invoice]:
-        return await self.invoice_repo.get_all(skip=skip, limit=limit)
+    async def get_all_invoices(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self.invoice_repo.get_all(skip=skip, limit=limit, cursor=cursor)
+
+    async def get_all_invoices_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self.invoice_repo.get_all_version(skip=skip, limit=limit, cursor=cursor)
 
-    async def get_invoices_by_student(self, student_id: int, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_invoices_by_student(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
         # Verificar que el estudiante existe
         student = await self.student_repo.get_by_id(student_id)
         if not student:
             raise ValueError(f"Student with id {student_id} not found")
         
-        return await self.invoice_repo.get_by_student(student_id, skip=skip, limit=limit)
+        return await self.invoice_repo.get_by_student(student_id, skip=skip, limit=limit, cursor=cursor)
+
+    async def get_invoices_by_student_version(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        rows = await self.invoice_repo.get_by_student_version(student_id, skip=skip, limit=limit, cursor=cursor)
+        # Si hay facturas el estudiante existe (llave foránea): solo una página vacía se verifica
+        if not rows and not await self.student_repo.get_by_id(student_id):
+            raise ValueError(f"Student with id {student_id} not found")
+        return rows
+
+    async def get_invoices_by_school(self, school_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self.invoice_repo.get_by_school(school_id, skip=skip, limit=limit, cursor=cursor)
+
+    async def get_invoices_by_school_version(self, school_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self.invoice_repo.get_by_school_version(school_id, skip=skip, limit=limit, cursor=cursor)
+
+    async def get_invoices_by_status(self, status: InvoiceStatus, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self.invoice_repo.get_by_status(status, skip=skip, limit=limit, cursor=cursor)
+
+    async def get_invoices_by_status_version(self, status: InvoiceStatus, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self.invoice_repo.get_by_status_version(status, skip=skip, limit=limit, cursor=cursor)
 
-    async def get_invoices_by_school(self, school_id: int, skip: int = 0, limit: int = 100) -> List[Invoice]:
-        return await self.invoice_repo.get_by_school(school_id, skip=skip, limit=limit)
+    async def get_overdue_invoices(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self.invoice_repo.get_overdue_invoices(skip=skip, limit=limit, cursor=cursor)
 
-    async def get_invoices_by_status(self, status: InvoiceStatus, skip: int = 0, limit: int = 100) -> List[Invoice]:
-        return await self.invoice_repo.get_by_status(status, skip=skip, limit=limit)
+    async def get_overdue_invoices_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self.invoice_repo.get_overdue_invoices_version(skip=skip, limit=limit, cursor=cursor)
 
-    async def get_overdue_invoices(self, skip: int = 0, limit: int = 100) -> List[Invoice]:
-        return await self.invoice_repo.get_overdue_invoices(skip=skip, limit=limit)
+    async def sweep_overdue_invoices(self, batch_size: int = 1000, as_of: Optional[date] = None) -> dict:
+        """Marcar como vencidas las facturas pendientes cuya fecha de vencimiento ya pasó"""
+        as_of = as_of or date.today()
+        started = time.perf_counter()
+        updated = 0
+        batches = 0
+        
+        # Un commit por lote para no mantener bloqueadas muchas filas a la vez
+        while True:
+            async with self.uow:
+                moved = await self.invoice_repo.mark_overdue(as_of, batch_size=batch_size)
+            updated += moved
+            batches += 1
+            if moved:
+                self.statement_cache.clear()
+            if moved < batch_size:
+                break
+        
+        return {
+            "as_of": as_of,
+            "invoices_updated": updated,
+            "batches": batches,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
 
     async def update_invoice(self, invoice_id: int, invoice_data: InvoiceUpdate) -> Optional[Invoice]:
         # Verificar que la factura existe
@@ -88,7 +189,17 @@ class InvoiceService:
         if 'status' not in update_dict and existing_invoice.due_date < date.today():
             update_dict['status'] = InvoiceStatus.OVERDUE
         
-        return await self.invoice_repo.update(invoice_id, update_dict)
+        # Capturar el colegio antes del UPDATE, que expira las relaciones cargadas
+        account = (existing_invoice.student_id, existing_invoice.student.school_id)
+        async with self.uow:
+            await self._apply_balance_change(
+                existing_invoice,
+                update_dict.get('amount', existing_invoice.amount),
+                update_dict.get('status', existing_invoice.status)
+            )
+            invoice = await self.invoice_repo.update(invoice_id, update_dict)
+        self.statement_cache.invalidate_account(*account)
+        return invoice
 
     async def mark_as_paid(self, invoice_id: int, paid_date: Optional[date] = None) -> Optional[Invoice]:
         """Marcar factura como pagada"""
@@ -102,10 +213,14 @@ class InvoiceService:
         if invoice.status == InvoiceStatus.CANCELLED:
             raise ValueError("Cannot pay cancelled invoice")
         
-        return await self.invoice_repo.update(invoice_id, {
-            "status": InvoiceStatus.PAID,
-            "paid_date": paid_date or date.today()
-        })
+        account = (invoice.student_id, invoice.student.school_id)
+        async with self.uow:
+            paid_invoice = await self.invoice_repo.update(invoice_id, {
+                "status": InvoiceStatus.PAID,
+                "paid_date": paid_date or date.today()
+            })
+        self.statement_cache.invalidate_account(*account)
+        return paid_invoice
 
     async def cancel_invoice(self, invoice_id: int) -> Optional[Invoice]:
         """Cancelar factura"""
@@ -116,9 +231,14 @@ class InvoiceService:
         if invoice.status == InvoiceStatus.PAID:
             raise ValueError("Cannot cancel paid invoice")
         
-        return await self.invoice_repo.update(invoice_id, {
-            "status": InvoiceStatus.CANCELLED
-        })
+        account = (invoice.student_id, invoice.student.school_id)
+        async with self.uow:
+            await self._apply_balance_change(invoice, invoice.amount, InvoiceStatus.CANCELLED)
+            cancelled_invoice = await self.invoice_repo.update(invoice_id, {
+                "status": InvoiceStatus.CANCELLED
+            })
+        self.statement_cache.invalidate_account(*account)
+        return cancelled_invoice
 
     async def delete_invoice(self, invoice_id: int) -> bool:
         # Verificar que la factura no esté pagada
@@ -129,16 +249,76 @@ class InvoiceService:
         if invoice.status == InvoiceStatus.PAID:
             raise ValueError("Cannot delete paid invoice")
         
-        return await self.invoice_repo.delete(invoice_id)
+        account = (invoice.student_id, invoice.student.school_id)
+        async with self.uow:
+            await self._apply_balance_change(invoice, Decimal("0"), InvoiceStatus.CANCELLED)
+            deleted = await self.invoice_repo.delete(invoice_id)
+        self.statement_cache.invalidate_account(*account)
+        return deleted
+
+    async def get_student_account_statement_version(self, student_id: int) -> PageVersion:
+        version = await self.balance_repo.get_statement_version(student_id)
+        if version is None:
+            raise ValueError(f"Student with id {student_id} not found")
+        return version
+
+    async def get_school_account_statement_version(self, school_id: int) -> PageVersion:
+        version = await self.school_balance_repo.get_statement_version(school_id, SCHOOL_STATEMENT_RECENT_INVOICES)
+        if version is None:
+            raise ValueError(f"School with id {school_id} not found")
+        return version
+
+    async def get_student_account_statement(self, student_id: int) -> CachedStatement:
+        """Estado de cuenta del estudiante y la versión con la que se armó su ETag"""
+        return await self.statement_cache.get(
+            student_statement_key(student_id),
+            lambda: self.load_account_statement(student_statement_key(student_id))
+        )
+
+    async def get_school_account_statement(self, school_id: int) -> CachedStatement:
+        """Estado de cuenta del colegio y la versión con la que se armó su ETag"""
+        return await self.statement_cache.get(
+            school_statement_key(school_id),
+            lambda: self.load_account_statement(school_statement_key(school_id))
+        )
+
+    async def get_account_statement_version(self, key: tuple) -> PageVersion:
+        kind, entity_id = key
+        if kind == "student":
+            return await self.get_student_account_statement_version(entity_id)
+        return await self.get_school_account_statement_version(entity_id)
+
+    async def load_account_statement(self, key: tuple) -> CachedStatement:
+        """Sondear y luego calcular sin caché el estado de una clave de la caché.
+
+        La versión se lee antes que el estado: si algo cambia entre ambas
+        lecturas, la próxima sonda no coincide y el estado se vuelve a calcular.
+        """
+        version = await self.get_account_statement_version(key)
+        return await self.build_account_statement(key), version
+
+    async def revalidate_account_statement(self, key: tuple, cached_version: str) -> Optional[CachedStatement]:
+        """Recalcular el estado solo si la sonda cambió; ``None`` si sigue en ``cached_version``"""
+        version = await self.get_account_statement_version(key)
+        if version == cached_version:
+            return None
+        return await self.build_account_statement(key), version
+
+    async def build_account_statement(self, key: tuple) -> dict:
+        """Calcular sin caché el estado de cuenta de una clave de la caché"""
+        kind, entity_id = key
+        if kind == "student":
+            return await self.build_student_account_statement(entity_id)
+        return await self.build_school_account_statement(entity_id)
 
-    async def get_student_account_statement(self, student_id: int) -> dict:
+    async def build_student_account_statement(self, student_id: int) -> dict:
         # Verificar que el estudiante existe
         student = await self.student_repo.get_by_id(student_id)
         if not student:
             raise ValueError(f"Student with id {student_id} not found")
         
-        # Obtener resumen de cuenta
-        summary = await self.invoice_repo.get_student_account_summary(student_id)
+        # Obtener resumen de cuenta desde el saldo acumulado
+        summary = await self.balance_repo.get_account_summary(student_id)
         
         # Obtener facturas del estudiante
         invoices = await self.invoice_repo.get_by_student(student_id, skip=0, limit=50)
@@ -146,6 +326,7 @@ class InvoiceService:
         return {
             "student_id": student_id,
             "student_name": student.full_name,
+            "school_id": student.school_id,
             "school_name": student.school.name if student.school else "N/A",
             "total_invoiced": summary["total_invoiced"],
             "total_paid": summary["total_paid"],
@@ -154,20 +335,22 @@ class InvoiceService:
             "invoices": invoices
         }
 
-    async def get_school_account_statement(self, school_id: int) -> dict:
-        # Obtener resumen de cuenta del colegio
-        summary = await self.invoice_repo.get_school_account_summary(school_id)
+    async def build_school_account_statement(self, school_id: int) -> dict:
+        # Obtener resumen de cuenta del colegio (pre-agregado en school_balances)
+        summary = await self.school_balance_repo.get_account_summary(school_id)
         
         # Obtener facturas recientes del colegio
-        recent_invoices = await self.invoice_repo.get_by_school(school_id, skip=0, limit=20)
+        recent_invoices = await self.invoice_repo.get_by_school(school_id, skip=0, limit=SCHOOL_STATEMENT_RECENT_INVOICES)
         
         return {
             "school_id": school_id,
+            "school_name": summary["school_name"],
             "total_students": summary["total_students"],
             "active_students": summary["active_students"],
             "total_invoiced": summary["total_invoiced"],
             "total_paid": summary["total_paid"],
             "total_pending": summary["total_pending"],
             "overdue_amount": summary["overdue_amount"],
+            "rollup_updated_at": summary["updated_at"],
             "recent_invoices": recent_invoices
         }
\ No newline at end of file
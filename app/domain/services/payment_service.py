@@ -1,10 +1,14 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence
 from datetime import date
 from decimal import Decimal
 from app.domain.models.payment import Payment, PaymentMethod
 from app.domain.models.invoice import InvoiceStatus
 from app.domain.repositories.payment_repository import PaymentRepositoryInterface
 from app.domain.repositories.invoice_repository import InvoiceRepositoryInterface
+from app.domain.repositories.student_balance_repository import StudentBalanceRepositoryInterface
+from app.domain.repositories.account_statement_cache import AccountStatementCacheInterface
+from app.domain.repositories.pagination import Page, PageVersion
+from app.domain.repositories.unit_of_work import UnitOfWorkInterface
 from app.api.schemas.payment import PaymentCreate, PaymentUpdate
 
 # home/falpizar/Documentos/fuentes/mattilda-project/app/domain/repositories/payment_repository.py
@@ -12,30 +16,31 @@ from app.api.schemas.payment import PaymentCreate, PaymentUpdate
 class PaymentService:
     def __init__(self, 
                  payment_repo: PaymentRepositoryInterface,
-                 invoice_repo: InvoiceRepositoryInterface):
+                 invoice_repo: InvoiceRepositoryInterface,
+                 balance_repo: StudentBalanceRepositoryInterface,
+                 statement_cache: AccountStatementCacheInterface,
+                 uow: UnitOfWorkInterface):
         self.payment_repo = payment_repo
         self.invoice_repo = invoice_repo
+        self.balance_repo = balance_repo
+        self.statement_cache = statement_cache
+        self.uow = uow
+
+    async def _apply_balance_change(self, payment: Payment, amount: Decimal, is_confirmed: bool) -> None:
+        """Reflejar en el saldo del estudiante el cambio de monto o confirmación de un pago"""
+        if payment.invoice.status == InvoiceStatus.CANCELLED:
+            return
+        
+        old_paid = payment.amount if payment.is_confirmed else Decimal("0")
+        new_paid = amount if is_confirmed else Decimal("0")
+        await self.balance_repo.apply(payment.invoice.student_id, paid_delta=new_paid - old_paid)
+
+    @staticmethod
+    def _account_of(payment: Payment) -> tuple:
+        """Estudiante y colegio del pago; se leen antes del UPDATE, que expira las relaciones cargadas"""
+        return payment.invoice.student_id, payment.invoice.student.school_id
 
     async def create_payment(self, payment_data: PaymentCreate) -> Payment:
-        # Verificar que la factura existe y se puede pagar
-        invoice = await self.invoice_repo.get_by_id(payment_data.invoice_id)
-        if not invoice:
-            raise ValueError(f"Invoice with id {payment_data.invoice_id} not found")
-        
-        if invoice.status == InvoiceStatus.PAID:
-            raise ValueError("Invoice is already fully paid")
-        
-        if invoice.status == InvoiceStatus.CANCELLED:
-            raise ValueError("Cannot pay cancelled invoice")
-        
-        # Verificar que no se exceda el monto de la factura
-        current_paid = await self.payment_repo.get_total_by_invoice(payment_data.invoice_id)
-        remaining_amount = invoice.amount - current_paid
-        
-        if payment_data.amount > remaining_amount:
-            raise ValueError(f"Payment amount ({payment_data.amount}) exceeds remaining invoice amount ({remaining_amount})")
-        
-        # Crear pago
         payment = Payment(
             amount=payment_data.amount,
             payment_date=payment_data.payment_date,
@@ -45,23 +50,41 @@ class PaymentService:
             invoice_id=payment_data.invoice_id
         )
         
-        created_payment = await self.payment_repo.create(payment)
-        
-        # Verificar si la factura queda completamente pagada
-        total_paid = await self.payment_repo.get_total_by_invoice(payment_data.invoice_id)
-        if total_paid >= invoice.amount:
-            await self.invoice_repo.update(payment_data.invoice_id, {
-                "status": InvoiceStatus.PAID,
-                "paid_date": payment_data.payment_date
-            })
+        async with self.uow:
+            # Bloquear la factura: los pagos concurrentes a la misma factura se serializan
+            invoice = await self.invoice_repo.lock_for_payment(payment_data.invoice_id)
+            if not invoice:
+                raise ValueError(f"Invoice with id {payment_data.invoice_id} not found")
+            
+            if invoice["status"] == InvoiceStatus.PAID:
+                raise ValueError("Invoice is already fully paid")
+            
+            if invoice["status"] == InvoiceStatus.CANCELLED:
+                raise ValueError("Cannot pay cancelled invoice")
+            
+            # Saldo restante, pago, estado de la factura y saldos acumulados en un solo statement
+            created_payment, remaining_amount = await self.payment_repo.post(payment)
+            if created_payment is None:
+                raise ValueError(f"Payment amount ({payment_data.amount}) exceeds remaining invoice amount ({remaining_amount})")
         
+        self.statement_cache.invalidate_account(invoice["student_id"], invoice["school_id"])
         return created_payment
 
+    def export_payments(self, school_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                        is_confirmed: Optional[bool] = None) -> AsyncIterator[Sequence]:
+        """Lotes de filas de pagos del colegio para exportar; se leen a medida que se consumen"""
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must be on or before date_to")
+        return self.payment_repo.stream_for_export(school_id, date_from, date_to, is_confirmed)
+
     async def get_payment_by_id(self, payment_id: int) -> Optional[Payment]:
         return await self.payment_repo.get_by_id(payment_id)
 
-    async def get_all_payments(self, skip: int = 0, limit: int = 100) -> List[Payment]:
-        return await self.payment_repo.get_all(skip=skip, limit=limit)
+    async def get_all_payments(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
+        return await self.payment_repo.get_all(skip=skip, limit=limit, cursor=cursor)
+
+    async def get_all_payments_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self.payment_repo.get_all_version(skip=skip, limit=limit, cursor=cursor)
 
     async def get_payments_by_invoice(self, invoice_id: int) -> List[Payment]:
         # Verificar que la factura existe
@@ -71,8 +94,18 @@ class PaymentService:
         
         return await self.payment_repo.get_by_invoice(invoice_id)
 
-    async def get_payments_by_student(self, student_id: int, skip: int = 0, limit: int = 100) -> List[Payment]:
-        return await self.payment_repo.get_by_student(student_id, skip=skip, limit=limit)
+    async def get_payments_by_invoice_version(self, invoice_id: int) -> PageVersion:
+        rows = await self.payment_repo.get_by_invoice_version(invoice_id)
+        # Si hay pagos la factura existe (llave foránea): solo una lista vacía se verifica
+        if not rows and not await self.invoice_repo.get_by_id(invoice_id):
+            raise ValueError(f"Invoice with id {invoice_id} not found")
+        return rows
+
+    async def get_payments_by_student(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
+        return await self.payment_repo.get_by_student(student_id, skip=skip, limit=limit, cursor=cursor)
+
+    async def get_payments_by_student_version(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self.payment_repo.get_by_student_version(student_id, skip=skip, limit=limit, cursor=cursor)
 
     async def update_payment(self, payment_id: int, payment_data: PaymentUpdate) -> Optional[Payment]:
         # Verificar que el pago existe
@@ -91,24 +124,32 @@ class PaymentService:
             if (other_payments_total + update_dict['amount']) > invoice.amount:
                 raise ValueError("Updated payment amount would exceed invoice total")
         
-        updated_payment = await self.payment_repo.update(payment_id, update_dict)
-        
-        # Recalcular estado de la factura
-        if updated_payment:
-            total_paid = await self.payment_repo.get_total_by_invoice(existing_payment.invoice_id)
-            invoice = await self.invoice_repo.get_by_id(existing_payment.invoice_id)
+        account = self._account_of(existing_payment)
+        async with self.uow:
+            await self._apply_balance_change(
+                existing_payment,
+                update_dict.get('amount', existing_payment.amount),
+                update_dict.get('is_confirmed', existing_payment.is_confirmed)
+            )
+            updated_payment = await self.payment_repo.update(payment_id, update_dict)
             
-            if total_paid >= invoice.amount and invoice.status != InvoiceStatus.PAID:
-                await self.invoice_repo.update(existing_payment.invoice_id, {
-                    "status": InvoiceStatus.PAID,
-                    "paid_date": date.today()
-                })
-            elif total_paid < invoice.amount and invoice.status == InvoiceStatus.PAID:
-                await self.invoice_repo.update(existing_payment.invoice_id, {
-                    "status": InvoiceStatus.PENDING,
-                    "paid_date": None
-                })
-        
+            # Recalcular estado de la factura
+            if updated_payment:
+                total_paid = await self.payment_repo.get_total_by_invoice(existing_payment.invoice_id)
+                invoice = await self.invoice_repo.get_by_id(existing_payment.invoice_id)
+                
+                if total_paid >= invoice.amount and invoice.status != InvoiceStatus.PAID:
+                    await self.invoice_repo.update(existing_payment.invoice_id, {
+                        "status": InvoiceStatus.PAID,
+                        "paid_date": date.today()
+                    })
+                elif total_paid < invoice.amount and invoice.status == InvoiceStatus.PAID:
+                    await self.invoice_repo.update(existing_payment.invoice_id, {
+                        "status": InvoiceStatus.PENDING,
+                        "paid_date": None
+                    })
+        
+        self.statement_cache.invalidate_account(*account)
         return updated_payment
 
     async def delete_payment(self, payment_id: int) -> bool:
@@ -117,30 +158,52 @@ class PaymentService:
         if not payment:
             raise ValueError(f"Payment with id {payment_id} not found")
         
-        # Eliminar pago
-        deleted = await self.payment_repo.delete(payment_id)
-        
-        if deleted:
-            # Recalcular estado de la factura
-            total_paid = await self.payment_repo.get_total_by_invoice(payment.invoice_id)
-            invoice = await self.invoice_repo.get_by_id(payment.invoice_id)
+        account = self._account_of(payment)
+        async with self.uow:
+            # Eliminar pago
+            await self._apply_balance_change(payment, Decimal("0"), False)
+            deleted = await self.payment_repo.delete(payment_id)
             
-            if total_paid < invoice.amount and invoice.status == InvoiceStatus.PAID:
-                await self.invoice_repo.update(payment.invoice_id, {
-                    "status": InvoiceStatus.PENDING,
-                    "paid_date": None
-                })
-        
+            if deleted:
+                # Recalcular estado de la factura
+                total_paid = await self.payment_repo.get_total_by_invoice(payment.invoice_id)
+                invoice = await self.invoice_repo.get_by_id(payment.invoice_id)
+                
+                if total_paid < invoice.amount and invoice.status == InvoiceStatus.PAID:
+                    await self.invoice_repo.update(payment.invoice_id, {
+                        "status": InvoiceStatus.PENDING,
+                        "paid_date": None
+                    })
+        
+        self.statement_cache.invalidate_account(*account)
         return deleted
 
     async def confirm_payment(self, payment_id: int) -> Optional[Payment]:
         """Confirmar un pago pendiente"""
-        return await self.payment_repo.update(payment_id, {"is_confirmed": True})
+        payment = await self.payment_repo.get_by_id(payment_id)
+        if not payment:
+            return None
+        
+        account = self._account_of(payment)
+        async with self.uow:
+            await self._apply_balance_change(payment, payment.amount, True)
+            confirmed_payment = await self.payment_repo.update(payment_id, {"is_confirmed": True})
+        self.statement_cache.invalidate_account(*account)
+        return confirmed_payment
 
     async def reject_payment(self, payment_id: int, reason: str = "") -> Optional[Payment]:
         """Rechazar un pago"""
-        notes = f"REJECTED: {reason}" if reason else "REJECTED"
-        return await self.payment_repo.update(payment_id, {
-            "is_confirmed": False,
-            "notes": notes
-        })
\ No newline at end of file
+        payment = await self.payment_repo.get_by_id(payment_id)
+        if not payment:
+            return None
+        
+        account = self._account_of(payment)
+        async with self.uow:
+            await self._apply_balance_change(payment, payment.amount, False)
+            notes = f"REJECTED: {reason}" if reason else "REJECTED"
+            rejected_payment = await self.payment_repo.update(payment_id, {
+                "is_confirmed": False,
+                "notes": notes
+            })
+        self.statement_cache.invalidate_account(*account)
+        return rejected_payment
\ No newline at end of file
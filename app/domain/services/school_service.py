@@ -1,11 +1,14 @@
 from typing import List, Optional
 from app.domain.models.school import School
 from app.domain.repositories.school_repository import SchoolRepositoryInterface
+from app.domain.repositories.pagination import Page, PageVersion
+from app.domain.repositories.unit_of_work import UnitOfWorkInterface
 from app.api.schemas.school import SchoolCreate, SchoolUpdate
 
 class SchoolService:
-    def __init__(self, school_repo: SchoolRepositoryInterface):
+    def __init__(self, school_repo: SchoolRepositoryInterface, uow: UnitOfWorkInterface):
         self.school_repo = school_repo
+        self.uow = uow
 
     async def create_school(self, school_data: SchoolCreate) -> School:
         # Validar que el email no esté en uso
@@ -22,13 +25,17 @@ class SchoolService:
             email=school_data.email
         )
         
-        return await self.school_repo.create(school)
+        async with self.uow:
+            return await self.school_repo.create(school)
 
     async def get_school_by_id(self, school_id: int) -> Optional[School]:
         return await self.school_repo.get_by_id(school_id)
 
-    async def get_all_schools(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[School]:
-        return await self.school_repo.get_all(skip=skip, limit=limit, active_only=active_only)
+    async def get_all_schools(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[School]:
+        return await self.school_repo.get_all(skip=skip, limit=limit, active_only=active_only, cursor=cursor)
+
+    async def get_all_schools_version(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
+        return await self.school_repo.get_all_version(skip=skip, limit=limit, active_only=active_only, cursor=cursor)
 
     async def update_school(self, school_id: int, school_data: SchoolUpdate) -> Optional[School]:
         # Verificar que la escuela existe
@@ -43,7 +50,8 @@ class SchoolService:
             if email_school and email_school.id != school_id:
                 raise ValueError(f"A school with email {update_dict['email']} already exists")
         
-        return await self.school_repo.update(school_id, update_dict)
+        async with self.uow:
+            return await self.school_repo.update(school_id, update_dict)
 
     async def delete_school(self, school_id: int) -> bool:
         # Verificar que no tenga estudiantes activos
@@ -51,13 +59,15 @@ class SchoolService:
         if students_count > 0:
             raise ValueError(f"Cannot delete school with {students_count} active students. Deactivate students first.")
         
-        return await self.school_repo.delete(school_id)
+        async with self.uow:
+            return await self.school_repo.delete(school_id)
 
     async def deactivate_school(self, school_id: int) -> Optional[School]:
-        return await self.school_repo.update(school_id, {"is_active": False})
+        async with self.uow:
+            return await self.school_repo.update(school_id, {"is_active": False})
 
-    async def search_schools(self, name: str, skip: int = 0, limit: int = 100) -> List[School]:
-        return await self.school_repo.search_by_name(name, skip=skip, limit=limit)
+    async def search_schools(self, name: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[School]:
+        return await self.school_repo.search_by_name(name, skip=skip, limit=limit, cursor=cursor)
 
     async def get_school_statistics(self, school_id: int) -> dict:
         school = await self.school_repo.get_by_id(school_id)
@@ -3,14 +3,33 @@ from datetime import date
 from app.domain.models.student import Student
 from app.domain.repositories.student_repository import StudentRepositoryInterface
 from app.domain.repositories.school_repository import SchoolRepositoryInterface
+from app.domain.repositories.school_balance_repository import SchoolBalanceRepositoryInterface
+from app.domain.repositories.student_lookup_index import StudentLookupEntry, StudentLookupIndexInterface
+from app.domain.repositories.pagination import Page, PageVersion
+from app.domain.repositories.unit_of_work import UnitOfWorkInterface
 from app.api.schemas.student import StudentCreate, StudentUpdate
 
 class StudentService:
     def __init__(self, 
                  student_repo: StudentRepositoryInterface, 
-                 school_repo: SchoolRepositoryInterface):
+                 school_repo: SchoolRepositoryInterface,
+                 school_balance_repo: SchoolBalanceRepositoryInterface,
+                 lookup_index: StudentLookupIndexInterface,
+                 uow: UnitOfWorkInterface):
         self.student_repo = student_repo
         self.school_repo = school_repo
+        self.school_balance_repo = school_balance_repo
+        self.lookup_index = lookup_index
+        self.uow = uow
+
+    async def _apply_rollup_change(self, student: Student, school_id: int, is_active: bool) -> None:
+        """Reflejar en el resumen de los colegios un cambio de colegio o de estado del estudiante"""
+        if school_id != student.school_id:
+            await self.school_balance_repo.apply(student.school_id, students_delta=-1, active_delta=-int(student.is_active))
+            await self.school_balance_repo.apply(school_id, students_delta=1, active_delta=int(is_active))
+            await self.school_balance_repo.move_student_balance(student.id, student.school_id, school_id)
+        else:
+            await self.school_balance_repo.apply(school_id, active_delta=int(is_active) - int(student.is_active))
 
     async def create_student(self, student_data: StudentCreate) -> Student:
         # Verificar que la escuela existe y está activa
@@ -43,7 +62,12 @@ class StudentService:
             school_id=student_data.school_id
         )
         
-        return await self.student_repo.create(student)
+        async with self.uow:
+            await self.school_balance_repo.apply(student.school_id, students_delta=1, active_delta=1)
+            student = await self.student_repo.create(student)
+        # El índice de autocompletado se actualiza solo con cambios ya confirmados
+        self.lookup_index.upsert(student)
+        return student
 
     async def get_student_by_id(self, student_id: int) -> Optional[Student]:
         return await self.student_repo.get_by_id(student_id)
@@ -51,16 +75,26 @@ class StudentService:
     async def get_student_by_student_id(self, student_id: str) -> Optional[Student]:
         return await self.student_repo.get_by_student_id(student_id)
 
-    async def get_all_students(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Student]:
-        return await self.student_repo.get_all(skip=skip, limit=limit, active_only=active_only)
+    async def get_all_students(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[Student]:
+        return await self.student_repo.get_all(skip=skip, limit=limit, active_only=active_only, cursor=cursor)
+
+    async def get_all_students_version(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
+        return await self.student_repo.get_all_version(skip=skip, limit=limit, active_only=active_only, cursor=cursor)
 
-    async def get_students_by_school(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Student]:
+    async def get_students_by_school(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[Student]:
         # Verificar que la escuela existe
         school = await self.school_repo.get_by_id(school_id)
         if not school:
             raise ValueError(f"School with id {school_id} not found")
         
-        return await self.student_repo.get_by_school(school_id, skip=skip, limit=limit, active_only=active_only)
+        return await self.student_repo.get_by_school(school_id, skip=skip, limit=limit, active_only=active_only, cursor=cursor)
+
+    async def get_students_by_school_version(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
+        rows = await self.student_repo.get_by_school_version(school_id, skip=skip, limit=limit, active_only=active_only, cursor=cursor)
+        # Si hay filas la escuela existe (llave foránea): solo una página vacía se verifica
+        if not rows and not await self.school_repo.get_by_id(school_id):
+            raise ValueError(f"School with id {school_id} not found")
+        return rows
 
     async def update_student(self, student_id: int, student_data: StudentUpdate) -> Optional[Student]:
         # Verificar que el estudiante existe
@@ -84,18 +118,52 @@ class StudentService:
             if not school.is_active:
                 raise ValueError("Cannot transfer student to inactive school")
         
-        return await self.student_repo.update(student_id, update_dict)
+        async with self.uow:
+            await self._apply_rollup_change(
+                existing_student,
+                update_dict.get('school_id', existing_student.school_id),
+                update_dict.get('is_active', existing_student.is_active)
+            )
+            student = await self.student_repo.update(student_id, update_dict)
+        if student:
+            self.lookup_index.upsert(student)
+        return student
 
     async def delete_student(self, student_id: int) -> bool:
         # Aquí podrías agregar validaciones adicionales
         # como verificar si tiene facturas pendientes
-        return await self.student_repo.delete(student_id)
+        student = await self.student_repo.get_by_id(student_id)
+        if not student:
+            return False
+        
+        async with self.uow:
+            await self.school_balance_repo.apply(student.school_id, students_delta=-1, active_delta=-int(student.is_active))
+            await self.school_balance_repo.move_student_balance(student.id, student.school_id, None)
+            deleted = await self.student_repo.delete(student_id)
+        self.lookup_index.remove(student_id)
+        return deleted
 
     async def deactivate_student(self, student_id: int) -> Optional[Student]:
-        return await self.student_repo.update(student_id, {"is_active": False})
+        student = await self.student_repo.get_by_id(student_id)
+        if not student:
+            return None
+        
+        async with self.uow:
+            await self._apply_rollup_change(student, student.school_id, False)
+            student = await self.student_repo.update(student_id, {"is_active": False})
+        self.lookup_index.remove(student_id)
+        return student
+
+    async def search_students(self, name: str, school_id: Optional[int] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Student]:
+        return await self.student_repo.search_by_name(name, school_id=school_id, skip=skip, limit=limit, cursor=cursor)
+
+    def autocomplete_students(self, school_id: int, prefix: str, limit: int = 10) -> List[StudentLookupEntry]:
+        """Estudiantes activos del colegio cuyo nombre, apellido o código empieza con el prefijo (sin consultar la BD)"""
+        return self.lookup_index.search(school_id, prefix, limit)
 
-    async def search_students(self, name: str, school_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Student]:
-        return await self.student_repo.search_by_name(name, school_id=school_id, skip=skip, limit=limit)
+    async def reload_lookup_index(self) -> int:
+        """Recargar el índice de autocompletado desde la base de datos"""
+        return await self.lookup_index.reload(self.student_repo.get_lookup_entries)
 
     async def transfer_student(self, student_id: int, new_school_id: int) -> Optional[Student]:
         """Transferir estudiante a otra escuela"""
@@ -114,7 +182,11 @@ class StudentService:
         if student.school_id == new_school_id:
             raise ValueError("Student is already in this school")
         
-        return await self.student_repo.update(student_id, {
-            "school_id": new_school_id,
-            "enrollment_date": date.today()  # Nueva fecha de inscripción
-        })
\ No newline at end of file
+        async with self.uow:
+            await self._apply_rollup_change(student, new_school_id, student.is_active)
+            student = await self.student_repo.update(student_id, {
+                "school_id": new_school_id,
+                "enrollment_date": date.today()  # Nueva fecha de inscripción
+            })
+        self.lookup_index.upsert(student)
+        return student
\ No newline at end of file
@@ -12,6 +12,32 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     VERSION: str = "1.0.0"
     
+    # Autocompletado de estudiantes: recarga periódica del índice en memoria (0 = solo al iniciar)
+    STUDENT_LOOKUP_REFRESH_SECONDS: int = 300
+    
+    # Caché de estados de cuenta en memoria (TTL 0 = desactivada)
+    ACCOUNT_STATEMENT_CACHE_TTL_SECONDS: float = 30
+    ACCOUNT_STATEMENT_CACHE_STALE_SECONDS: float = 30
+    ACCOUNT_STATEMENT_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Snapshots columnares: margen del corte respecto de la hora de la base de datos
+    SNAPSHOT_LAG_SECONDS: float = 60
+    # Exportación completa (nueva base, refleja los borrados) cada tantas horas (0 = solo con --full)
+    SNAPSHOT_FULL_EVERY_HOURS: float = 168
+    
+    # Sentencias SQL por request: cabeceras X-DB-Queries/Server-Timing, umbral de
+    # repeticiones de una misma sentencia (posible N+1, 0 = sin control) y modo estricto
+    # para pruebas (exceder el presupuesto de la ruta o el umbral hace fallar el request)
+    QUERY_STATS_HEADERS: bool = True
+    QUERY_REPEAT_THRESHOLD: int = 10
+    QUERY_STATS_STRICT: bool = False
+    
+    # Log de sentencias lentas (reemplaza echo): umbral en ms (0 = todas, negativo = desactivado)
+    # y EXPLAIN (ANALYZE, BUFFERS) de una muestra de los SELECT lentos a un archivo local ("" = no capturar)
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN_FILE: str = ""
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     
@@ -3,12 +3,26 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.infrastructure.config.settings import settings
+from app.infrastructure.database.pool import InstrumentedAsyncQueuePool, register_pool_gauges
+from app.infrastructure.database.query_stats import install_query_stats
+from app.infrastructure.database.slow_query_log import install_slow_query_log
 
 # Async engine para FastAPI
 async_engine = create_async_engine(
     settings.DATABASE_URL_ASYNC,
-    echo=settings.DEBUG,
-    future=True
+    future=True,
+    poolclass=InstrumentedAsyncQueuePool
+)
+# Conteo de sentencias y tiempo de BD por request (ver query_stats)
+install_query_stats(async_engine.sync_engine)
+# Espera, desbordes y estado del pool en /metrics
+register_pool_gauges(async_engine)
+# Sentencias lentas (en lugar de echo): forma, parámetros, duración, método de repositorio y EXPLAIN opcional
+install_slow_query_log(
+    async_engine.sync_engine,
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_EXPLAIN_FILE or None,
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -37,4 +51,9 @@ async def get_db() -> AsyncSession:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+# Sesión para respuestas en streaming: sin teardown, la cierra la respuesta al terminar de
+# enviar el cuerpo (el teardown de get_db no garantiza que la sesión siga abierta hasta entonces)
+async def get_stream_db() -> AsyncSession:
+    return AsyncSessionLocal()
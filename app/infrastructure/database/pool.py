@@ -0,0 +1,51 @@
+"""Pool de conexiones async con métricas de espera, desbordes y timeouts"""
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infrastructure.metrics import counter, gauge, histogram
+
+POOL_CHECKOUT_WAIT = histogram(
+    "db_pool_checkout_wait_seconds",
+    "Espera para obtener una conexión del pool (incluye abrir conexiones nuevas)",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+POOL_OVERFLOW = counter(
+    "db_pool_overflow", "Conexiones abiertas por encima de pool_size (max_overflow)"
+)
+POOL_TIMEOUTS = counter(
+    "db_pool_timeouts", "Checkouts que agotaron pool_timeout esperando una conexión"
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    def _inc_overflow(self) -> bool:
+        # _overflow arranca en -pool_size: por encima de 0 la conexión es de desborde
+        opened = super()._inc_overflow()
+        if opened and self._overflow > 0:
+            POOL_OVERFLOW.inc()
+        return opened
+
+
+def register_pool_gauges(engine) -> None:
+    """Gauges del estado del pool, leídos al exponer las métricas (el pool cambia tras dispose)"""
+    gauges = {
+        "db_pool_size": ("Conexiones permanentes del pool (pool_size)", lambda pool: pool.size()),
+        "db_pool_checked_out": ("Conexiones en uso", lambda pool: pool.checkedout()),
+        "db_pool_checked_in": ("Conexiones abiertas y libres en el pool", lambda pool: pool.checkedin()),
+        "db_pool_overflow_connections": ("Conexiones de desborde abiertas ahora",
+                                         lambda pool: max(pool.overflow(), 0)),
+    }
+    for name, (documentation, read) in gauges.items():
+        gauge(name, documentation).set_function(lambda read=read: read(engine.pool))
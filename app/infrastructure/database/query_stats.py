@@ -0,0 +1,127 @@
+"""Conteo de sentencias SQL y tiempo de base de datos por request (o por bloque).
+
+Los eventos del engine suman cada sentencia al ``QueryStats`` activo en el
+contexto (``track_queries``); fuera de un bloque instrumentado no se registra
+nada. Además del total se agrupan las sentencias por forma (SQL con los
+parámetros y las listas de parámetros normalizados): la misma forma repetida
+muchas veces en un request es la huella de un N+1 (una carga perezosa o una
+consulta por fila dentro de un bucle).
+
+En modo estricto (pensado para pruebas) exceder el presupuesto de sentencias
+o repetir una forma más veces que el umbral lanza ``QueryBudgetExceededError``
+en la sentencia culpable, en lugar de solo quedar registrado.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Marcadores de parámetros de los distintos paramstyles ($1, %s, %(name)s, :name, ?)
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+# Casts que el dialecto agrega a los parámetros (?::INTEGER, ?::VARCHAR[])
+_PARAMETER_CAST = re.compile(r"\?::\w+(?:\[\])?")
+# Listas de parámetros (IN con N elementos, VALUES de varias filas) colapsadas a un elemento
+_PARAMETER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_VALUES_LIST = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceededError(Exception):
+    """Un bloque instrumentado en modo estricto excedió su presupuesto de sentencias"""
+
+
+def statement_shape(statement: str) -> str:
+    """Forma de una sentencia: SQL sin valores de parámetros ni largo de listas"""
+    shape = _PARAMETER.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    shape = _PARAMETER_CAST.sub("?", shape)
+    return _VALUES_LIST.sub(r"\1", _PARAMETER_LIST.sub("?", shape))
+
+
+@dataclass
+class QueryStats:
+    """Sentencias ejecutadas y tiempo en la base de datos de un bloque instrumentado"""
+    # Máximo de sentencias (None = sin presupuesto) y de repeticiones de una misma forma (0 = sin límite)
+    budget: Optional[int] = None
+    repeat_threshold: int = 0
+    strict: bool = False
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def repeated(self) -> List[tuple]:
+        """Formas repetidas más veces que el umbral (posibles N+1), de más a menos frecuente"""
+        if not self.repeat_threshold:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > self.repeat_threshold]
+
+    def problems(self) -> List[str]:
+        problems = []
+        if self.over_budget():
+            problems.append(f"{self.count} queries exceed the budget of {self.budget}")
+        problems.extend(f"statement repeated {count} times (possible N+1): {shape}"
+                        for shape, count in self.repeated())
+        return problems
+
+    def _record(self, statement: str) -> None:
+        self.count += 1
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if not self.strict:
+            return
+        if self.over_budget():
+            raise QueryBudgetExceededError(f"{self.count} queries exceed the budget of {self.budget}")
+        if self.repeat_threshold and self.shapes[shape] > self.repeat_threshold:
+            raise QueryBudgetExceededError(
+                f"statement repeated {self.shapes[shape]} times (possible N+1): {shape}"
+            )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None, repeat_threshold: int = 0,
+                  strict: bool = False) -> Iterator[QueryStats]:
+    """Contar las sentencias ejecutadas dentro del bloque (también en tareas que este lance)"""
+    stats = QueryStats(budget=budget, repeat_threshold=repeat_threshold, strict=strict)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def install_query_stats(engine: Engine) -> None:
+    """Registrar los eventos de conteo en un engine (``async_engine.sync_engine`` para el async)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats._record(statement)
+            # En el contexto de ejecución: si la sentencia falla no queda nada colgado en la conexión
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        started = getattr(context, "_query_started", None)
+        if stats is not None and started is not None:
+            stats.duration += time.perf_counter() - started
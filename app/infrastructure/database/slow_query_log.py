@@ -0,0 +1,112 @@
+"""Log estructurado de sentencias lentas, con captura opcional de EXPLAIN.
+
+Reemplaza ``echo`` (todas las sentencias o ninguna): cada sentencia que supera
+``SLOW_QUERY_THRESHOLD_MS`` se registra con su forma normalizada, la forma de
+sus parámetros (tipos y largos, nunca valores), la duración y el método de
+repositorio que la ejecutó. Con ``SLOW_QUERY_EXPLAIN_FILE`` una muestra de los
+SELECT lentos se vuelve a ejecutar con ``EXPLAIN (ANALYZE, BUFFERS)`` en la misma
+conexión y el plan se agrega al archivo: las regresiones de índices quedan a la
+vista sin conectarse a la base de datos. Solo se explican SELECT porque
+``ANALYZE`` ejecuta la sentencia.
+"""
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.database.query_stats import statement_shape
+from app.infrastructure.metrics import current_repository_method
+
+logger = logging.getLogger(__name__)
+
+
+def parameter_shape(value: Any) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters: Any, executemany: bool) -> List[str]:
+    """Tipos (y largos de listas) de los parámetros; en executemany, los de la primera fila"""
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    if isinstance(parameters, dict):
+        return [f"{name}: {parameter_shape(value)}" for name, value in parameters.items()]
+    return [parameter_shape(value) for value in parameters or ()]
+
+
+def _is_select(statement: str) -> bool:
+    return statement.lstrip().lower().startswith("select")
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, explain_file: Optional[str] = None, explain_sample_rate: float = 0.0):
+        self.threshold = threshold_ms / 1000
+        self.explain_file = explain_file
+        self.explain_sample_rate = explain_sample_rate
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+
+        shape = statement_shape(statement)
+        repository_method = current_repository_method() or "-"
+        shapes = parameter_shapes(parameters, executemany)
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s", duration * 1000, repository_method, shape,
+            extra={"duration_ms": round(duration * 1000, 1), "statement": shape, "parameters": shapes,
+                   "repository_method": repository_method, "executemany": executemany},
+        )
+        if (self.explain_file and not executemany and _is_select(statement)
+                and not context.execution_options.get("stream_results")
+                and random.random() < self.explain_sample_rate):
+            self._explain(conn, statement, parameters, shape, shapes, duration, repository_method)
+
+    def _explain(self, conn, statement, parameters, shape, shapes, duration, repository_method) -> None:
+        # Cursor del driver: no pasa por los eventos del engine (ni se cuenta ni se vuelve a registrar)
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                # En un savepoint: si el EXPLAIN falla, la transacción del request sigue utilizable
+                cursor.execute("SAVEPOINT slow_query_explain")
+                try:
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                    plan = "\n".join(row[0] for row in cursor.fetchall())
+                except Exception:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                    raise
+                finally:
+                    cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            finally:
+                cursor.close()
+            with open(self.explain_file, "a") as f:
+                f.write(f"-- {datetime.now(timezone.utc).isoformat(timespec='seconds')} "
+                        f"{duration * 1000:.1f} ms in {repository_method}\n"
+                        f"-- parameters: {', '.join(shapes) or '-'}\n{shape}\n{plan}\n\n")
+        except Exception:
+            # El EXPLAIN es diagnóstico: nunca debe hacer fallar la sentencia original
+            logger.exception("EXPLAIN of slow query failed")
+
+
+def install_slow_query_log(engine: Engine, threshold_ms: float, explain_file: Optional[str] = None,
+                           explain_sample_rate: float = 0.0) -> None:
+    """Registrar el log de sentencias lentas (umbral negativo = desactivado, 0 = todas)"""
+    if threshold_ms >= 0:
+        SlowQueryLog(threshold_ms, explain_file, explain_sample_rate).install(engine)
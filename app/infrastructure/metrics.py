@@ -0,0 +1,257 @@
+"""Métricas en memoria en formato de texto de Prometheus, sin agentes ni dependencias.
+
+Contadores, gauges e histogramas con etiquetas (API parecida a
+``prometheus_client``: ``metric.labels(...).observe(valor)``) registrados en
+``REGISTRY`` y expuestos por ``GET /metrics``. Los valores son del proceso:
+con varios workers, Prometheus debe consultar cada uno (o agregarlos por
+instancia). ``instrument_repository`` mide la duración de cada método de un
+repositorio y lo deja en el contexto (``current_repository_method``) para
+atribuirle las sentencias SQL que ejecute.
+"""
+import functools
+import inspect
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Starlette agrega "; charset=utf-8" a los tipos text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Buckets por defecto (segundos), los mismos que usa el cliente oficial
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Sin etiquetas la serie existe desde el inicio (en 0)
+            self.labels()
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        """(sufijo, etiquetas ya formateadas, valor) de cada serie"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}"
+                     for suffix, labels, value in self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [("_total", _format_labels(self.labelnames, key), child.value)
+                for key, child in list(self._children.items())]
+
+
+class Gauge(_Metric):
+    """Gauge con valor propio, o calculado al exponer las métricas (``set_function``)"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            return [("", "", self._function())]
+        return [("", _format_labels(self.labelnames, key), child.value)
+                for key, child in list(self._children.items())]
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        samples = []
+        names = (*self.labelnames, "le")
+        for key, child in list(self._children.items()):
+            # Los buckets de Prometheus son acumulativos
+            cumulative = 0
+            for bound, count in zip(child.buckets, child.counts):
+                cumulative += count
+                samples.append(("_bucket", _format_labels(names, (*key, _format_value(bound))), cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append(("_bucket", _format_labels(names, (*key, "+Inf")), child.count))
+            samples.append(("_sum", labels, child.sum))
+            samples.append(("_count", labels, child.count))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+REPOSITORY_METHOD_DURATION = histogram(
+    "repository_method_duration_seconds", "Duración de los métodos de los repositorios",
+    ("repository", "method"),
+)
+
+
+_repository_method: ContextVar[Optional[str]] = ContextVar("repository_method", default=None)
+
+
+def current_repository_method() -> Optional[str]:
+    """Método de repositorio en ejecución (``Clase.método``), o None fuera de uno"""
+    return _repository_method.get()
+
+
+def instrument_repository(cls):
+    """Decorador de clase: mide cada método público asíncrono del repositorio.
+
+    Los generadores asíncronos (exportaciones) no se miden: su duración depende
+    de quien consume el stream.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        series = REPOSITORY_METHOD_DURATION.labels(cls.__name__, name)
+        setattr(cls, name, _timed(method, series, f"{cls.__name__}.{name}"))
+    return cls
+
+
+def _timed(method, series: _HistogramValue, qualified_name: str):
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        token = _repository_method.set(qualified_name)
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            series.observe(time.perf_counter() - started)
+            _repository_method.reset(token)
+
+    return timed
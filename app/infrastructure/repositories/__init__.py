@@ -2,10 +2,25 @@ from .school_repository import SQLAlchemySchoolRepository
 from .student_repository import SQLAlchemyStudentRepository
 from .invoice_repository import SQLAlchemyInvoiceRepository
 from .payment_repository import SQLAlchemyPaymentRepository
+from .student_balance_repository import SQLAlchemyStudentBalanceRepository
+from .school_balance_repository import SQLAlchemySchoolBalanceRepository
+from .student_lookup_index import InMemoryStudentLookupIndex, student_lookup_index
+from .account_statement_cache import InMemoryAccountStatementCache
+from .unit_of_work import SQLAlchemyUnitOfWork
+from .snapshot_repository import SQLAlchemySnapshotRepository
+from .snapshot_store import ParquetSnapshotStore
 
 __all__ = [
     "SQLAlchemySchoolRepository",
     "SQLAlchemyStudentRepository",
     "SQLAlchemyInvoiceRepository", 
-    "SQLAlchemyPaymentRepository"
+    "SQLAlchemyPaymentRepository",
+    "SQLAlchemyStudentBalanceRepository",
+    "SQLAlchemySchoolBalanceRepository",
+    "InMemoryStudentLookupIndex",
+    "student_lookup_index",
+    "InMemoryAccountStatementCache",
+    "SQLAlchemyUnitOfWork",
+    "SQLAlchemySnapshotRepository",
+    "ParquetSnapshotStore"
 ]
\ No newline at end of file
@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Set
+from app.domain.repositories.account_statement_cache import (
+    AccountStatementCacheInterface, CachedStatement, StatementLoader, StatementRevalidator
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    value: dict
+    version: str
+    fresh_until: float
+    stale_until: float
+
+
+class InMemoryAccountStatementCache(AccountStatementCacheInterface):
+    """LRU con TTL y *stale-while-revalidate*, en la memoria del proceso.
+
+    - Vigente (``ttl``): se responde desde la caché, sin consultar la base de datos.
+    - Vencida pero dentro de ``stale_ttl``: se responde el valor anterior y se
+      revalida en segundo plano con ``revalidate`` (sesión propia): si la sonda
+      devuelve la misma versión la entrada se renueva sin recalcular el estado.
+    - Sin entrada: se carga con el ``loader`` del request; los requests
+      simultáneos por la misma clave esperan esa única carga.
+
+    Una carga en curso cuya clave se invalida no se guarda al terminar, así un
+    commit posterior al inicio de la lectura nunca queda oculto por datos viejos.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0, max_entries: int = 10000,
+                 revalidate: Optional[StatementRevalidator] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl if revalidate else 0
+        self.max_entries = max_entries
+        self._revalidate = revalidate
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = dict.fromkeys(
+            ["hits", "stale_hits", "misses", "coalesced", "evictions", "invalidations",
+             "revalidations", "unchanged_revalidations", "revalidation_errors"], 0
+        )
+
+    async def get(self, key: Hashable, loader: StatementLoader) -> CachedStatement:
+        if self.ttl <= 0:
+            return await loader()
+
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.value, entry.version
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_revalidation(key, entry)
+                return entry.value, entry.version
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self._stats["misses"] += 1
+        return await self._load(key, loader)
+
+    async def _load(self, key: Hashable, loader: StatementLoader) -> CachedStatement:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # marcarla como leída si nadie más esperaba
+            raise
+        else:
+            future.set_result(result)
+            self._store(key, result, future)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _start_revalidation(self, key: Hashable, entry: _Entry) -> None:
+        # Contexto vacío: sus consultas no se cuentan en las estadísticas ni el presupuesto del request
+        task = asyncio.create_task(self._run_revalidation(key, entry), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_revalidation(self, key: Hashable, entry: _Entry) -> None:
+        async def revalidated() -> CachedStatement:
+            result = await self._revalidate(key, entry.version)
+            if result is None:
+                # Misma versión: el estado guardado sigue siendo el actual
+                self._stats["unchanged_revalidations"] += 1
+                return entry.value, entry.version
+            return result
+
+        self._stats["revalidations"] += 1
+        try:
+            await self._load(key, revalidated)
+        except Exception:
+            # Se sigue sirviendo el valor anterior hasta que venza stale_ttl
+            self._stats["revalidation_errors"] += 1
+            logger.exception("Account statement revalidation failed for %s", key)
+
+    def _store(self, key: Hashable, result: CachedStatement, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is not future:
+            return  # invalidada o reemplazada mientras se cargaba
+        value, version = result
+        now = self._clock()
+        self._entries[key] = _Entry(value, version, now + self.ttl, now + self.ttl + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+        self._stats["invalidations"] += len(keys)
+
+    def invalidate_school(self, school_id: int) -> None:
+        keys = [key for key, entry in self._entries.items() if entry.value.get("school_id") == school_id]
+        # Las cargas en curso no se descartan una por una: no se sabe aún a qué colegio pertenecen
+        self.invalidate(*keys, *list(self._inflight))
+
+    def clear(self) -> None:
+        self._stats["invalidations"] += len(self._entries)
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "entries": len(self._entries)}
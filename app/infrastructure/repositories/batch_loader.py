@@ -0,0 +1,96 @@
+"""Carga por llave primaria en lotes, al estilo DataLoader.
+
+Las corrutinas que piden filas por id en el mismo ciclo del event loop (p. ej.
+``asyncio.gather`` sobre los estudiantes de una nómina o las facturas de un
+lote de pagos) esperan un mismo lote: cuando ya no queda nada listo para
+ejecutar en ese ciclo se hace una sola consulta ``WHERE id = ANY(:ids)`` por
+modelo y cada corrutina recibe su fila (o None).
+
+Como la caché de identidad, el cargador vive en ``session.info``: dura lo que
+dura el request. ``AsyncSession`` no admite dos consultas concurrentes, así que
+una sola tarea por sesión vacía los pendientes: ejecuta los lotes de todos los
+modelos uno tras otro, y lo que pidan las corrutinas que despertó un lote (p. ej.
+el estudiante de cada factura recién cargada) espera al lote siguiente de esa
+misma tarea en lugar de abrir una consulta en paralelo.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+INFO_KEY = "batch_loader"
+
+# Recibe las llaves de un lote y devuelve las filas encontradas por llave
+LoadMany = Callable[[List[Any]], Awaitable[Dict[Any, Any]]]
+
+
+class BatchLoader:
+    def __init__(self, max_batch_size: int = 1000):
+        self.max_batch_size = max_batch_size
+        # Por modelo: función de carga y futuros pendientes por llave
+        self._pending: Dict[type, tuple] = {}
+        # Única tarea que ejecuta los lotes de la sesión (None si no hay nada pendiente)
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self, model: type, key: Any, load_many: LoadMany) -> asyncio.Future:
+        """Futuro con la fila de ``model`` para ``key`` (None si no existe)"""
+        _, futures = self._pending.setdefault(model, (load_many, {}))
+        future = futures.get(key)
+        if future is None:
+            future = futures[key] = asyncio.get_running_loop().create_future()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._drain())
+        return future
+
+    async def _drain(self) -> None:
+        batches: Dict[type, tuple] = {}
+        try:
+            while True:
+                # Ceder un ciclo: las corrutinas ya listas (también las que despertó el
+                # lote anterior) agregan sus llaves antes de armar el siguiente lote
+                await asyncio.sleep(0)
+                if not self._pending:
+                    return
+                batches, self._pending = self._pending, {}
+                await self._load(batches)
+        except asyncio.CancelledError:
+            # Nadie queda esperando un lote que ya no se va a ejecutar
+            for _, futures in (*batches.values(), *self._pending.values()):
+                for future in futures.values():
+                    future.cancel()
+            self._pending = {}
+            raise
+        finally:
+            self._task = None
+
+    async def _load(self, batches: Dict[type, tuple]) -> None:
+        for load_many, futures in batches.values():
+            keys = list(futures)
+            for start in range(0, len(keys), self.max_batch_size):
+                chunk = keys[start:start + self.max_batch_size]
+                try:
+                    found = await load_many(chunk)
+                except Exception as error:
+                    for key in chunk:
+                        if not futures[key].done():
+                            futures[key].set_exception(error)
+                    continue
+                for key in chunk:
+                    # Quien esperaba pudo haberse cancelado mientras tanto
+                    if not futures[key].done():
+                        futures[key].set_result(found.get(key))
+
+
+def any_id(column, ids: List[Any]):
+    """``column = ANY(:ids)`` con un único parámetro de tipo arreglo (mismo SQL para cualquier tamaño de lote)"""
+    return column == any_(bindparam("ids", ids, type_=ARRAY(column.type)))
+
+
+def batch_loader(session: AsyncSession) -> BatchLoader:
+    """Cargador de la sesión, compartido por todos los repositorios que la usan"""
+    loader = session.info.get(INFO_KEY)
+    if loader is None:
+        loader = session.info[INFO_KEY] = BatchLoader()
+    return loader
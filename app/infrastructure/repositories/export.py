@@ -0,0 +1,24 @@
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Filas que se traen del cursor del servidor por cada viaje a la base de datos
+EXPORT_BATCH_SIZE = 2000
+
+
+async def stream_rows(session: AsyncSession, stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Sequence[Row]]:
+    """Recorrer ``stmt`` con un cursor del servidor, en lotes de ``batch_size`` filas.
+
+    Solo un lote vive en memoria: el costo no depende del tamaño del resultado.
+    Se entregan lotes y no filas sueltas para no pagar un salto del generador
+    asíncrono por fila. El cursor se cierra aunque el cliente corte la descarga.
+    """
+    # Ejecución Core sobre la conexión de la sesión: columnas planas, sin la carga del ORM
+    connection = await session.connection()
+    result = await connection.stream(stmt.execution_options(yield_per=batch_size))
+    try:
+        async for batch in result.partitions():
+            yield batch
+    finally:
+        await result.close()
@@ -0,0 +1,76 @@
+"""Caché de identidad por sesión: entidades ya leídas por llave dentro de un request.
+
+Los repositorios creados sobre la misma sesión (la de un ``get_db``, es decir,
+un request) comparten la caché a través de ``session.info``: un ``get_by_id`` o
+``get_by_email`` repetido en el mismo request (el servicio que valida y luego
+vuelve a leer, o dos servicios que leen la misma fila) se resuelve en memoria.
+
+Se guarda la misma instancia que ya está en el identity map de la sesión;
+repetir la consulta devolvería ese objeto sin refrescar sus atributos, así que
+la caché no es menos fresca que la consulta. Lo que sí cambia con una escritura
+es qué filas existen y con qué llaves (incluido "no existe", que también se
+guarda): toda escritura descarta las entradas de los modelos de las tablas que
+toca, incluidas las borradas en cascada, y un rollback descarta todo.
+"""
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.domain.models.invoice import Invoice
+from app.domain.models.payment import Payment
+from app.domain.models.school import School
+from app.domain.models.student import Student
+
+INFO_KEY = "identity_cache"
+
+# Resultado de una llave no leída todavía (None es un resultado válido: la fila no existe)
+MISSING = object()
+
+# Modelos cuyas filas borra en cascada (ON DELETE CASCADE) el borrado de cada uno
+CASCADES = {
+    School: (School, Student, Invoice, Payment),
+    Student: (Student, Invoice, Payment),
+    Invoice: (Invoice, Payment),
+    Payment: (Payment,),
+}
+
+
+class IdentityCache:
+    def __init__(self):
+        self._entries: Dict[type, Dict[tuple, Any]] = {}
+
+    def get(self, model: type, key: str, value: Any) -> Any:
+        """La entidad (o None) leída antes con esa llave, o ``MISSING``"""
+        return self._entries.get(model, {}).get((key, value), MISSING)
+
+    def put(self, model: type, key: str, value: Any, entity: Any) -> Any:
+        self._entries.setdefault(model, {})[(key, value)] = entity
+        return entity
+
+    def evict(self, *models: type) -> None:
+        for model in models:
+            self._entries.pop(model, None)
+
+    def evict_deleted(self, model: type) -> None:
+        self.evict(*CASCADES[model])
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def identity_cache(session: AsyncSession) -> IdentityCache:
+    """Caché de la sesión, compartida por todos los repositorios que la usan"""
+    cache = session.info.get(INFO_KEY)
+    if cache is None:
+        cache = session.info[INFO_KEY] = IdentityCache()
+    return cache
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_after_rollback(session: Session) -> None:
+    # Lo escrito en la transacción ya no existe: ninguna entrada es confiable
+    cache = session.info.get(INFO_KEY)
+    if cache is not None:
+        cache.clear()
@@ -1,36 +1,99 @@
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 from datetime import date
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func, and_, or_, text
+from sqlalchemy import select, update, delete, func, and_, or_, text, Row, String, type_coerce
 from sqlalchemy.orm import selectinload
-from app.domain.models.invoice import Invoice, InvoiceStatus, InvoiceType
+from app.domain.models.invoice import Invoice, InvoiceRow, InvoiceStatus, InvoiceType
 from app.domain.models.student import Student
 from app.domain.models.school import School
 from app.domain.models.payment import Payment
 from app.domain.repositories.invoice_repository import InvoiceRepositoryInterface
+from app.domain.repositories.pagination import Page, PageVersion
+from app.infrastructure.repositories.pagination import Listing
+from app.infrastructure.repositories.export import stream_rows
+from app.infrastructure.metrics import instrument_repository
+from app.infrastructure.repositories.identity_cache import MISSING, identity_cache
+from app.infrastructure.repositories.batch_loader import any_id, batch_loader
 
+# Claves de orden (terminan en la PK para que el cursor sea único)
+CREATED_KEY = (Invoice.created_at, Invoice.id)
+DUE_DATE_KEY = (Invoice.due_date, Invoice.id)
+ISSUE_DATE_KEY = (Invoice.issue_date, Invoice.id)
+
+# Columnas de InvoiceRow (incluido paid_amount) para los listados de solo lectura
+INVOICE_ROW_COLUMNS = tuple(getattr(Invoice, field) for field in InvoiceRow._fields)
+
+
+def invoice_rows(result) -> List[InvoiceRow]:
+    # Tuplas en lugar de entidades: la sesión no las registra en el identity map
+    return [InvoiceRow._make(row) for row in result]
+
+
+# Estudiantes activos del colegio y si ya tienen una factura vigente del mismo tipo y vencimiento
+BILLING_CANDIDATES_SQL = """
+    SELECT
+        s.id AS student_id,
+        EXISTS (
+            SELECT 1 FROM invoices i
+            WHERE i.student_id = s.id
+              AND i.invoice_type = CAST(:invoice_type AS invoicetype)
+              AND i.due_date = :due_date
+              AND i.status <> 'CANCELLED'
+        ) AS already_billed
+    FROM students s
+    WHERE s.school_id = :school_id AND s.is_active
+"""
+
+@instrument_repository
 class SQLAlchemyInvoiceRepository(InvoiceRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
+        # Compartida con los demás repositorios de la sesión (ver identity_cache)
+        self.cache = identity_cache(session)
+        # Agrupa los get_by_id concurrentes en una consulta (ver batch_loader)
+        self.loader = batch_loader(session)
 
     async def create(self, invoice: Invoice) -> Invoice:
+        # Sin commit: lo confirma la unidad de trabajo del servicio
+        self.cache.evict(Invoice)
         self.session.add(invoice)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(invoice)
         return invoice
 
     async def get_by_id(self, invoice_id: int) -> Optional[Invoice]:
+        cached = self.cache.get(Invoice, "id", invoice_id)
+        if cached is not MISSING:
+            return cached
+        # Se agrupa con los demás get_by_id pedidos en el mismo ciclo del event loop
+        return await self.loader.load(Invoice, invoice_id, self._load_by_ids)
+
+    async def _load_by_ids(self, ids: List[int]) -> Dict[int, Invoice]:
         stmt = (
             select(Invoice)
-            .options(
-                selectinload(Invoice.student).selectinload(Student.school),
-                selectinload(Invoice.payments)
-            )
+            .options(selectinload(Invoice.student).selectinload(Student.school))
+            .where(any_id(Invoice.id, ids))
+        )
+        result = await self.session.execute(stmt)
+        found = {row.id: row for row in result.scalars()}
+        for invoice_id in ids:
+            self.cache.put(Invoice, "id", invoice_id, found.get(invoice_id))
+        return found
+
+    async def lock_for_payment(self, invoice_id: int) -> Optional[dict]:
+        # SELECT ... FOR UPDATE de la fila de la factura (sin relaciones ni pagos):
+        # los pagos concurrentes a la misma factura esperan aquí hasta el commit.
+        # El colegio se lee con una subconsulta para no bloquear también al estudiante
+        school_id = select(Student.school_id).where(Student.id == Invoice.student_id).scalar_subquery()
+        stmt = (
+            select(Invoice.id, Invoice.amount, Invoice.status, Invoice.student_id, school_id.label("school_id"))
             .where(Invoice.id == invoice_id)
+            .with_for_update(of=Invoice)
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        row = result.one_or_none()
+        return dict(row._mapping) if row else None
 
     async def get_by_invoice_number(self, invoice_number: str) -> Optional[Invoice]:
         stmt = (
@@ -41,155 +104,230 @@ class SQLAlchemyInvoiceRepository(InvoiceRepositoryInterface):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Invoice]:
-        stmt = (
-            select(Invoice)
-            .options(selectinload(Invoice.student))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Invoice.created_at.desc())
-        )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+    async def _fetch_page(self, listing: Listing, skip: int, limit: int, cursor: Optional[str]) -> Page[InvoiceRow]:
+        result = await self.session.execute(listing.paginate(skip, limit, cursor))
+        return listing.build_page(invoice_rows(result), limit)
 
-    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100) -> List[Invoice]:
-        stmt = (
-            select(Invoice)
-            .options(selectinload(Invoice.payments))
-            .where(Invoice.student_id == student_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Invoice.created_at.desc())
+    async def _page_version(self, listing: Listing, skip: int, limit: int, cursor: Optional[str]) -> PageVersion:
+        # paid_amount forma parte de la versión: un pago cambia la factura sin tocar su updated_at
+        result = await self.session.execute(listing.version(Invoice, skip, limit, cursor, Invoice.paid_amount))
+        return result.all()
+
+    @staticmethod
+    def _all_listing() -> Listing:
+        return Listing(select(*INVOICE_ROW_COLUMNS), CREATED_KEY, "invoices", descending=True)
+
+    @staticmethod
+    def _student_listing(student_id: int) -> Listing:
+        return Listing(
+            select(*INVOICE_ROW_COLUMNS).where(Invoice.student_id == student_id),
+            CREATED_KEY, f"invoices:student:{student_id}", descending=True
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
 
-    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    @staticmethod
+    def _school_listing(school_id: int) -> Listing:
         stmt = (
-            select(Invoice)
-            .join(Student)
-            .options(selectinload(Invoice.student))
+            select(*INVOICE_ROW_COLUMNS)
+            .join(Student, Student.id == Invoice.student_id)
             .where(Student.school_id == school_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Invoice.created_at.desc())
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return Listing(stmt, CREATED_KEY, f"invoices:school:{school_id}", descending=True)
 
-    async def get_by_status(self, status: InvoiceStatus, skip: int = 0, limit: int = 100) -> List[Invoice]:
-        stmt = (
-            select(Invoice)
-            .options(selectinload(Invoice.student))
-            .where(Invoice.status == status)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Invoice.created_at.desc())
+    @staticmethod
+    def _status_listing(status: InvoiceStatus) -> Listing:
+        return Listing(
+            select(*INVOICE_ROW_COLUMNS).where(Invoice.status == status),
+            CREATED_KEY, f"invoices:status:{status.value}", descending=True
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
 
-    async def get_overdue_invoices(self, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    @staticmethod
+    def _overdue_listing() -> Listing:
         today = date.today()
         stmt = (
-            select(Invoice)
-            .options(selectinload(Invoice.student).selectinload(Student.school))
+            select(*INVOICE_ROW_COLUMNS)
             .where(
                 and_(
-                    Invoice.status == InvoiceStatus.PENDING,
+                    # Las pendientes vencidas aún no alcanzadas por el barrido también cuentan
+                    Invoice.status.in_([InvoiceStatus.PENDING, InvoiceStatus.OVERDUE]),
                     Invoice.due_date < today
                 )
             )
-            .offset(skip)
-            .limit(limit)
-            .order_by(Invoice.due_date)
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return Listing(stmt, DUE_DATE_KEY, "invoices:overdue")
+
+    async def get_all(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self._fetch_page(self._all_listing(), skip, limit, cursor)
+
+    async def get_all_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._all_listing(), skip, limit, cursor)
 
-    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100) -> List[Invoice]:
+    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self._fetch_page(self._student_listing(student_id), skip, limit, cursor)
+
+    async def get_by_student_version(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._student_listing(student_id), skip, limit, cursor)
+
+    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self._fetch_page(self._school_listing(school_id), skip, limit, cursor)
+
+    async def get_by_school_version(self, school_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._school_listing(school_id), skip, limit, cursor)
+
+    async def get_by_status(self, status: InvoiceStatus, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self._fetch_page(self._status_listing(status), skip, limit, cursor)
+
+    async def get_by_status_version(self, status: InvoiceStatus, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._status_listing(status), skip, limit, cursor)
+
+    async def get_overdue_invoices(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
+        return await self._fetch_page(self._overdue_listing(), skip, limit, cursor)
+
+    async def get_overdue_invoices_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._overdue_listing(), skip, limit, cursor)
+
+    async def mark_overdue(self, as_of: date, batch_size: int = 1000) -> int:
+        # Un lote por llamada, recorriendo ix_invoices_pending_due_date; SKIP LOCKED
+        # evita esperar por facturas que otra transacción está pagando. ANY(ARRAY(...))
+        # actualiza el lote por llave primaria en lugar de un hash join con toda la tabla
+        self.cache.evict(Invoice)
+        stmt = text("""
+            UPDATE invoices SET status = 'OVERDUE', updated_at = now()
+            WHERE id = ANY(ARRAY(
+                SELECT id FROM invoices
+                WHERE status = 'PENDING' AND due_date < :as_of
+                ORDER BY due_date, id
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            ))
+        """)
+        result = await self.session.execute(stmt, {"as_of": as_of, "batch_size": batch_size})
+        return result.rowcount
+
+    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[InvoiceRow]:
         stmt = (
-            select(Invoice)
-            .options(selectinload(Invoice.student))
+            select(*INVOICE_ROW_COLUMNS)
             .where(
                 and_(
                     Invoice.issue_date >= start_date,
                     Invoice.issue_date <= end_date
                 )
             )
-            .offset(skip)
-            .limit(limit)
-            .order_by(Invoice.issue_date.desc())
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        listing = Listing(stmt, ISSUE_DATE_KEY, f"invoices:issued:{start_date}:{end_date}", descending=True)
+        return await self._fetch_page(listing, skip, limit, cursor)
 
     async def update(self, invoice_id: int, invoice_data: dict) -> Optional[Invoice]:
+        # RETURNING no puede incluir la subconsulta de paid_amount, así que se
+        # recarga la factura dentro de la misma transacción
+        self.cache.evict(Invoice)
         stmt = (
             update(Invoice)
             .where(Invoice.id == invoice_id)
             .values(**invoice_data)
-            .returning(Invoice)
+            .returning(Invoice.id)
         )
         result = await self.session.execute(stmt)
-        await self.session.commit()
-        return result.scalar_one_or_none()
+        if result.scalar_one_or_none() is None:
+            return None
+        
+        stmt = (
+            select(Invoice)
+            .where(Invoice.id == invoice_id)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
 
     async def delete(self, invoice_id: int) -> bool:
+        self.cache.evict_deleted(Invoice)
         stmt = delete(Invoice).where(Invoice.id == invoice_id)
         result = await self.session.execute(stmt)
-        await self.session.commit()
         return result.rowcount > 0
 
-    async def get_student_account_summary(self, student_id: int) -> dict:
-        # Obtener resumen de cuenta del estudiante
-        stmt = text("""
-            SELECT 
-                COUNT(*) as total_invoices,
-                COALESCE(SUM(amount), 0) as total_invoiced,
-                COALESCE(SUM(CASE WHEN status = 'PAID' THEN amount ELSE 0 END), 0) as total_paid,
-                COALESCE(SUM(CASE WHEN status = 'PENDING' THEN amount ELSE 0 END), 0) as total_pending,
-                COALESCE(SUM(CASE WHEN status = 'PENDING' AND due_date < CURRENT_DATE THEN amount ELSE 0 END), 0) as overdue_amount
-            FROM invoices 
-            WHERE student_id = :student_id
-        """)
+    async def bill_school(self, school_id: int, invoice_type: InvoiceType, amount: Decimal, due_date: date,
+                          description: Optional[str] = None, dry_run: bool = False) -> dict:
+        # Un solo statement: facturas, saldos de estudiantes y resumen del colegio en la misma transacción
+        self.cache.evict(Invoice)
+        billing_sql = f"""
+            WITH candidates AS ({BILLING_CANDIDATES_SQL}),
+            inserted AS (
+                INSERT INTO invoices (description, amount, due_date, status, invoice_type, student_id)
+                SELECT :description, :amount, :due_date, 'PENDING', CAST(:invoice_type AS invoicetype), student_id
+                FROM candidates
+                WHERE NOT already_billed
+                ORDER BY student_id
+                RETURNING student_id, amount
+            ),
+            student_rows AS (
+                INSERT INTO student_balances (student_id, total_invoiced)
+                SELECT student_id, amount FROM inserted
+                ON CONFLICT (student_id) DO UPDATE SET
+                    total_invoiced = student_balances.total_invoiced + EXCLUDED.total_invoiced,
+                    updated_at = now()
+            ),
+            school_row AS (
+                INSERT INTO school_balances (school_id, total_invoiced)
+                SELECT :school_id, SUM(amount) FROM inserted HAVING COUNT(*) > 0
+                ON CONFLICT (school_id) DO UPDATE SET
+                    total_invoiced = school_balances.total_invoiced + EXCLUDED.total_invoiced,
+                    updated_at = now()
+            )
+            SELECT
+                (SELECT COUNT(*) FROM candidates) AS active_students,
+                (SELECT COUNT(*) FROM candidates WHERE already_billed) AS already_billed,
+                (SELECT COUNT(*) FROM inserted) AS invoices_created
+        """
+        dry_run_sql = f"""
+            SELECT
+                COUNT(*) AS active_students,
+                COUNT(*) FILTER (WHERE already_billed) AS already_billed,
+                COUNT(*) FILTER (WHERE NOT already_billed) AS invoices_created
+            FROM ({BILLING_CANDIDATES_SQL}) candidates
+        """
         
-        result = await self.session.execute(stmt, {"student_id": student_id})
+        result = await self.session.execute(text(dry_run_sql if dry_run else billing_sql), {
+            "school_id": school_id,
+            "invoice_type": invoice_type.value,
+            "amount": amount,
+            "due_date": due_date,
+            "description": description
+        })
         row = result.fetchone()
         
         return {
-            "total_invoices": row.total_invoices,
-            "total_invoiced": Decimal(str(row.total_invoiced)),
-            "total_paid": Decimal(str(row.total_paid)),
-            "total_pending": Decimal(str(row.total_pending)),
-            "overdue_amount": Decimal(str(row.overdue_amount))
+            "active_students": row.active_students,
+            "already_billed": row.already_billed,
+            "invoices_created": row.invoices_created,
+            "total_amount": amount * row.invoices_created
         }
 
-    async def get_school_account_summary(self, school_id: int) -> dict:
-        # Obtener resumen de cuenta del colegio
-        stmt = text("""
-            SELECT 
-                COUNT(DISTINCT s.id) as total_students,
-                COUNT(DISTINCT CASE WHEN s.is_active THEN s.id END) as active_students,
-                COUNT(*) as total_invoices,
-                COALESCE(SUM(i.amount), 0) as total_invoiced,
-                COALESCE(SUM(CASE WHEN i.status = 'PAID' THEN i.amount ELSE 0 END), 0) as total_paid,
-                COALESCE(SUM(CASE WHEN i.status = 'PENDING' THEN i.amount ELSE 0 END), 0) as total_pending,
-                COALESCE(SUM(CASE WHEN i.status = 'PENDING' AND i.due_date < CURRENT_DATE THEN i.amount ELSE 0 END), 0) as overdue_amount
-            FROM students s
-            LEFT JOIN invoices i ON s.id = i.student_id
-            WHERE s.school_id = :school_id
-        """)
-        
-        result = await self.session.execute(stmt, {"school_id": school_id})
-        row = result.fetchone()
-        
-        return {
-            "total_students": row.total_students,
-            "active_students": row.active_students,
-            "total_invoices": row.total_invoices,
-            "total_invoiced": Decimal(str(row.total_invoiced)),
-            "total_paid": Decimal(str(row.total_paid)),
-            "total_pending": Decimal(str(row.total_pending)),
-            "overdue_amount": Decimal(str(row.overdue_amount))
-        }
\ No newline at end of file
+    async def stream_for_export(self, school_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                                status: Optional[InvoiceStatus] = None) -> AsyncIterator[Sequence[Row]]:
+        stmt = (
+            select(
+                Invoice.id,
+                Invoice.invoice_number,
+                Student.student_id.label("student_code"),
+                (Student.first_name + " " + Student.last_name).label("student_name"),
+                type_coerce(Invoice.invoice_type, String).label("invoice_type"),
+                Invoice.description,
+                Invoice.amount,
+                Invoice.paid_amount.label("paid_amount"),
+                type_coerce(Invoice.status, String).label("status"),
+                Invoice.issue_date,
+                Invoice.due_date,
+                Invoice.paid_date
+            )
+            .join(Student)
+            .where(Student.school_id == school_id)
+            .order_by(Invoice.issue_date, Invoice.id)
+        )
+        if date_from:
+            stmt = stmt.where(Invoice.issue_date >= date_from)
+        if date_to:
+            stmt = stmt.where(Invoice.issue_date <= date_to)
+        if status:
+            stmt = stmt.where(Invoice.status == status)
+        # Los enums salen como texto: el archivo lleva el valor y no se convierte fila por fila
+        async for batch in stream_rows(self.session, stmt):
+            yield batch
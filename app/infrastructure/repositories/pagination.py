@@ -0,0 +1,149 @@
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import ColumnElement, Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.domain.repositories.pagination import InvalidCursorError, Page
+
+
+def cursor_signature(scope: str, key: Sequence[Any], descending: bool = False) -> str:
+    """Firma del listado que emite un cursor: endpoint y filtros (``scope``), clave y dirección del orden"""
+    order = ",".join(str(column) for column in key)
+    raw = f"{scope}|{order}|{'desc' if descending else 'asc'}".encode()
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def encode_cursor(values: Sequence[Any], signature: str) -> str:
+    """Codificar los valores de la clave de orden y la firma del listado como un cursor opaco"""
+    payload = {"s": signature, "k": [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: Sequence[InstrumentedAttribute], signature: str) -> List[Any]:
+    """Decodificar un cursor usando los tipos de las columnas de la clave de orden.
+
+    Un cursor emitido por otro listado (otro endpoint, otros filtros u otro
+    orden) no se reinterpreta: su firma no coincide y se rechaza.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+    if not isinstance(payload, dict):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if payload.get("s") != signature:
+        raise InvalidCursorError("Pagination cursor belongs to a different listing or sort order")
+    if not isinstance(payload.get("k"), list) or len(payload["k"]) != len(key):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+    values = []
+    for column, value in zip(key, payload["k"]):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif python_type is Decimal:
+                value = Decimal(str(value))
+            elif not isinstance(value, python_type):
+                raise TypeError(value)
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError("Invalid pagination cursor") from e
+        values.append(value)
+    return values
+
+
+def paginate(
+    stmt: Select,
+    key: Sequence[InstrumentedAttribute],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    scope: str = "",
+) -> Select:
+    """Aplicar orden y paginación a una consulta.
+
+    ``key`` es la clave de orden completa y debe terminar en la llave primaria
+    para que sea única. Con ``cursor`` se hace un *seek* sobre la tupla
+    ``(sort_key, id)``, de modo que cualquier página cuesta lo mismo que la
+    primera; sin cursor se mantiene el comportamiento ``offset``/``limit``.
+    ``scope`` identifica el endpoint y sus filtros: solo se aceptan cursores
+    emitidos con el mismo ``scope``, clave y dirección (ver ``Listing``).
+    """
+    if cursor:
+        values = decode_cursor(cursor, key, cursor_signature(scope, key, descending))
+        row = tuple_(*key)
+        stmt = stmt.where(row < tuple_(*values) if descending else row > tuple_(*values))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    order_by = [column.desc() if descending else column.asc() for column in key]
+    return stmt.order_by(*order_by).limit(limit)
+
+
+def build_page(
+    items: Sequence[Any],
+    key: Sequence[InstrumentedAttribute],
+    limit: int,
+    descending: bool = False,
+    scope: str = "",
+) -> Page:
+    """Construir la página y su ``next_cursor`` a partir de la última fila"""
+    next_cursor = None
+    if items and len(items) >= limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in key],
+                                    cursor_signature(scope, key, descending))
+    return Page(items, next_cursor=next_cursor)
+
+
+def version_rows(stmt: Select, model: type, *columns: ColumnElement) -> Select:
+    """Sonda de versión de un resultado: la misma consulta reducida a ``id`` y ``updated_at``.
+
+    Conserva filtros, orden y límite, así que devuelve las mismas filas que la
+    consulta original y en el mismo orden, sin leer ni transferir el resto de
+    las columnas. ``columns`` agrega lo que también forma parte de la versión
+    (p. ej. ``paid_amount`` en facturas).
+    """
+    return stmt.with_only_columns(model.id, model.updated_at, *columns)
+
+
+@dataclass(frozen=True)
+class Listing:
+    """Un listado paginado: consulta con sus filtros, clave de orden y alcance de sus cursores.
+
+    ``scope`` nombra el endpoint y los valores de sus filtros (p. ej.
+    ``invoices:student:7``); los cursores de la página siguiente llevan la firma
+    del listado y ``paginate`` rechaza los de cualquier otro.
+    """
+    stmt: Select
+    key: Sequence[Any]
+    scope: str
+    descending: bool = False
+
+    @property
+    def signature(self) -> str:
+        return cursor_signature(self.scope, self.key, self.descending)
+
+    def paginate(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Select:
+        return paginate(self.stmt, self.key, skip, limit, cursor, self.descending, self.scope)
+
+    def build_page(self, items: Sequence[Any], limit: int) -> Page:
+        return build_page(items, self.key, limit, self.descending, self.scope)
+
+    def version(self, model: type, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                *columns: ColumnElement) -> Select:
+        """Sonda de la versión de una página (mismos filtros, cursor, orden y límite), para responder 304 sin leerla"""
+        return version_rows(self.paginate(skip, limit, cursor), model, *columns)
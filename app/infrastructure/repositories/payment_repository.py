@@ -1,65 +1,175 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from datetime import date
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func, and_
+from sqlalchemy import Select, select, update, delete, func, and_, text, column, Numeric, Row, String, type_coerce
 from sqlalchemy.orm import selectinload
 from app.domain.models.payment import Payment, PaymentMethod
+from app.domain.models.invoice import Invoice
+from app.domain.models.student import Student
 from app.domain.repositories.payment_repository import PaymentRepositoryInterface
+from app.domain.repositories.pagination import Page, PageVersion
+from app.infrastructure.repositories.pagination import Listing, version_rows
+from app.infrastructure.repositories.export import stream_rows
+from app.infrastructure.metrics import instrument_repository
+from app.infrastructure.repositories.identity_cache import MISSING, identity_cache
 
+# Claves de orden (terminan en la PK para que el cursor sea único)
+CREATED_KEY = (Payment.created_at, Payment.id)
+PAYMENT_DATE_KEY = (Payment.payment_date, Payment.id)
+
+# Registra el pago solo si no excede el saldo restante, marca la factura como pagada
+# si queda saldada y actualiza los saldos acumulados de estudiante y colegio.
+# La fila de la factura debe estar bloqueada (lock_for_payment) para que el saldo
+# se calcule con los pagos ya confirmados por otras transacciones.
+POST_PAYMENT_SQL = """
+    WITH totals AS (
+        SELECT
+            i.id,
+            i.student_id,
+            i.amount - COALESCE((
+                SELECT SUM(p.amount) FROM payments p
+                WHERE p.invoice_id = i.id AND p.is_confirmed
+            ), 0) AS remaining
+        FROM invoices i
+        WHERE i.id = :invoice_id
+    ),
+    new_payment AS (
+        INSERT INTO payments (amount, payment_date, payment_method, reference_number, notes, is_confirmed, invoice_id)
+        SELECT
+            CAST(:amount AS NUMERIC), CAST(:payment_date AS DATE), CAST(:payment_method AS paymentmethod),
+            :reference_number, :notes, true, t.id
+        FROM totals t
+        WHERE CAST(:amount AS NUMERIC) <= t.remaining
+        RETURNING *
+    ),
+    invoice_row AS (
+        UPDATE invoices i SET
+            status = 'PAID',
+            paid_date = CAST(:payment_date AS DATE),
+            updated_at = now()
+        FROM totals t
+        WHERE i.id = t.id
+          AND CAST(:amount AS NUMERIC) >= t.remaining
+          AND EXISTS (SELECT 1 FROM new_payment)
+    ),
+    student_row AS (
+        INSERT INTO student_balances (student_id, total_paid)
+        SELECT t.student_id, np.amount FROM new_payment np, totals t
+        ON CONFLICT (student_id) DO UPDATE SET
+            total_paid = student_balances.total_paid + EXCLUDED.total_paid,
+            updated_at = now()
+    ),
+    school_row AS (
+        INSERT INTO school_balances (school_id, total_paid)
+        SELECT s.school_id, np.amount
+        FROM new_payment np, totals t
+        JOIN students s ON s.id = t.student_id
+        ON CONFLICT (school_id) DO UPDATE SET
+            total_paid = school_balances.total_paid + EXCLUDED.total_paid,
+            updated_at = now()
+    )
+    SELECT np.*, t.remaining
+    FROM totals t
+    LEFT JOIN new_payment np ON true
+"""
+
+@instrument_repository
 class SQLAlchemyPaymentRepository(PaymentRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
+        # Compartida con los demás repositorios de la sesión (ver identity_cache)
+        self.cache = identity_cache(session)
 
     async def create(self, payment: Payment) -> Payment:
+        # Sin commit: lo confirma la unidad de trabajo del servicio
+        self.cache.evict(Payment)
         self.session.add(payment)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(payment)
         return payment
 
+    async def post(self, payment: Payment) -> Tuple[Optional[Payment], Decimal]:
+        # Un solo statement; devuelve (None, saldo restante) si el monto lo excede.
+        # También puede marcar la factura como pagada
+        self.cache.evict(Payment, Invoice)
+        textual = text(POST_PAYMENT_SQL).columns(*Payment.__table__.columns, column("remaining", Numeric))
+        stmt = select(Payment, textual.selected_columns.remaining).from_statement(textual)
+        result = await self.session.execute(stmt, {
+            "invoice_id": payment.invoice_id,
+            "amount": payment.amount,
+            "payment_date": payment.payment_date,
+            "payment_method": payment.payment_method.value,
+            "reference_number": payment.reference_number,
+            "notes": payment.notes
+        })
+        created_payment, remaining = result.one()
+        return created_payment, Decimal(str(remaining))
+
     async def get_by_id(self, payment_id: int) -> Optional[Payment]:
+        cached = self.cache.get(Payment, "id", payment_id)
+        if cached is not MISSING:
+            return cached
         stmt = (
             select(Payment)
-            .options(selectinload(Payment.invoice))
+            .options(selectinload(Payment.invoice).selectinload(Invoice.student))
             .where(Payment.id == payment_id)
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return self.cache.put(Payment, "id", payment_id, result.scalar_one_or_none())
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Payment]:
-        stmt = (
-            select(Payment)
-            .options(selectinload(Payment.invoice))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Payment.created_at.desc())
-        )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+    async def _fetch_page(self, listing: Listing, skip: int, limit: int, cursor: Optional[str]) -> Page[Payment]:
+        result = await self.session.execute(listing.paginate(skip, limit, cursor))
+        return listing.build_page(result.scalars().all(), limit)
 
-    async def get_by_invoice(self, invoice_id: int) -> List[Payment]:
-        stmt = (
+    async def _page_version(self, listing: Listing, skip: int, limit: int, cursor: Optional[str]) -> PageVersion:
+        result = await self.session.execute(listing.version(Payment, skip, limit, cursor))
+        return result.all()
+
+    @staticmethod
+    def _all_listing() -> Listing:
+        return Listing(select(Payment).options(selectinload(Payment.invoice)), CREATED_KEY, "payments", descending=True)
+
+    @staticmethod
+    def _invoice_payments(invoice_id: int) -> Select:
+        return (
             select(Payment)
             .where(Payment.invoice_id == invoice_id)
-            .order_by(Payment.payment_date.desc())
+            # El id desempata pagos del mismo día: la sonda de versión lee las filas en el mismo orden
+            .order_by(Payment.payment_date.desc(), Payment.id.desc())
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
 
-    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100) -> List[Payment]:
+    @staticmethod
+    def _student_listing(student_id: int) -> Listing:
         stmt = (
             select(Payment)
             .join(Payment.invoice)
             .options(selectinload(Payment.invoice))
             .where(Payment.invoice.has(student_id=student_id))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Payment.payment_date.desc())
         )
-        result = await self.session.execute(stmt)
+        return Listing(stmt, PAYMENT_DATE_KEY, f"payments:student:{student_id}", descending=True)
+
+    async def get_all(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
+        return await self._fetch_page(self._all_listing(), skip, limit, cursor)
+
+    async def get_all_version(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._all_listing(), skip, limit, cursor)
+
+    async def get_by_invoice(self, invoice_id: int) -> List[Payment]:
+        result = await self.session.execute(self._invoice_payments(invoice_id))
         return result.scalars().all()
 
-    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100) -> List[Payment]:
+    async def get_by_invoice_version(self, invoice_id: int) -> PageVersion:
+        result = await self.session.execute(version_rows(self._invoice_payments(invoice_id), Payment))
+        return result.all()
+
+    async def get_by_student(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
+        return await self._fetch_page(self._student_listing(student_id), skip, limit, cursor)
+
+    async def get_by_student_version(self, student_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._student_listing(student_id), skip, limit, cursor)
+
+    async def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
         stmt = (
             select(Payment)
             .options(selectinload(Payment.invoice))
@@ -69,26 +179,22 @@ class SQLAlchemyPaymentRepository(PaymentRepositoryInterface):
                     Payment.payment_date <= end_date
                 )
             )
-            .offset(skip)
-            .limit(limit)
-            .order_by(Payment.payment_date.desc())
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        listing = Listing(stmt, PAYMENT_DATE_KEY, f"payments:paid:{start_date}:{end_date}", descending=True)
+        return await self._fetch_page(listing, skip, limit, cursor)
 
-    async def get_by_method(self, method: PaymentMethod, skip: int = 0, limit: int = 100) -> List[Payment]:
+    async def get_by_method(self, method: PaymentMethod, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Payment]:
         stmt = (
             select(Payment)
             .options(selectinload(Payment.invoice))
             .where(Payment.payment_method == method)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Payment.payment_date.desc())
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        listing = Listing(stmt, PAYMENT_DATE_KEY, f"payments:method:{method.value}", descending=True)
+        return await self._fetch_page(listing, skip, limit, cursor)
 
     async def update(self, payment_id: int, payment_data: dict) -> Optional[Payment]:
+        # El monto y la confirmación cambian el paid_amount de la factura
+        self.cache.evict(Payment, Invoice)
         stmt = (
             update(Payment)
             .where(Payment.id == payment_id)
@@ -96,13 +202,13 @@ class SQLAlchemyPaymentRepository(PaymentRepositoryInterface):
             .returning(Payment)
         )
         result = await self.session.execute(stmt)
-        await self.session.commit()
         return result.scalar_one_or_none()
 
     async def delete(self, payment_id: int) -> bool:
+        self.cache.evict_deleted(Payment)
+        self.cache.evict(Invoice)
         stmt = delete(Payment).where(Payment.id == payment_id)
         result = await self.session.execute(stmt)
-        await self.session.commit()
         return result.rowcount > 0
 
     async def get_total_by_invoice(self, invoice_id: int) -> Decimal:
@@ -114,4 +220,34 @@ class SQLAlchemyPaymentRepository(PaymentRepositoryInterface):
         )
         result = await self.session.execute(stmt)
         total = result.scalar()
-        return Decimal(str(total)) if total else Decimal('0.00')
\ No newline at end of file
+        return Decimal(str(total)) if total else Decimal('0.00')
+
+    async def stream_for_export(self, school_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                                is_confirmed: Optional[bool] = None) -> AsyncIterator[Sequence[Row]]:
+        stmt = (
+            select(
+                Payment.id,
+                Payment.invoice_id,
+                Invoice.invoice_number,
+                Student.student_id.label("student_code"),
+                Payment.amount,
+                Payment.payment_date,
+                type_coerce(Payment.payment_method, String).label("payment_method"),
+                Payment.reference_number,
+                Payment.is_confirmed,
+                Payment.created_at
+            )
+            .join(Invoice, Invoice.id == Payment.invoice_id)
+            .join(Student, Student.id == Invoice.student_id)
+            .where(Student.school_id == school_id)
+            .order_by(Payment.payment_date, Payment.id)
+        )
+        if date_from:
+            stmt = stmt.where(Payment.payment_date >= date_from)
+        if date_to:
+            stmt = stmt.where(Payment.payment_date <= date_to)
+        if is_confirmed is not None:
+            stmt = stmt.where(Payment.is_confirmed == is_confirmed)
+        # Los enums salen como texto: el archivo lleva el valor y no se convierte fila por fila
+        async for batch in stream_rows(self.session, stmt):
+            yield batch
@@ -0,0 +1,221 @@
+from typing import List, Optional
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from app.domain.models.school_balance import SchoolBalance
+from app.domain.repositories.school_balance_repository import SchoolBalanceRepositoryInterface
+from app.infrastructure.metrics import instrument_repository
+
+# Resumen esperado por colegio recalculado desde estudiantes, facturas y pagos
+EXPECTED_ROLLUPS_SQL = """
+    WITH paid AS (
+        SELECT invoice_id, SUM(amount) AS paid
+        FROM payments
+        WHERE is_confirmed
+        GROUP BY invoice_id
+    ),
+    students_totals AS (
+        SELECT
+            school_id,
+            COUNT(*) AS total_students,
+            COUNT(*) FILTER (WHERE is_active) AS active_students
+        FROM students
+        GROUP BY school_id
+    ),
+    invoice_totals AS (
+        SELECT
+            s.school_id,
+            SUM(i.amount) AS total_invoiced,
+            SUM(COALESCE(p.paid, 0)) AS total_paid
+        FROM invoices i
+        JOIN students s ON s.id = i.student_id
+        LEFT JOIN paid p ON p.invoice_id = i.id
+        WHERE i.status <> 'CANCELLED'
+        GROUP BY s.school_id
+    )
+    SELECT
+        sc.id AS school_id,
+        COALESCE(st.total_students, 0) AS total_students,
+        COALESCE(st.active_students, 0) AS active_students,
+        COALESCE(it.total_invoiced, 0) AS total_invoiced,
+        COALESCE(it.total_paid, 0) AS total_paid
+    FROM schools sc
+    LEFT JOIN students_totals st ON st.school_id = sc.id
+    LEFT JOIN invoice_totals it ON it.school_id = sc.id
+    WHERE (CAST(:school_id AS INTEGER) IS NULL OR sc.id = :school_id)
+"""
+
+@instrument_repository
+class SQLAlchemySchoolBalanceRepository(SchoolBalanceRepositoryInterface):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply(self, school_id: int, students_delta: int = 0, active_delta: int = 0,
+                    invoiced_delta: Decimal = Decimal("0"), paid_delta: Decimal = Decimal("0")) -> None:
+        # Sin commit: se confirma en la misma transacción que la escritura que lo origina
+        if not (students_delta or active_delta or invoiced_delta or paid_delta):
+            return
+
+        stmt = insert(SchoolBalance).values(
+            school_id=school_id,
+            total_students=students_delta,
+            active_students=active_delta,
+            total_invoiced=invoiced_delta,
+            total_paid=paid_delta
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SchoolBalance.school_id],
+            set_={
+                "total_students": SchoolBalance.total_students + stmt.excluded.total_students,
+                "active_students": SchoolBalance.active_students + stmt.excluded.active_students,
+                "total_invoiced": SchoolBalance.total_invoiced + stmt.excluded.total_invoiced,
+                "total_paid": SchoolBalance.total_paid + stmt.excluded.total_paid,
+                "updated_at": func.now()
+            }
+        )
+        await self.session.execute(stmt)
+
+    async def move_student_balance(self, student_id: int, from_school_id: int, to_school_id: Optional[int]) -> None:
+        # Trasladar los montos acumulados del estudiante (to_school_id=None al eliminarlo)
+        stmt = text("""
+            WITH b AS (
+                SELECT total_invoiced, total_paid FROM student_balances WHERE student_id = :student_id
+            )
+            UPDATE school_balances sb SET
+                total_invoiced = sb.total_invoiced + CASE WHEN sb.school_id = :from_school_id THEN -b.total_invoiced ELSE b.total_invoiced END,
+                total_paid = sb.total_paid + CASE WHEN sb.school_id = :from_school_id THEN -b.total_paid ELSE b.total_paid END,
+                updated_at = now()
+            FROM b
+            WHERE sb.school_id IN (:from_school_id, :to_school_id)
+        """)
+        if to_school_id is not None:
+            # Asegurar que el colegio destino tenga fila antes del UPDATE
+            await self.session.execute(insert(SchoolBalance).values(school_id=to_school_id).on_conflict_do_nothing())
+        await self.session.execute(stmt, {
+            "student_id": student_id,
+            "from_school_id": from_school_id,
+            "to_school_id": to_school_id
+        })
+
+    async def get_account_summary(self, school_id: int) -> dict:
+        # Totales desde el resumen. Lo vencido depende de la fecha y de cada pago, anulación o
+        # cambio de vencimiento: se suma en cada lectura sobre las facturas abiertas ya vencidas
+        # de los estudiantes del colegio (ix_invoices_student_open_due), como en el del estudiante
+        stmt = text("""
+            SELECT
+                sc.name as school_name,
+                COALESCE(b.total_students, 0) as total_students,
+                COALESCE(b.active_students, 0) as active_students,
+                COALESCE(b.total_invoiced, 0) as total_invoiced,
+                COALESCE(b.total_paid, 0) as total_paid,
+                (
+                    SELECT COALESCE(SUM(i.amount - COALESCE((
+                        SELECT SUM(p.amount) FROM payments p
+                        WHERE p.invoice_id = i.id AND p.is_confirmed
+                    ), 0)), 0)
+                    FROM students s
+                    JOIN invoices i ON i.student_id = s.id
+                    WHERE s.school_id = sc.id
+                      AND i.status IN ('PENDING', 'OVERDUE')
+                      AND i.due_date < CURRENT_DATE
+                ) as overdue_amount,
+                b.updated_at
+            FROM schools sc
+            LEFT JOIN school_balances b ON b.school_id = sc.id
+            WHERE sc.id = :school_id
+        """)
+
+        result = await self.session.execute(stmt, {"school_id": school_id})
+        row = result.fetchone()
+        if row is None:
+            raise ValueError(f"School with id {school_id} not found")
+
+        total_invoiced = Decimal(str(row.total_invoiced))
+        total_paid = Decimal(str(row.total_paid))
+        return {
+            "school_name": row.school_name,
+            "total_students": row.total_students,
+            "active_students": row.active_students,
+            "total_invoiced": total_invoiced,
+            "total_paid": total_paid,
+            "total_pending": total_invoiced - total_paid,
+            "overdue_amount": Decimal(str(row.overdue_amount)),
+            "updated_at": row.updated_at
+        }
+
+    async def get_statement_version(self, school_id: int, recent_invoices: int) -> Optional[str]:
+        # school_balances.updated_at cambia con cada movimiento del ledger del colegio; las
+        # facturas recientes se versionan aparte (estado, pagos y estudiante anidado) y las
+        # vencidas abiertas por cantidad y último cambio, porque un cambio de vencimiento no
+        # mueve el ledger pero sí lo vencido
+        stmt = text("""
+            WITH recent AS (
+                SELECT i.id, i.updated_at, i.student_id
+                FROM invoices i
+                JOIN students s ON s.id = i.student_id
+                WHERE s.school_id = :school_id
+                ORDER BY i.created_at DESC, i.id DESC
+                LIMIT :recent_invoices
+            )
+            SELECT concat_ws('|', CURRENT_DATE, sc.updated_at, b.updated_at, (
+                SELECT md5(string_agg(concat(r.id, '@', r.updated_at, ':', st.updated_at, ':', (
+                    SELECT concat(COUNT(*), '@', MAX(p.updated_at)) FROM payments p WHERE p.invoice_id = r.id
+                )), ',' ORDER BY r.id))
+                FROM recent r
+                JOIN students st ON st.id = r.student_id
+            ), (
+                SELECT concat(COUNT(*), '@', MAX(i.updated_at))
+                FROM students s
+                JOIN invoices i ON i.student_id = s.id
+                WHERE s.school_id = sc.id
+                  AND i.status IN ('PENDING', 'OVERDUE')
+                  AND i.due_date < CURRENT_DATE
+            )) AS version
+            FROM schools sc
+            LEFT JOIN school_balances b ON b.school_id = sc.id
+            WHERE sc.id = :school_id
+        """)
+        result = await self.session.execute(stmt, {"school_id": school_id, "recent_invoices": recent_invoices})
+        return result.scalar_one_or_none()
+
+    async def find_drift(self, school_id: Optional[int] = None) -> List[dict]:
+        stmt = text(f"""
+            SELECT
+                e.school_id,
+                e.total_students AS expected_students,
+                e.active_students AS expected_active,
+                e.total_invoiced AS expected_invoiced,
+                e.total_paid AS expected_paid,
+                COALESCE(b.total_students, 0) AS rollup_students,
+                COALESCE(b.active_students, 0) AS rollup_active,
+                COALESCE(b.total_invoiced, 0) AS rollup_invoiced,
+                COALESCE(b.total_paid, 0) AS rollup_paid
+            FROM ({EXPECTED_ROLLUPS_SQL}) e
+            LEFT JOIN school_balances b ON b.school_id = e.school_id
+            WHERE e.total_students <> COALESCE(b.total_students, 0)
+               OR e.active_students <> COALESCE(b.active_students, 0)
+               OR e.total_invoiced <> COALESCE(b.total_invoiced, 0)
+               OR e.total_paid <> COALESCE(b.total_paid, 0)
+            ORDER BY e.school_id
+        """)
+        result = await self.session.execute(stmt, {"school_id": school_id})
+        return [dict(row._mapping) for row in result]
+
+    async def refresh(self, school_id: Optional[int] = None) -> int:
+        stmt = text(f"""
+            INSERT INTO school_balances (
+                school_id, total_students, active_students, total_invoiced, total_paid, updated_at
+            )
+            SELECT
+                school_id, total_students, active_students, total_invoiced, total_paid, now()
+            FROM ({EXPECTED_ROLLUPS_SQL}) e
+            ON CONFLICT (school_id) DO UPDATE SET
+                total_students = EXCLUDED.total_students,
+                active_students = EXCLUDED.active_students,
+                total_invoiced = EXCLUDED.total_invoiced,
+                total_paid = EXCLUDED.total_paid,
+                updated_at = EXCLUDED.updated_at
+        """)
+        result = await self.session.execute(stmt, {"school_id": school_id})
+        return result.rowcount
@@ -5,37 +5,67 @@ from sqlalchemy.orm import selectinload
 from app.domain.models.school import School
 from app.domain.models.student import Student
 from app.domain.repositories.school_repository import SchoolRepositoryInterface
+from app.domain.repositories.pagination import Page, PageVersion
+from app.infrastructure.repositories.pagination import Listing
+from app.infrastructure.repositories.search import search_vector, search_words, match_and_rank, build_ranked_page
+from app.infrastructure.metrics import instrument_repository
+from app.infrastructure.repositories.identity_cache import MISSING, identity_cache
 
+# Claves de orden (terminan en la PK para que el cursor sea único)
+CREATED_KEY = (School.created_at, School.id)
+NAME_KEY = (School.name, School.id)
+# Nombre indexado con GIN (ix_schools_search)
+SEARCH_VECTOR = search_vector(School.name)
+
+@instrument_repository
 class SQLAlchemySchoolRepository(SchoolRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
+        # Compartida con los demás repositorios de la sesión (ver identity_cache)
+        self.cache = identity_cache(session)
 
     async def create(self, school: School) -> School:
+        # Sin commit: lo confirma la unidad de trabajo del servicio
+        self.cache.evict(School)
         self.session.add(school)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(school)
         return school
 
     async def get_by_id(self, school_id: int) -> Optional[School]:
+        cached = self.cache.get(School, "id", school_id)
+        if cached is not MISSING:
+            return cached
         stmt = select(School).where(School.id == school_id)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return self.cache.put(School, "id", school_id, result.scalar_one_or_none())
 
     async def get_by_email(self, email: str) -> Optional[School]:
+        cached = self.cache.get(School, "email", email)
+        if cached is not MISSING:
+            return cached
         stmt = select(School).where(School.email == email)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return self.cache.put(School, "email", email, result.scalar_one_or_none())
 
-    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[School]:
+    @staticmethod
+    def _all_listing(active_only: bool) -> Listing:
         stmt = select(School)
         if active_only:
             stmt = stmt.where(School.is_active == True)
-        
-        stmt = stmt.offset(skip).limit(limit).order_by(School.created_at.desc())
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return Listing(stmt, CREATED_KEY, f"schools:active_only={active_only}", descending=True)
+
+    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[School]:
+        listing = self._all_listing(active_only)
+        result = await self.session.execute(listing.paginate(skip, limit, cursor))
+        return listing.build_page(result.scalars().all(), limit)
+
+    async def get_all_version(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
+        result = await self.session.execute(self._all_listing(active_only).version(School, skip, limit, cursor))
+        return result.all()
 
     async def update(self, school_id: int, school_data: dict) -> Optional[School]:
+        self.cache.evict(School)
         stmt = (
             update(School)
             .where(School.id == school_id)
@@ -43,13 +73,12 @@ class SQLAlchemySchoolRepository(SchoolRepositoryInterface):
             .returning(School)
         )
         result = await self.session.execute(stmt)
-        await self.session.commit()
         return result.scalar_one_or_none()
 
     async def delete(self, school_id: int) -> bool:
+        self.cache.evict_deleted(School)
         stmt = delete(School).where(School.id == school_id)
         result = await self.session.execute(stmt)
-        await self.session.commit()
         return result.rowcount > 0
 
     async def get_students_count(self, school_id: int) -> int:
@@ -59,13 +88,13 @@ class SQLAlchemySchoolRepository(SchoolRepositoryInterface):
         result = await self.session.execute(stmt)
         return result.scalar() or 0
 
-    async def search_by_name(self, name: str, skip: int = 0, limit: int = 100) -> List[School]:
-        stmt = (
-            select(School)
-            .where(School.name.ilike(f"%{name}%"))
-            .offset(skip)
-            .limit(limit)
-            .order_by(School.name)
-        )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+    async def search_by_name(self, name: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[School]:
+        words = search_words(name)
+        if not words:
+            return Page([])
+
+        matches, rank = match_and_rank(SEARCH_VECTOR, words)
+        listing = Listing(select(School, rank).where(matches), (rank, School.id),
+                          f"schools:search:{' '.join(words)}", descending=True)
+        result = await self.session.execute(listing.paginate(skip, limit, cursor))
+        return build_ranked_page(result.all(), limit, listing.signature)
\ No newline at end of file
@@ -0,0 +1,53 @@
+import re
+from typing import Any, List, Sequence, Tuple
+
+from sqlalchemy import ColumnElement, Float, func, literal_column
+
+from app.domain.repositories.pagination import Page
+from app.infrastructure.repositories.pagination import encode_cursor
+
+# Palabras del texto buscado; los signos se descartan igual que en to_tsvector
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def search_vector(*columns: ColumnElement) -> ColumnElement:
+    """Expresión ``search_vector(...)`` indexada con GIN en la migración.
+
+    Las columnas se concatenan con un literal (no un parámetro) para que el
+    planificador reconozca la misma expresión del índice.
+    """
+    text = columns[0]
+    for column in columns[1:]:
+        text = text.concat(literal_column("' '")).concat(column)
+    return func.search_vector(text)
+
+
+def search_words(name: str) -> List[str]:
+    """Palabras del texto buscado (vacío si solo tiene signos)"""
+    return WORD_PATTERN.findall(name)
+
+
+def _tsquery(query: str) -> ColumnElement:
+    return func.to_tsquery(literal_column("'simple'"), func.search_normalize(query))
+
+
+def match_and_rank(vector: ColumnElement, words: Sequence[str]) -> Tuple[ColumnElement, ColumnElement]:
+    """Condición de coincidencia y relevancia, sin acentos ni mayúsculas.
+
+    Todas las palabras deben coincidir por prefijo (``ana:* & lop:*``); las
+    que coinciden completas suman relevancia, así "José" queda antes que
+    "Joseph" al buscar ``jose``.
+    """
+    prefix = _tsquery(" & ".join(f"{word}:*" for word in words))
+    exact = _tsquery(" | ".join(words))
+    rank = func.ts_rank(vector, prefix, type_=Float) + func.ts_rank(vector, exact, type_=Float)
+    return vector.op("@@")(prefix), rank
+
+
+def build_ranked_page(rows: Sequence[Any], limit: int, signature: str) -> Page:
+    """Página de filas ``(entidad, rank)`` con cursor sobre ``(rank, id)`` (``signature``: la del ``Listing``)"""
+    next_cursor = None
+    if rows and len(rows) >= limit:
+        entity, rank = rows[-1]
+        next_cursor = encode_cursor([rank, entity.id], signature)
+    return Page([entity for entity, _ in rows], next_cursor=next_cursor)
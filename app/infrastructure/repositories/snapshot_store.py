@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.domain.repositories.snapshot_repository import SnapshotStoreInterface
+
+MANIFEST_FILE = "manifest.json"
+
+
+class ParquetSnapshotStore(SnapshotStoreInterface):
+    """Archivos Parquet comprimidos (zstd) por tabla, más ``manifest.json`` con la
+    marca de agua y la lista de archivos de cada tabla.
+
+    Cada exportación escribe un archivo nuevo (completo o incremental) y nunca
+    reescribe los anteriores; el consumidor parte del último archivo completo y
+    aplica los incrementales posteriores en orden, quedándose, por ``id``, con
+    la fila de ``updated_at`` más reciente. Los incrementales no traen las
+    filas borradas: solo desaparecen en el siguiente completo.
+    """
+
+    def __init__(self, directory: str, compression: str = "zstd"):
+        self.directory = Path(directory)
+        self.compression = compression
+        self._manifest = self._read_manifest()
+
+    def _read_manifest(self) -> dict:
+        path = self.directory / MANIFEST_FILE
+        if not path.exists():
+            return {"tables": {}}
+        return json.loads(path.read_text())
+
+    def _write_manifest(self) -> None:
+        # Reemplazo atómico: un proceso que lee nunca ve el manifiesto a medio escribir
+        tmp = self.directory / f"{MANIFEST_FILE}.tmp"
+        tmp.write_text(json.dumps(self._manifest, indent=2))
+        os.replace(tmp, self.directory / MANIFEST_FILE)
+
+    def get_watermark(self, table: str) -> Optional[datetime]:
+        watermark = self._manifest["tables"].get(table, {}).get("watermark")
+        return datetime.fromisoformat(watermark) if watermark else None
+
+    def get_last_full(self, table: str) -> Optional[datetime]:
+        files = self._manifest["tables"].get(table, {}).get("files", [])
+        fulls = [entry["until"] for entry in files if entry["kind"] == "full"]
+        return datetime.fromisoformat(fulls[-1]) if fulls else None
+
+    async def write(self, table: str, schema: pa.Schema, batches: AsyncIterator[pa.RecordBatch],
+                    since: Optional[datetime], until: datetime) -> dict:
+        kind = "incremental" if since else "full"
+        path = self.directory / table / f"{table}-{until:%Y%m%dT%H%M%S}-{kind}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".parquet.tmp")
+
+        rows = 0
+        writer = pq.ParquetWriter(tmp, schema, compression=self.compression)
+        try:
+            async for batch in batches:
+                await asyncio.to_thread(writer.write_batch, batch)
+                rows += batch.num_rows
+        except BaseException:
+            writer.close()
+            tmp.unlink(missing_ok=True)
+            raise
+        writer.close()
+        os.replace(tmp, path)
+
+        entry = self._manifest["tables"].setdefault(table, {"files": []})
+        entry["watermark"] = until.isoformat()
+        entry["files"].append({
+            "file": str(path.relative_to(self.directory)),
+            "kind": kind,
+            "rows": rows,
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat()
+        })
+        self._write_manifest()
+        return {"table": table, "file": str(path), "kind": kind, "rows": rows, "bytes": path.stat().st_size}
@@ -0,0 +1,152 @@
+from typing import List, Optional
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.domain.repositories.student_balance_repository import StudentBalanceRepositoryInterface
+from app.infrastructure.metrics import instrument_repository
+
+# Saldos esperados recalculados desde facturas y pagos (fuente de verdad)
+EXPECTED_BALANCES_SQL = """
+    WITH paid AS (
+        SELECT invoice_id, SUM(amount) AS paid
+        FROM payments
+        WHERE is_confirmed
+        GROUP BY invoice_id
+    ),
+    totals AS (
+        SELECT
+            i.student_id,
+            SUM(i.amount) AS total_invoiced,
+            SUM(COALESCE(p.paid, 0)) AS total_paid
+        FROM invoices i
+        LEFT JOIN paid p ON p.invoice_id = i.id
+        WHERE i.status <> 'CANCELLED'
+        GROUP BY i.student_id
+    )
+    SELECT
+        s.id AS student_id,
+        COALESCE(t.total_invoiced, 0) AS total_invoiced,
+        COALESCE(t.total_paid, 0) AS total_paid
+    FROM students s
+    LEFT JOIN totals t ON t.student_id = s.id
+    WHERE (CAST(:student_id AS INTEGER) IS NULL OR s.id = :student_id)
+"""
+
+@instrument_repository
+class SQLAlchemyStudentBalanceRepository(StudentBalanceRepositoryInterface):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply(self, student_id: int, invoiced_delta: Decimal = Decimal("0"), paid_delta: Decimal = Decimal("0")) -> None:
+        # Sin commit: se confirma en la misma transacción que la escritura que lo origina.
+        # El mismo statement propaga el cambio al resumen del colegio (school_balances).
+        if not invoiced_delta and not paid_delta:
+            return
+
+        stmt = text("""
+            WITH student_row AS (
+                INSERT INTO student_balances (student_id, total_invoiced, total_paid)
+                VALUES (:student_id, CAST(:invoiced_delta AS NUMERIC), CAST(:paid_delta AS NUMERIC))
+                ON CONFLICT (student_id) DO UPDATE SET
+                    total_invoiced = student_balances.total_invoiced + EXCLUDED.total_invoiced,
+                    total_paid = student_balances.total_paid + EXCLUDED.total_paid,
+                    updated_at = now()
+                RETURNING student_id
+            )
+            INSERT INTO school_balances (school_id, total_invoiced, total_paid)
+            SELECT s.school_id, CAST(:invoiced_delta AS NUMERIC), CAST(:paid_delta AS NUMERIC)
+            FROM students s
+            JOIN student_row r ON r.student_id = s.id
+            ON CONFLICT (school_id) DO UPDATE SET
+                total_invoiced = school_balances.total_invoiced + EXCLUDED.total_invoiced,
+                total_paid = school_balances.total_paid + EXCLUDED.total_paid,
+                updated_at = now()
+        """)
+        await self.session.execute(stmt, {
+            "student_id": student_id,
+            "invoiced_delta": invoiced_delta,
+            "paid_delta": paid_delta
+        })
+
+    async def get_account_summary(self, student_id: int) -> dict:
+        # Totales: una fila del ledger. Lo vencido no se guarda en el ledger: se calcula en cada
+        # lectura sobre las facturas abiertas y ya vencidas del estudiante (ix_invoices_student_open_due),
+        # así refleja al instante pagos, anulaciones y el cambio de fecha sin depender del barrido.
+        stmt = text("""
+            SELECT
+                COALESCE(b.total_invoiced, 0) as total_invoiced,
+                COALESCE(b.total_paid, 0) as total_paid,
+                (
+                    SELECT COALESCE(SUM(i.amount - COALESCE((
+                        SELECT SUM(p.amount) FROM payments p
+                        WHERE p.invoice_id = i.id AND p.is_confirmed
+                    ), 0)), 0)
+                    FROM invoices i
+                    WHERE i.student_id = :student_id
+                      AND i.status IN ('PENDING', 'OVERDUE')
+                      AND i.due_date < CURRENT_DATE
+                ) as overdue_amount
+            FROM (SELECT CAST(:student_id AS INTEGER) AS student_id) s
+            LEFT JOIN student_balances b ON b.student_id = s.student_id
+        """)
+
+        result = await self.session.execute(stmt, {"student_id": student_id})
+        row = result.fetchone()
+
+        total_invoiced = Decimal(str(row.total_invoiced))
+        total_paid = Decimal(str(row.total_paid))
+        return {
+            "total_invoiced": total_invoiced,
+            "total_paid": total_paid,
+            "total_pending": total_invoiced - total_paid,
+            "overdue_amount": Decimal(str(row.overdue_amount))
+        }
+
+    async def get_statement_version(self, student_id: int) -> Optional[str]:
+        # Sonda de índices: filas que componen el estado y sus updated_at, sin sumar montos.
+        # CURRENT_DATE porque lo vencido cambia con la fecha aunque nada se escriba.
+        stmt = text("""
+            SELECT concat_ws('|', CURRENT_DATE, s.updated_at, sc.updated_at, b.updated_at,
+                (SELECT concat(COUNT(*), '@', MAX(i.updated_at))
+                 FROM invoices i WHERE i.student_id = s.id),
+                (SELECT concat(COUNT(*), '@', MAX(p.updated_at))
+                 FROM payments p JOIN invoices i ON i.id = p.invoice_id
+                 WHERE i.student_id = s.id)
+            ) AS version
+            FROM students s
+            LEFT JOIN schools sc ON sc.id = s.school_id
+            LEFT JOIN student_balances b ON b.student_id = s.id
+            WHERE s.id = :student_id
+        """)
+        result = await self.session.execute(stmt, {"student_id": student_id})
+        return result.scalar_one_or_none()
+
+    async def find_drift(self, student_id: Optional[int] = None) -> List[dict]:
+        stmt = text(f"""
+            SELECT
+                e.student_id,
+                e.total_invoiced AS expected_invoiced,
+                e.total_paid AS expected_paid,
+                COALESCE(b.total_invoiced, 0) AS ledger_invoiced,
+                COALESCE(b.total_paid, 0) AS ledger_paid
+            FROM ({EXPECTED_BALANCES_SQL}) e
+            LEFT JOIN student_balances b ON b.student_id = e.student_id
+            WHERE e.total_invoiced <> COALESCE(b.total_invoiced, 0)
+               OR e.total_paid <> COALESCE(b.total_paid, 0)
+            ORDER BY e.student_id
+        """)
+        result = await self.session.execute(stmt, {"student_id": student_id})
+        return [dict(row._mapping) for row in result]
+
+    async def rebuild(self, student_id: Optional[int] = None) -> int:
+        stmt = text(f"""
+            INSERT INTO student_balances (student_id, total_invoiced, total_paid, updated_at)
+            SELECT student_id, total_invoiced, total_paid, now()
+            FROM ({EXPECTED_BALANCES_SQL}) e
+            ON CONFLICT (student_id) DO UPDATE SET
+                total_invoiced = EXCLUDED.total_invoiced,
+                total_paid = EXCLUDED.total_paid,
+                updated_at = EXCLUDED.updated_at
+        """)
+        result = await self.session.execute(stmt, {"student_id": student_id})
+        return result.rowcount
@@ -0,0 +1,140 @@
+import asyncio
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.domain.models.student import Student
+from app.domain.repositories.student_lookup_index import (
+    LookupEntriesLoader, StudentLookupEntry, StudentLookupIndexInterface
+)
+
+
+@lru_cache(maxsize=65536)
+def normalize(value: str) -> str:
+    """Minúsculas, sin acentos y con espacios simples (como search_normalize en SQL)"""
+    if value.isascii():
+        return " ".join(value.lower().split())
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def lookup_keys(entry: StudentLookupEntry) -> List[str]:
+    """Claves por las que se encuentra un estudiante: nombre, apellido y código"""
+    # Nombres y apellidos se repiten mucho: se normalizan por separado para aprovechar la caché
+    first_name, last_name = normalize(entry.first_name), normalize(entry.last_name)
+    return [f"{first_name} {last_name}", f"{last_name} {first_name}", entry.student_id.casefold()]
+
+
+class _IndexState:
+    """Contenido completo del índice: arreglos ordenados de ``(clave, id)`` por colegio y sus entradas"""
+
+    __slots__ = ("keys", "entries")
+
+    def __init__(self, keys: Dict[int, List[Tuple[str, int]]], entries: Dict[int, StudentLookupEntry]):
+        self.keys = keys
+        self.entries = entries
+
+    @classmethod
+    def build(cls, entries: Iterable[StudentLookupEntry]) -> "_IndexState":
+        keys: Dict[int, List[Tuple[str, int]]] = {}
+        students: Dict[int, StudentLookupEntry] = {}
+        for entry in entries:
+            students[entry.id] = entry
+            keys.setdefault(entry.school_id, []).extend((key, entry.id) for key in lookup_keys(entry))
+        for school_keys in keys.values():
+            school_keys.sort()
+        return cls(keys, students)
+
+    def put(self, student_id: int, entry: Optional[StudentLookupEntry]) -> None:
+        """Reemplazar las claves del estudiante por las de ``entry`` (``None`` lo retira)"""
+        previous = self.entries.pop(student_id, None)
+        if previous is not None:
+            school_keys = self.keys.get(previous.school_id, [])
+            for key in lookup_keys(previous):
+                position = bisect_left(school_keys, (key, student_id))
+                if position < len(school_keys) and school_keys[position] == (key, student_id):
+                    del school_keys[position]
+        if entry is not None:
+            self.entries[student_id] = entry
+            school_keys = self.keys.setdefault(entry.school_id, [])
+            for key in lookup_keys(entry):
+                insort(school_keys, (key, student_id))
+
+
+class InMemoryStudentLookupIndex(StudentLookupIndexInterface):
+    """Arreglos ordenados de ``(clave, id)`` por colegio, consultados con bisect.
+
+    Vive en la memoria del proceso: se carga al iniciar la aplicación, se
+    actualiza desde ``StudentService`` después de cada commit y se recarga
+    periódicamente para incorporar cambios hechos por otros procesos.
+
+    Todo el contenido está en un solo ``_IndexState`` que una recarga
+    reemplaza de una vez desde el event loop; los cambios hechos mientras se
+    leía y construía la copia nueva se registran y se vuelven a aplicar sobre
+    ella antes del reemplazo.
+    """
+
+    def __init__(self):
+        self._state = _IndexState({}, {})
+        # Cambios registrados por cada recarga en curso
+        self._journals: List[List[Tuple[int, Optional[StudentLookupEntry]]]] = []
+
+    def replace_all(self, entries: Iterable[StudentLookupEntry]) -> None:
+        self._state = _IndexState.build(entries)
+
+    async def reload(self, load: LookupEntriesLoader) -> int:
+        journal: List[Tuple[int, Optional[StudentLookupEntry]]] = []
+        self._journals.append(journal)
+        try:
+            entries = await load()
+            # Construirlo fuera del event loop: con muchos estudiantes toma segundos
+            state = await asyncio.to_thread(_IndexState.build, entries)
+        finally:
+            self._journals = [pending for pending in self._journals if pending is not journal]
+        # Sin await entre la reproducción y el reemplazo: ningún cambio queda afuera
+        for student_id, entry in journal:
+            state.put(student_id, entry)
+        self._state = state
+        return len(entries)
+
+    def _put(self, student_id: int, entry: Optional[StudentLookupEntry]) -> None:
+        self._state.put(student_id, entry)
+        for journal in self._journals:
+            journal.append((student_id, entry))
+
+    def upsert(self, student: Student) -> None:
+        if not student.is_active:
+            self._put(student.id, None)
+            return
+        self._put(student.id, StudentLookupEntry(
+            id=student.id,
+            school_id=student.school_id,
+            student_id=student.student_id,
+            first_name=student.first_name,
+            last_name=student.last_name
+        ))
+
+    def remove(self, student_id: int) -> None:
+        self._put(student_id, None)
+
+    def search(self, school_id: int, prefix: str, limit: int = 10) -> List[StudentLookupEntry]:
+        prefix = normalize(prefix)
+        state = self._state
+        school_keys = state.keys.get(school_id)
+        if not prefix or not school_keys:
+            return []
+
+        results: Dict[int, StudentLookupEntry] = {}
+        position = bisect_left(school_keys, (prefix,))
+        while position < len(school_keys) and len(results) < limit:
+            key, student_id = school_keys[position]
+            if not key.startswith(prefix):
+                break
+            results.setdefault(student_id, state.entries[student_id])
+            position += 1
+        return list(results.values())
+
+
+# Instancia del proceso, compartida por todos los requests
+student_lookup_index = InMemoryStudentLookupIndex()
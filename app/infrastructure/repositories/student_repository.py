@@ -1,63 +1,116 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, func, and_, or_
 from sqlalchemy.orm import selectinload
 from app.domain.models.student import Student
 from app.domain.models.school import School
 from app.domain.repositories.student_repository import StudentRepositoryInterface
+from app.domain.repositories.pagination import Page, PageVersion
+from app.domain.repositories.student_lookup_index import StudentLookupEntry
+from app.infrastructure.repositories.pagination import Listing
+from app.infrastructure.repositories.search import search_vector, search_words, match_and_rank, build_ranked_page
+from app.infrastructure.metrics import instrument_repository
+from app.infrastructure.repositories.identity_cache import MISSING, identity_cache
+from app.infrastructure.repositories.batch_loader import any_id, batch_loader
 
+# Claves de orden (terminan en la PK para que el cursor sea único)
+CREATED_KEY = (Student.created_at, Student.id)
+NAME_KEY = (Student.first_name, Student.last_name, Student.id)
+# Nombre completo indexado con GIN (ix_students_search)
+SEARCH_VECTOR = search_vector(Student.first_name, Student.last_name)
+
+@instrument_repository
 class SQLAlchemyStudentRepository(StudentRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
+        # Compartida con los demás repositorios de la sesión (ver identity_cache)
+        self.cache = identity_cache(session)
+        # Agrupa los get_by_id concurrentes en una consulta (ver batch_loader)
+        self.loader = batch_loader(session)
 
     async def create(self, student: Student) -> Student:
+        # Sin commit: lo confirma la unidad de trabajo del servicio
+        self.cache.evict(Student)
         self.session.add(student)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(student)
         return student
 
     async def get_by_id(self, student_id: int) -> Optional[Student]:
+        cached = self.cache.get(Student, "id", student_id)
+        if cached is not MISSING:
+            return cached
+        # Se agrupa con los demás get_by_id pedidos en el mismo ciclo del event loop
+        return await self.loader.load(Student, student_id, self._load_by_ids)
+
+    async def _load_by_ids(self, ids: List[int]) -> Dict[int, Student]:
         stmt = (
             select(Student)
             .options(selectinload(Student.school))
-            .where(Student.id == student_id)
+            .where(any_id(Student.id, ids))
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        found = {row.id: row for row in result.scalars()}
+        for student_id in ids:
+            self.cache.put(Student, "id", student_id, found.get(student_id))
+        return found
 
     async def get_by_student_id(self, student_id: str) -> Optional[Student]:
+        cached = self.cache.get(Student, "student_id", student_id)
+        if cached is not MISSING:
+            return cached
         stmt = (
             select(Student)
             .options(selectinload(Student.school))
             .where(Student.student_id == student_id)
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return self.cache.put(Student, "student_id", student_id, result.scalar_one_or_none())
 
     async def get_by_email(self, email: str) -> Optional[Student]:
+        cached = self.cache.get(Student, "email", email)
+        if cached is not MISSING:
+            return cached
         stmt = select(Student).where(Student.email == email)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return self.cache.put(Student, "email", email, result.scalar_one_or_none())
+
+    async def _fetch_page(self, listing: Listing, skip: int, limit: int, cursor: Optional[str]) -> Page[Student]:
+        result = await self.session.execute(listing.paginate(skip, limit, cursor))
+        return listing.build_page(result.scalars().all(), limit)
 
-    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Student]:
+    async def _page_version(self, listing: Listing, skip: int, limit: int, cursor: Optional[str]) -> PageVersion:
+        result = await self.session.execute(listing.version(Student, skip, limit, cursor))
+        return result.all()
+
+    @staticmethod
+    def _all_listing(active_only: bool) -> Listing:
         stmt = select(Student).options(selectinload(Student.school))
         if active_only:
             stmt = stmt.where(Student.is_active == True)
-        
-        stmt = stmt.offset(skip).limit(limit).order_by(Student.created_at.desc())
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return Listing(stmt, CREATED_KEY, f"students:active_only={active_only}", descending=True)
 
-    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Student]:
+    @staticmethod
+    def _school_listing(school_id: int, active_only: bool) -> Listing:
         stmt = select(Student).where(Student.school_id == school_id)
         if active_only:
             stmt = stmt.where(Student.is_active == True)
-        
-        stmt = stmt.offset(skip).limit(limit).order_by(Student.first_name, Student.last_name)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return Listing(stmt, NAME_KEY, f"students:school:{school_id}:active_only={active_only}")
+
+    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[Student]:
+        return await self._fetch_page(self._all_listing(active_only), skip, limit, cursor)
+
+    async def get_all_version(self, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._all_listing(active_only), skip, limit, cursor)
+
+    async def get_by_school(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> Page[Student]:
+        return await self._fetch_page(self._school_listing(school_id, active_only), skip, limit, cursor)
+
+    async def get_by_school_version(self, school_id: int, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: Optional[str] = None) -> PageVersion:
+        return await self._page_version(self._school_listing(school_id, active_only), skip, limit, cursor)
 
     async def update(self, student_id: int, student_data: dict) -> Optional[Student]:
+        self.cache.evict(Student)
         stmt = (
             update(Student)
             .where(Student.id == student_id)
@@ -65,28 +118,33 @@ class SQLAlchemyStudentRepository(StudentRepositoryInterface):
             .returning(Student)
         )
         result = await self.session.execute(stmt)
-        await self.session.commit()
         return result.scalar_one_or_none()
 
     async def delete(self, student_id: int) -> bool:
+        self.cache.evict_deleted(Student)
         stmt = delete(Student).where(Student.id == student_id)
         result = await self.session.execute(stmt)
-        await self.session.commit()
         return result.rowcount > 0
 
-    async def search_by_name(self, name: str, school_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Student]:
-        full_name_concat = func.concat(Student.first_name, ' ', Student.last_name)
-        stmt = select(Student).where(
-            or_(
-                Student.first_name.ilike(f"%{name}%"),
-                Student.last_name.ilike(f"%{name}%"),
-                full_name_concat.ilike(f"%{name}%")
-            )
-        )
-        
+    async def search_by_name(self, name: str, school_id: Optional[int] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page[Student]:
+        # Cada palabra coincide por prefijo con el nombre o el apellido; más relevantes primero
+        words = search_words(name)
+        if not words:
+            return Page([])
+
+        matches, rank = match_and_rank(SEARCH_VECTOR, words)
+        stmt = select(Student, rank).where(matches)
         if school_id:
             stmt = stmt.where(Student.school_id == school_id)
-        
-        stmt = stmt.offset(skip).limit(limit).order_by(Student.first_name, Student.last_name)
+
+        listing = Listing(stmt, (rank, Student.id), f"students:search:{school_id}:{' '.join(words)}", descending=True)
+        result = await self.session.execute(listing.paginate(skip, limit, cursor))
+        return build_ranked_page(result.all(), limit, listing.signature)
+
+    async def get_lookup_entries(self) -> List[StudentLookupEntry]:
+        # Solo las columnas del índice de autocompletado, sin cargar entidades
+        stmt = select(
+            Student.id, Student.school_id, Student.student_id, Student.first_name, Student.last_name
+        ).where(Student.is_active == True)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        return [StudentLookupEntry(*row) for row in result]
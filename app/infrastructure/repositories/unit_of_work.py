@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.repositories.unit_of_work import UnitOfWorkInterface
+
+class SQLAlchemyUnitOfWork(UnitOfWorkInterface):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
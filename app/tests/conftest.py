@@ -0,0 +1,126 @@
+"""Fixtures compartidas: la app contra PostgreSQL, cada prueba dentro de una transacción que se revierte.
+
+Las pruebas que usan ``client`` o ``session`` necesitan la base de datos de
+``DATABASE_URL_ASYNC`` con las migraciones aplicadas; si no responde se omiten.
+Cada request abre su propia ``AsyncSession`` sobre la misma conexión y sus
+``commit`` solo liberan un savepoint: al terminar la prueba se revierte todo.
+"""
+import asyncio
+from datetime import date, timedelta
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import account_statement_cache
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.database import async_engine, get_db, get_stream_db
+from app.infrastructure.database.query_stats import track_queries
+from main import app
+
+API = "/api/v1"
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # Un solo loop para toda la sesión: las conexiones del pool quedan ligadas a él
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture
+async def connection():
+    try:
+        connection = await async_engine.connect()
+    except (OSError, DBAPIError) as error:
+        pytest.skip(f"Database not available: {error}")
+    transaction = await connection.begin()
+    try:
+        yield connection
+    finally:
+        await transaction.rollback()
+        await connection.close()
+
+
+@pytest_asyncio.fixture
+async def session(connection):
+    async with AsyncSession(bind=connection, expire_on_commit=False,
+                            join_transaction_mode="create_savepoint") as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def client(connection, monkeypatch):
+    async def get_test_db():
+        session = AsyncSession(bind=connection, expire_on_commit=False,
+                               join_transaction_mode="create_savepoint")
+        # El SAVEPOINT de la prueba y su reversión se cuentan aparte, no en el request
+        with track_queries():
+            await session.connection()
+        try:
+            yield session
+        finally:
+            with track_queries():
+                await session.close()
+
+    async def get_test_stream_db():
+        # Sin teardown, como get_stream_db: la cierra la respuesta en streaming
+        return AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+
+    # Presupuestos de sentencias y umbral de N+1 como errores (el middleware lee el valor por request)
+    monkeypatch.setattr(settings, "QUERY_STATS_STRICT", True)
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_stream_db] = get_test_stream_db
+    account_statement_cache.clear()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                     base_url=f"http://test{API}") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        account_statement_cache.clear()
+
+
+@pytest_asyncio.fixture
+async def school_data(client):
+    """Un colegio con 12 estudiantes, una factura por estudiante (una vencida) y dos pagos.
+
+    Doce filas por listado: más que ``QUERY_REPEAT_THRESHOLD``, así una consulta
+    por fila hace fallar el request en modo estricto.
+    """
+    school = (await client.post("/schools/", json={"name": "Colegio de prueba", "email": "colegio@example.com"})).json()
+    students = []
+    for number in range(12):
+        response = await client.post("/students/", json={
+            "first_name": f"Estudiante{number}", "last_name": "Prueba", "student_id": f"T{number:03d}",
+            "enrollment_date": "2024-01-01", "school_id": school["id"],
+        })
+        assert response.status_code == 201, response.text
+        students.append(response.json())
+    billing = await client.post("/invoices/billing-run", json={
+        "school_id": school["id"], "amount": "100.00", "due_date": (date.today() + timedelta(days=10)).isoformat(),
+    })
+    assert billing.status_code == 200, billing.text
+    invoices = (await client.get(f"/invoices/school/{school['id']}")).json()
+    # Las facturas nuevas no pueden vencer en el pasado: se crea y luego se adelanta el vencimiento
+    overdue = await client.post("/invoices/", json={
+        "amount": "50.00", "due_date": date.today().isoformat(), "student_id": students[0]["id"],
+    })
+    assert overdue.status_code == 201, overdue.text
+    overdue = await client.put(f"/invoices/{overdue.json()['id']}", json={
+        "due_date": (date.today() - timedelta(days=5)).isoformat(),
+    })
+    assert overdue.status_code == 200, overdue.text
+    payments = []
+    for invoice, amount in ((invoices[0], "40.00"), (invoices[1], "100.00")):
+        response = await client.post("/payments/", json={
+            "amount": amount, "payment_date": date.today().isoformat(),
+            "payment_method": "CASH", "invoice_id": invoice["id"],
+        })
+        assert response.status_code == 201, response.text
+        payments.append(response.json())
+    return {"school": school, "students": students, "invoices": invoices,
+            "overdue": overdue.json(), "payments": payments}
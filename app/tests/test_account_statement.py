@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.infrastructure.repositories.student_balance_repository import SQLAlchemyStudentBalanceRepository
+
+
+def student_totals(data, student_id):
+    invoices = [invoice for invoice in data["invoices"] if invoice["student_id"] == student_id]
+    if data["overdue"]["student_id"] == student_id:
+        invoices.append(data["overdue"])
+    invoiced = sum(Decimal(invoice["amount"]) for invoice in invoices)
+    ids = {invoice["id"] for invoice in invoices}
+    paid = sum((Decimal(payment["amount"]) for payment in data["payments"] if payment["invoice_id"] in ids), Decimal("0"))
+    return invoiced, paid
+
+
+@pytest.mark.asyncio
+async def test_student_statement_totals_come_from_the_ledger(client, school_data, session):
+    for student_id in {invoice["student_id"] for invoice in school_data["invoices"][:2]} | {school_data["overdue"]["student_id"]}:
+        statement = (await client.get(f"/account-statements/student/{student_id}")).json()
+        invoiced, paid = student_totals(school_data, student_id)
+        assert Decimal(statement["total_invoiced"]) == invoiced
+        assert Decimal(statement["total_paid"]) == paid
+        assert Decimal(statement["total_pending"]) == invoiced - paid
+
+    # Los deltas aplicados en cada escritura coinciden con el recálculo desde facturas y pagos
+    assert await SQLAlchemyStudentBalanceRepository(session).find_drift() == []
+
+
+@pytest.mark.asyncio
+async def test_student_overdue_amount_is_computed_on_each_read(client, school_data):
+    overdue = school_data["overdue"]
+    url = f"/account-statements/student/{overdue['student_id']}"
+    assert Decimal((await client.get(url)).json()["overdue_amount"]) == Decimal("50.00")
+
+    response = await client.post("/payments/", json={
+        "amount": "20.00", "payment_date": date.today().isoformat(),
+        "payment_method": "CASH", "invoice_id": overdue["id"],
+    })
+    assert response.status_code == 201, response.text
+    # Sin barrido ni recálculo del ledger: lo vencido ya descuenta el pago
+    assert Decimal((await client.get(url)).json()["overdue_amount"]) == Decimal("30.00")
+
+
+@pytest.mark.asyncio
+async def test_school_overdue_amount_is_computed_on_each_read(client, school_data):
+    overdue = school_data["overdue"]
+    url = f"/account-statements/school/{school_data['school']['id']}"
+    student_url = f"/account-statements/student/{overdue['student_id']}"
+    # Sin refresco previo del resumen
+    assert Decimal((await client.get(url)).json()["overdue_amount"]) == Decimal("50.00")
+
+    for invoice, amount in ((overdue, "20.00"), (school_data["invoices"][5], "30.00")):
+        response = await client.post("/payments/", json={
+            "amount": amount, "payment_date": date.today().isoformat(),
+            "payment_method": "CASH", "invoice_id": invoice["id"],
+        })
+        assert response.status_code == 201, response.text
+    # Solo cuenta el pago sobre la factura vencida, igual que en el estado del estudiante
+    school = Decimal((await client.get(url)).json()["overdue_amount"])
+    assert school == Decimal((await client.get(student_url)).json()["overdue_amount"]) == Decimal("30.00")
+
+    # Mover el vencimiento también cambia lo vencido sin pasar por el ledger
+    response = await client.put(f"/invoices/{overdue['id']}", json={"due_date": date.today().isoformat()})
+    assert response.status_code == 200, response.text
+    assert Decimal((await client.get(url)).json()["overdue_amount"]) == Decimal("0")
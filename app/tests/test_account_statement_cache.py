@@ -0,0 +1,175 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.api.dependencies import account_statement_cache
+from app.infrastructure.database.query_stats import install_query_stats, track_queries
+from app.infrastructure.repositories.account_statement_cache import InMemoryAccountStatementCache
+
+KEY = ("student", 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSource:
+    """Estado y sonda de prueba: ``version`` cambia cuando la prueba simula un commit"""
+
+    def __init__(self):
+        self.version = "v1"
+        self.loads = 0
+        self.probes = 0
+
+    async def load(self):
+        self.loads += 1
+        await asyncio.sleep(0)
+        return {"school_id": 1, "version": self.version}, self.version
+
+    async def revalidate(self, key, cached_version):
+        self.probes += 1
+        if self.version == cached_version:
+            return None
+        return await self.load()
+
+
+def make_cache(source, clock, stale_ttl=10):
+    return InMemoryAccountStatementCache(ttl=10, stale_ttl=stale_ttl, revalidate=source.revalidate, clock=clock)
+
+
+async def settle(cache):
+    await asyncio.gather(*list(cache._tasks))
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_are_served_without_loading_or_probing():
+    source, clock = FakeSource(), FakeClock()
+    cache = make_cache(source, clock)
+
+    assert await cache.get(KEY, source.load) == ({"school_id": 1, "version": "v1"}, "v1")
+    clock.now = 9
+    assert (await cache.get(KEY, source.load))[1] == "v1"
+    assert (source.loads, source.probes) == (1, 0)
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_and_renewed_when_the_probe_is_unchanged():
+    source, clock = FakeSource(), FakeClock()
+    cache = make_cache(source, clock)
+    await cache.get(KEY, source.load)
+
+    clock.now = 15
+    assert (await cache.get(KEY, source.load))[1] == "v1"
+    await settle(cache)
+    assert (source.loads, source.probes) == (1, 1)
+
+    # Renovada: vigente otra vez sin recalcular
+    clock.now = 24
+    await cache.get(KEY, source.load)
+    assert (source.loads, source.probes) == (1, 1)
+    stats = cache.stats()
+    assert (stats["stale_hits"], stats["revalidations"], stats["unchanged_revalidations"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_replaced_in_the_background_when_the_probe_changed():
+    source, clock = FakeSource(), FakeClock()
+    cache = make_cache(source, clock)
+    await cache.get(KEY, source.load)
+
+    source.version = "v2"
+    clock.now = 15
+    # El lector no espera: recibe el valor anterior con su propia versión
+    value, version = await cache.get(KEY, source.load)
+    assert value["version"] == version == "v1"
+    await settle(cache)
+
+    value, version = await cache.get(KEY, source.load)
+    assert value["version"] == version == "v2"
+    assert cache.stats()["unchanged_revalidations"] == 0
+
+
+@pytest.mark.asyncio
+async def test_background_revalidation_is_not_charged_to_the_request_that_triggered_it():
+    engine = create_engine("sqlite://")
+    install_query_stats(engine)
+    source, clock = FakeSource(), FakeClock()
+
+    async def revalidate(key, cached_version):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return await source.revalidate(key, cached_version)
+
+    cache = InMemoryAccountStatementCache(ttl=10, stale_ttl=10, revalidate=revalidate, clock=clock)
+    await cache.get(KEY, source.load)
+    clock.now = 15
+    try:
+        # Como un request con query_budget(0) en modo estricto que recibe la entrada vencida
+        with track_queries(budget=0, strict=True) as stats:
+            await cache.get(KEY, source.load)
+            await settle(cache)
+    finally:
+        engine.dispose()
+    assert stats.count == 0
+    assert cache.stats()["revalidation_errors"] == 0
+    assert cache.stats()["unchanged_revalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_past_the_stale_window_are_loaded_by_the_request():
+    source, clock = FakeSource(), FakeClock()
+    cache = make_cache(source, clock)
+    await cache.get(KEY, source.load)
+
+    source.version = "v2"
+    clock.now = 25
+    assert (await cache.get(KEY, source.load))[1] == "v2"
+    assert (source.loads, source.probes, cache.stats()["misses"]) == (2, 0, 2)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load_and_invalidation_discards_it():
+    source, clock = FakeSource(), FakeClock()
+    cache = make_cache(source, clock)
+
+    results = await asyncio.gather(*(cache.get(KEY, source.load) for _ in range(3)))
+    assert [version for _, version in results] == ["v1"] * 3
+    assert source.loads == 1 and cache.stats()["coalesced"] == 2
+
+    cache.invalidate(KEY)
+    load = asyncio.ensure_future(cache.get(KEY, source.load))
+    await asyncio.sleep(0)
+    # Un commit durante la carga: su resultado no se guarda
+    cache.invalidate(KEY)
+    await load
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_statement_answers_304_without_queries(client, school_data):
+    student_id = school_data["invoices"][0]["student_id"]
+    url = f"/account-statements/student/{student_id}"
+    first = await client.get(url)
+    assert first.status_code == 200
+
+    cached = await client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+    assert cached.headers["X-DB-Queries"] == "0"
+
+    # Un pago invalida la entrada: la siguiente lectura sondea y cambia el ETag
+    response = await client.post("/payments/", json={
+        "amount": "10.00", "payment_date": date.today().isoformat(),
+        "payment_method": "CASH", "invoice_id": school_data["invoices"][0]["id"],
+    })
+    assert response.status_code == 201, response.text
+    changed = await client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert account_statement_cache.stats()["entries"] == 1
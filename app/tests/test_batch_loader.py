@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.infrastructure.database.database import async_engine
+from app.infrastructure.repositories.batch_loader import BatchLoader
+from app.infrastructure.repositories.invoice_repository import SQLAlchemyInvoiceRepository
+from app.infrastructure.repositories.student_repository import SQLAlchemyStudentRepository
+
+
+class FakeTable:
+    """``load_many`` de prueba: registra los lotes y cuántas cargas corren a la vez"""
+
+    def __init__(self, rows, tracker):
+        self.rows = rows
+        self.tracker = tracker
+        self.batches = []
+
+    async def load_many(self, keys):
+        self.batches.append(sorted(keys))
+        self.tracker["in_flight"] += 1
+        self.tracker["max_in_flight"] = max(self.tracker["max_in_flight"], self.tracker["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+            return {key: self.rows[key] for key in keys if key in self.rows}
+        finally:
+            self.tracker["in_flight"] -= 1
+
+
+class Student:
+    pass
+
+
+class Invoice:
+    pass
+
+
+@pytest.mark.asyncio
+async def test_loads_issued_by_resumed_waiters_wait_for_the_running_batch():
+    tracker = {"in_flight": 0, "max_in_flight": 0}
+    students = FakeTable({number: f"student-{number}" for number in range(1, 10)}, tracker)
+    # Factura n -> estudiante n
+    invoices = FakeTable({number: number for number in range(1, 10)}, tracker)
+    loader = BatchLoader()
+
+    async def invoice_then_student(invoice_id):
+        student_id = await loader.load(Invoice, invoice_id, invoices.load_many)
+        return await loader.load(Student, student_id, students.load_many)
+
+    results = await asyncio.gather(
+        *(invoice_then_student(number) for number in (1, 2, 3)),
+        *(loader.load(Student, number, students.load_many) for number in (7, 8)),
+    )
+
+    assert results == ["student-1", "student-2", "student-3", "student-7", "student-8"]
+    assert tracker["max_in_flight"] == 1
+    assert invoices.batches == [[1, 2, 3]]
+    # Los estudiantes pedidos al despertar las facturas forman el lote siguiente
+    assert students.batches == [[7, 8], [1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_batch_fails_its_waiters_and_the_loader_keeps_working():
+    loader = BatchLoader()
+
+    async def broken(keys):
+        raise RuntimeError("database down")
+
+    async def working(keys):
+        return {key: key * 10 for key in keys}
+
+    results = await asyncio.gather(loader.load(Student, 1, broken), loader.load(Student, 2, broken),
+                                   return_exceptions=True)
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert await loader.load(Student, 3, working) == 30
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_max_batch_size():
+    loader = BatchLoader(max_batch_size=2)
+    batches = []
+
+    async def load_many(keys):
+        batches.append(keys)
+        return {key: key for key in keys}
+
+    assert await asyncio.gather(*(loader.load(Student, key, load_many) for key in range(5))) == [0, 1, 2, 3, 4]
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_gather_across_students_and_invoices_runs_one_statement_at_a_time(client, school_data, session):
+    in_flight = {"now": 0, "max": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        in_flight["now"] -= 1
+
+    student_repo = SQLAlchemyStudentRepository(session)
+    invoice_repo = SQLAlchemyInvoiceRepository(session)
+    invoice_ids = [invoice["id"] for invoice in school_data["invoices"][:6]]
+    other_students = [student["id"] for student in school_data["students"]]
+
+    async def invoice_then_student(invoice_id):
+        invoice = await invoice_repo.get_by_id(invoice_id)
+        return await student_repo.get_by_id(invoice.student_id)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        results = await asyncio.gather(
+            *(invoice_then_student(invoice_id) for invoice_id in invoice_ids),
+            *(student_repo.get_by_id(student_id) for student_id in other_students),
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(async_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    assert in_flight["max"] == 1
+    expected = [invoice["student_id"] for invoice in school_data["invoices"][:6]] + other_students
+    assert [student.id for student in results] == expected
@@ -0,0 +1,102 @@
+from datetime import date
+
+import pytest
+
+from app.api.etag import make_etag
+
+
+def list_urls(data):
+    school_id = data["school"]["id"]
+    invoice_id = data["invoices"][0]["id"]
+    student_id = data["invoices"][0]["student_id"]
+    return [
+        "/schools/", "/students/", f"/students/school/{school_id}",
+        "/invoices/", f"/invoices/student/{student_id}", f"/invoices/school/{school_id}",
+        "/invoices/status/PENDING", "/invoices/overdue/list",
+        "/payments/", f"/payments/invoice/{invoice_id}", f"/payments/student/{student_id}",
+    ]
+
+
+async def get_with_etag(client, url, etag):
+    return await client.get(url, headers={"If-None-Match": etag})
+
+
+@pytest.mark.asyncio
+async def test_unchanged_pages_answer_304_from_the_version_probe(client, school_data):
+    for url in list_urls(school_data):
+        first = await client.get(url)
+        assert first.status_code == 200, url
+        etag = first.headers["ETag"]
+
+        again = await get_with_etag(client, url, etag)
+        assert again.status_code == 304, url
+        assert again.headers["ETag"] == etag
+        assert again.content == b""
+
+        # Con un ETag viejo se sondea y se lee la página; sin If-None-Match no se sondea
+        stale = await get_with_etag(client, url, '"stale"')
+        assert stale.status_code == 200 and stale.headers["ETag"] == etag, url
+        assert int(again.headers["X-DB-Queries"]) < int(stale.headers["X-DB-Queries"]), url
+        assert int(first.headers["X-DB-Queries"]) == int(stale.headers["X-DB-Queries"]) - 1, url
+
+
+@pytest.mark.asyncio
+async def test_etag_is_the_same_on_200_and_304_and_depends_on_the_page(client, school_data):
+    first = await client.get("/invoices/?limit=5")
+    second_page = await client.get("/invoices/", params={"limit": 5, "cursor": first.headers["X-Next-Cursor"]})
+    assert first.headers["ETag"] != second_page.headers["ETag"]
+    assert (await client.get("/invoices/?limit=5")).headers["ETag"] == first.headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_a_payment_changes_the_invoice_page_version(client, school_data):
+    invoice = school_data["invoices"][2]
+    url = f"/invoices/student/{invoice['student_id']}"
+    etag = (await client.get(url)).headers["ETag"]
+
+    response = await client.post("/payments/", json={
+        "amount": "10.00", "payment_date": date.today().isoformat(),
+        "payment_method": "CASH", "invoice_id": invoice["id"],
+    })
+    assert response.status_code == 201, response.text
+
+    changed = await get_with_etag(client, url, etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["paid_amount"] == "10.00"
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_payment_changes_the_payments_page_version(client, school_data):
+    payment = school_data["payments"][0]
+    url = f"/payments/invoice/{payment['invoice_id']}"
+    etag = (await client.get(url)).headers["ETag"]
+
+    assert (await client.delete(f"/payments/{payment['id']}")).status_code in (200, 204)
+
+    changed = await get_with_etag(client, url, etag)
+    assert changed.status_code == 200
+    assert changed.json() == []
+
+
+@pytest.mark.asyncio
+async def test_a_row_leaving_the_page_changes_its_version(client, school_data):
+    # Dentro de la transacción de la prueba now() no avanza, así que el cambio se ve por las filas de la página
+    school_id = school_data["school"]["id"]
+    url = f"/students/school/{school_id}"
+    etag = (await client.get(url)).headers["ETag"]
+
+    student = school_data["students"][3]
+    response = await client.put(f"/students/{student['id']}", json={"is_active": False})
+    assert response.status_code == 200, response.text
+
+    changed = await get_with_etag(client, url, etag)
+    assert changed.status_code == 200
+    assert student["id"] not in [row["id"] for row in changed.json()]
+
+
+@pytest.mark.asyncio
+async def test_missing_parent_is_still_404_with_if_none_match(client, school_data):
+    # Un ETag de página vacía no convierte en 304 el listado de un estudiante que no existe
+    response = await get_with_etag(client, "/invoices/student/999999999", make_etag("invoices", date.today()))
+    assert response.status_code == 404
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import pytest
+
+from app.api.export import arrow_ipc_chunks
+from app.infrastructure.database.database import get_stream_db
+from main import app
+
+
+def test_export_module_does_not_need_pyarrow():
+    # Las exportaciones CSV/NDJSON de facturas y pagos importan este módulo
+    code = "import sys; sys.modules['pyarrow'] = None; import app.api.export"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.asyncio
+async def test_arrow_ipc_chunks_round_trip():
+    pa = pytest.importorskip("pyarrow")
+    schema = pa.schema([("id", pa.int64())])
+
+    async def batches():
+        for start in (0, 3):
+            yield pa.record_batch([pa.array(range(start, start + 3))], schema=schema)
+
+    body = b"".join([chunk async for chunk in arrow_ipc_chunks(schema, batches())])
+    assert pa.ipc.open_stream(body).read_all().column("id").to_pylist() == [0, 1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_exports_stream_from_their_own_session_and_close_it(client, school_data):
+    opened = []
+    open_session = app.dependency_overrides[get_stream_db]
+
+    async def tracked_stream_db():
+        session = await open_session()
+        opened.append(session)
+        return session
+
+    app.dependency_overrides[get_stream_db] = tracked_stream_db
+    school_id = school_data["school"]["id"]
+    response = await client.get("/invoices/export", params={"school_id": school_id})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,invoice_number")
+    assert len(lines) == 1 + len(school_data["invoices"]) + 1  # encabezado, facturación y la vencida
+
+    response = await client.get("/payments/export", params={"school_id": school_id, "format": "ndjson"})
+    assert len(response.text.splitlines()) == len(school_data["payments"])
+
+    response = await client.get("/payments/export", params={
+        "school_id": school_id, "date_from": "2026-02-01", "date_to": "2026-01-01",
+    })
+    assert response.status_code == 400
+    # La respuesta cierra cada sesión al terminar el cuerpo (o al rechazar el request)
+    assert len(opened) == 3
+    assert not any(session.in_transaction() for session in opened)
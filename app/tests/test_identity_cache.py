@@ -0,0 +1,19 @@
+from decimal import Decimal
+
+import pytest
+
+from app.infrastructure.repositories.invoice_repository import SQLAlchemyInvoiceRepository
+from app.infrastructure.repositories.payment_repository import SQLAlchemyPaymentRepository
+
+
+@pytest.mark.asyncio
+async def test_payment_writes_refresh_the_cached_invoice_paid_amount(client, school_data, session):
+    payment = school_data["payments"][0]
+    invoices, payments = SQLAlchemyInvoiceRepository(session), SQLAlchemyPaymentRepository(session)
+    assert (await invoices.get_by_id(payment["invoice_id"])).paid_amount == Decimal("40.00")
+
+    await payments.update(payment["id"], {"amount": Decimal("25.00")})
+    assert (await invoices.get_by_id(payment["invoice_id"])).paid_amount == Decimal("25.00")
+
+    await payments.delete(payment["id"])
+    assert (await invoices.get_by_id(payment["invoice_id"])).paid_amount == Decimal("0")
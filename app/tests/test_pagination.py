@@ -0,0 +1,84 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.domain.models.invoice import Invoice
+from app.domain.repositories.pagination import InvalidCursorError
+from app.infrastructure.repositories.invoice_repository import CREATED_KEY, DUE_DATE_KEY
+from app.infrastructure.repositories.pagination import cursor_signature, decode_cursor, encode_cursor
+
+AMOUNT_KEY = (Invoice.amount, Invoice.id)
+
+
+def test_cursor_round_trips_the_sort_key_values():
+    signature = cursor_signature("invoices", CREATED_KEY, descending=True)
+    created_at = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor([created_at, 42], signature), CREATED_KEY, signature) == [created_at, 42]
+
+    signature = cursor_signature("invoices:overdue", DUE_DATE_KEY)
+    assert decode_cursor(encode_cursor([date(2026, 3, 5), 7], signature), DUE_DATE_KEY, signature) == [date(2026, 3, 5), 7]
+
+    signature = cursor_signature("invoices:amount", AMOUNT_KEY)
+    assert decode_cursor(encode_cursor([Decimal("10.50"), 3], signature), AMOUNT_KEY, signature) == [Decimal("10.50"), 3]
+
+
+def test_signature_depends_on_scope_key_and_direction():
+    signatures = {
+        cursor_signature("invoices", CREATED_KEY, descending=True),
+        cursor_signature("invoices", CREATED_KEY, descending=False),
+        cursor_signature("invoices:student:1", CREATED_KEY, descending=True),
+        cursor_signature("invoices:student:2", CREATED_KEY, descending=True),
+        cursor_signature("invoices", DUE_DATE_KEY, descending=True),
+    }
+    assert len(signatures) == 5
+
+
+def test_cursor_from_another_listing_is_rejected():
+    cursor = encode_cursor([datetime(2026, 3, 1), 42], cursor_signature("invoices:student:1", CREATED_KEY, True))
+    with pytest.raises(InvalidCursorError, match="different listing"):
+        decode_cursor(cursor, CREATED_KEY, cursor_signature("invoices:school:1", CREATED_KEY, True))
+    with pytest.raises(InvalidCursorError, match="different listing"):
+        decode_cursor(cursor, CREATED_KEY, cursor_signature("invoices:student:1", CREATED_KEY, False))
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", "WzEsMl0", "eyJzIjoieCIsImsiOlsiYSIsMV19"])
+def test_malformed_cursors_are_rejected(cursor):
+    # Basura, {}, [1,2] (formato anterior sin firma) y valores que no respetan los tipos de la clave
+    signature = cursor_signature("x", CREATED_KEY)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, CREATED_KEY, signature)
+
+
+@pytest.mark.asyncio
+async def test_walking_a_listing_with_cursors_returns_every_row_once(client, school_data):
+    school_id = school_data["school"]["id"]
+    expected = [invoice["id"] for invoice in (await client.get(f"/invoices/school/{school_id}")).json()]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(f"/invoices/school/{school_id}", params=params)
+        assert response.status_code == 200, response.text
+        seen.extend(invoice["id"] for invoice in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_api_rejects_a_cursor_from_another_endpoint_or_filter(client, school_data):
+    school_id = school_data["school"]["id"]
+    student_id = school_data["students"][0]["id"]
+    response = await client.get(f"/students/school/{school_id}", params={"limit": 2})
+    cursor = response.headers["X-Next-Cursor"]
+
+    # Mismo endpoint y filtro: se acepta
+    assert (await client.get(f"/students/school/{school_id}", params={"cursor": cursor})).status_code == 200
+    other_school = (await client.post("/schools/", json={"name": "Otro colegio", "email": "otro@example.com"})).json()
+    for url in ("/students/", f"/students/school/{school_id}?active_only=false",
+                f"/students/school/{other_school['id']}", f"/invoices/student/{student_id}"):
+        response = await client.get(url, params={"cursor": cursor})
+        assert response.status_code == 400, url
+        assert "different listing" in response.json()["detail"]
@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.database.query_stats import (
+    QueryBudgetExceededError, install_query_stats, statement_shape, track_queries
+)
+from main import app
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    install_query_stats(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_statement_shape_ignores_parameter_values_and_list_lengths():
+    assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3)") == "SELECT * FROM t WHERE id IN (?)"
+    assert statement_shape("SELECT *\n  FROM t WHERE id = $1::INTEGER") == "SELECT * FROM t WHERE id = ?"
+    assert statement_shape("INSERT INTO t (a) VALUES (?), (?), (?)") == "INSERT INTO t (a) VALUES (?)"
+
+
+def test_track_queries_counts_and_reports_without_failing(engine):
+    with engine.connect() as connection, track_queries(budget=1, repeat_threshold=2) as stats:
+        for value in range(3):
+            connection.execute(text("SELECT :value"), {"value": value})
+    assert stats.count == 3
+    assert stats.over_budget()
+    assert stats.repeated() == [("SELECT ?", 3)]
+    assert len(stats.problems()) == 2
+
+
+def test_strict_mode_fails_on_the_statement_over_budget(engine):
+    with engine.connect() as connection, track_queries(budget=1, strict=True) as stats:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(QueryBudgetExceededError, match="exceed the budget of 1"):
+            connection.execute(text("SELECT 2"))
+    assert stats.count == 2
+
+
+def test_strict_mode_fails_on_repeated_statements(engine):
+    with engine.connect() as connection, track_queries(repeat_threshold=2, strict=True):
+        connection.execute(text("SELECT :value"), {"value": 1})
+        connection.execute(text("SELECT :value"), {"value": 2})
+        with pytest.raises(QueryBudgetExceededError, match="possible N\\+1"):
+            connection.execute(text("SELECT :value"), {"value": 3})
+
+
+def test_statements_outside_a_tracked_block_are_not_counted(engine):
+    with track_queries() as stats:
+        pass
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert stats.count == 0
+
+
+def budgeted_paths():
+    """Rutas que declaran ``query_budget(n)`` en sus dependencias"""
+    return {
+        route.path for route in app.routes
+        if any(dependency.dependency.__qualname__.startswith("query_budget.")
+               for dependency in getattr(route, "dependencies", []))
+    }
+
+
+def list_urls(data):
+    school_id = data["school"]["id"]
+    # El estudiante de la factura con pagos: así ningún listado queda vacío
+    invoice_id = data["invoices"][0]["id"]
+    student_id = data["invoices"][0]["student_id"]
+    return {
+        "/api/v1/schools/": "/schools/",
+        "/api/v1/schools/search/": "/schools/search/?name=colegio",
+        "/api/v1/students/": "/students/",
+        "/api/v1/students/school/{school_id}": f"/students/school/{school_id}",
+        "/api/v1/students/search/": "/students/search/?name=prueba",
+        "/api/v1/invoices/": "/invoices/",
+        "/api/v1/invoices/student/{student_id}": f"/invoices/student/{student_id}",
+        "/api/v1/invoices/school/{school_id}": f"/invoices/school/{school_id}",
+        "/api/v1/invoices/status/{status}": "/invoices/status/PENDING",
+        "/api/v1/invoices/overdue/list": "/invoices/overdue/list",
+        "/api/v1/payments/": "/payments/",
+        "/api/v1/payments/invoice/{invoice_id}": f"/payments/invoice/{invoice_id}",
+        "/api/v1/payments/student/{student_id}": f"/payments/student/{student_id}",
+        "/api/v1/account-statements/student/{student_id}": f"/account-statements/student/{student_id}",
+        "/api/v1/account-statements/school/{school_id}": f"/account-statements/school/{school_id}",
+    }
+
+
+@pytest.mark.asyncio
+async def test_every_budgeted_route_stays_within_its_budget_in_strict_mode(client, school_data):
+    urls = list_urls(school_data)
+    # Una ruta nueva con presupuesto tiene que agregarse aquí
+    assert set(urls) == budgeted_paths()
+    for url in urls.values():
+        # En modo estricto exceder el presupuesto o repetir una sentencia hace fallar el request
+        response = await client.get(url)
+        assert response.status_code == 200, f"{url}: {response.text}"
+        assert int(response.headers["X-DB-Queries"]) >= 1
+        assert response.json(), url
+
+
+@pytest.mark.asyncio
+async def test_list_routes_do_not_issue_one_query_per_row(client, school_data):
+    # Más filas que QUERY_REPEAT_THRESHOLD y la misma cantidad de sentencias que con una sola fila
+    full = await client.get("/invoices/")
+    single = await client.get("/invoices/?limit=1")
+    assert len(full.json()) > 10
+    assert full.headers["X-DB-Queries"] == single.headers["X-DB-Queries"]
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.domain.models.school import School
+from app.domain.services.snapshot_service import SnapshotService
+from app.infrastructure.repositories.snapshot_repository import SQLAlchemySnapshotRepository, copy_to_arrow
+
+
+@pytest.mark.asyncio
+async def test_multi_line_values_survive_small_csv_blocks(client, session):
+    address = "Calle 1\nEdificio \"Norte\", piso 2\r\nCiudad"
+    for number in range(20):
+        response = await client.post("/schools/", json={
+            "name": f"Snapshot {number}", "email": f"c{number}@example.com", "address": address,
+        })
+        assert response.status_code == 201, response.text
+
+    schema = SQLAlchemySnapshotRepository(session).get_schema("schools")
+    stmt = select(*School.__table__.columns).where(School.name.like("Snapshot %"))
+    # Bloques de pocas filas: varios valores con saltos de línea cruzan el borde de un bloque
+    batches = [batch async for batch in copy_to_arrow(session, stmt, schema, block_size=512)]
+
+    addresses = [value for batch in batches for value in batch.column("address").to_pylist()]
+    assert addresses == [address] * 20
+
+
+class FakeSnapshotRepository:
+    def __init__(self, now):
+        self.now = now
+
+    async def get_database_time(self):
+        return self.now
+
+    def get_schema(self, table):
+        return None
+
+    async def stream_changes(self, table, since=None, until=None):
+        return
+        yield
+
+
+class FakeSnapshotStore:
+    def __init__(self):
+        self.writes = []
+        self.watermark = None
+        self.last_full = None
+
+    def get_watermark(self, table):
+        return self.watermark
+
+    def get_last_full(self, table):
+        return self.last_full
+
+    async def write(self, table, schema, batches, since, until):
+        kind = "incremental" if since else "full"
+        self.writes.append(kind)
+        self.watermark = until
+        if kind == "full":
+            self.last_full = until
+        return {"table": table, "kind": kind}
+
+
+@pytest.mark.asyncio
+async def test_incremental_exports_are_rebased_on_a_full_export_periodically():
+    repo, store = FakeSnapshotRepository(datetime(2026, 1, 1, tzinfo=timezone.utc)), FakeSnapshotStore()
+    service = SnapshotService(repo, store, lag_seconds=0, full_every=timedelta(days=7))
+
+    for day in (0, 1, 6, 7, 8):
+        repo.now = datetime(2026, 1, 1 + day, tzinfo=timezone.utc)
+        await service.export_snapshots(["invoices"])
+    # Los borrados solo llegan con una base completa nueva
+    assert store.writes == ["full", "incremental", "incremental", "full", "incremental"]
@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from app.domain.repositories.student_lookup_index import StudentLookupEntry
+from app.infrastructure.config.settings import settings
+from app.infrastructure.repositories.student_lookup_index import InMemoryStudentLookupIndex
+
+
+@pytest.mark.asyncio
+async def test_startup_survives_a_failed_index_load(monkeypatch, caplog):
+    async def unavailable():
+        raise ConnectionRefusedError("database not ready")
+
+    monkeypatch.setattr(main, "reload_student_lookup_index", unavailable)
+    monkeypatch.setattr(settings, "STUDENT_LOOKUP_REFRESH_SECONDS", 0)
+    async with main.lifespan(main.app):
+        pass
+    assert "Student lookup index initial load failed" in caplog.text
+
+
+def student(id, first_name, school_id=1, is_active=True):
+    return SimpleNamespace(id=id, school_id=school_id, student_id=f"C{id:03d}",
+                           first_name=first_name, last_name="Prueba", is_active=is_active)
+
+
+def entry(id, first_name, school_id=1):
+    return StudentLookupEntry(id=id, school_id=school_id, student_id=f"C{id:03d}",
+                              first_name=first_name, last_name="Prueba")
+
+
+@pytest.mark.asyncio
+async def test_changes_made_during_a_reload_survive_the_swap():
+    index = InMemoryStudentLookupIndex()
+    index.replace_all([entry(1, "Ana"), entry(2, "Andrés")])
+    release = asyncio.Event()
+
+    async def load():
+        # Lectura de la base de datos hecha antes de los cambios de abajo
+        await release.wait()
+        return [entry(1, "Ana"), entry(2, "Andrés"), entry(3, "Antonia")]
+
+    reload = asyncio.ensure_future(index.reload(load))
+    await asyncio.sleep(0)
+    index.upsert(student(4, "Anselmo"))
+    index.remove(2)
+    index.upsert(student(1, "Beatriz"))
+    # Mientras tanto las búsquedas usan el índice anterior con los cambios ya aplicados
+    assert [found.id for found in index.search(1, "an")] == [4]
+    release.set()
+
+    assert await reload == 3
+    assert sorted(found.id for found in index.search(1, "an")) == [3, 4]
+    assert [found.id for found in index.search(1, "bea")] == [1]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_reload_keeps_the_current_index():
+    index = InMemoryStudentLookupIndex()
+    index.replace_all([entry(1, "Ana")])
+
+    async def load():
+        raise ConnectionRefusedError("database not ready")
+
+    with pytest.raises(ConnectionRefusedError):
+        await index.reload(load)
+    index.upsert(student(2, "Andrés"))
+    assert sorted(found.id for found in index.search(1, "an")) == [1, 2]
+    assert index._journals == []
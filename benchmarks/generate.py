@@ -0,0 +1,302 @@
+"""Generador de datos sintéticos a escala de producción, cargados con COPY.
+
+Crea colegios de tamaños muy desiguales (pocos colegios grandes y muchos
+chicos, distribución de Pareto), estudiantes con matrícula escalonada y
+facturas mensuales de colegiatura (más matrícula y, para parte de los
+estudiantes, transporte). Cada estudiante tiene un perfil de pago:
+
+- puntual: paga antes del vencimiento, a veces en dos cuotas;
+- atrasado: paga semanas después del vencimiento, o todavía debe;
+- moroso: la mayoría de sus facturas vencidas sigue impaga o con pagos
+  parciales (la cola de vencidas).
+
+Un 2 % de las facturas está anulada y algunos pagos parciales esperan
+confirmación. Los estados, ``paid_date`` y los montos pagados son coherentes
+con los pagos generados, y al final se recalculan ``student_balances`` y
+``school_balances`` como lo haría la aplicación.
+
+Las filas se generan en Python por lotes y se cargan con ``COPY`` binario
+(asyncpg), todo en una transacción: si algo falla no queda nada a medias.
+Los índices secundarios se eliminan antes de cargar y se recrean al final
+(construir un índice de una vez es mucho más rápido que mantenerlo fila por
+fila; los únicos se verifican al recrearlos). Por eso, y porque los ids se
+asignan aquí, las tablas quedan bloqueadas durante la carga; ``--keep-indexes``
+solo bloquea las escrituras. Uso (contra una base de desarrollo):
+
+    python -m benchmarks.generate --schools 2000 --students 1000000 --months 12
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories.school_balance_repository import SQLAlchemySchoolBalanceRepository
+from app.infrastructure.repositories.student_balance_repository import SQLAlchemyStudentBalanceRepository
+
+TABLES = {
+    "schools": ("id", "name", "email", "is_active", "created_at", "updated_at"),
+    "students": ("id", "first_name", "last_name", "email", "student_id", "enrollment_date", "birth_date",
+                 "is_active", "school_id", "created_at", "updated_at"),
+    "invoices": ("id", "invoice_number", "description", "amount", "issue_date", "due_date", "paid_date",
+                 "status", "invoice_type", "student_id", "created_at", "updated_at"),
+    "payments": ("id", "amount", "payment_date", "payment_method", "reference_number", "is_confirmed",
+                 "invoice_id", "created_at", "updated_at"),
+}
+
+# Índices que no respaldan una restricción (PK, FK): se pueden eliminar y recrear
+SECONDARY_INDEXES_SQL = """
+    SELECT pg_get_indexdef(i.indexrelid) AS definition, CAST(i.indexrelid AS regclass) AS name
+    FROM pg_index i
+    WHERE i.indrelid = ANY(CAST(:tables AS regclass[]))
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+"""
+
+FIRST_NAMES = [
+    "María", "José", "Ana", "Luis", "Sofía", "Andrés", "Lucía", "Mateo", "Valentina", "Sebastián",
+    "Camila", "Nicolás", "Isabella", "Martín", "Daniela", "Tomás", "Gabriela", "Joaquín", "Mariana", "Emilio",
+    "Renata", "Diego", "Fernanda", "Santiago", "Paula", "Alejandro", "Victoria", "Samuel", "Antonella", "Benjamín",
+]
+LAST_NAMES = [
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez", "Flores", "Acosta", "Benítez", "Medina",
+    "Herrera", "Suárez", "Aguirre", "Giménez", "Gutiérrez", "Pereyra", "Rojas", "Molina", "Castro", "Ortiz",
+]
+SCHOOL_NAMES = ["San José", "Santa María", "San Martín", "Belgrano", "Sarmiento", "Los Andes", "del Sol",
+                "Nuevo Horizonte", "San Agustín", "Santa Teresa", "Bilingüe", "Técnico", "del Valle"]
+METHODS = ("BANK_TRANSFER", "BANK_TRANSFER", "CREDIT_CARD", "DEBIT_CARD", "CASH", "CHECK")
+
+# Perfil de pago del estudiante: (peso, probabilidad de pagar una factura vencida, días de pago respecto del vencimiento)
+PROFILES = {
+    "punctual": (80, 1.0, (-10, 0)),
+    "late": (14, 0.85, (3, 45)),
+    "delinquent": (6, 0.25, (20, 120)),
+}
+CANCELLED_RATE = 0.02
+INSTALLMENTS_RATE = 0.15
+UNCONFIRMED_RATE = 0.05
+TRANSPORT_RATE = 0.25
+
+
+def money(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def month_start(day: date, months_back: int) -> date:
+    month = day.year * 12 + day.month - 1 - months_back
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def stamp(day: date, rng: random.Random) -> datetime:
+    """Instante del día (horario escolar, UTC) para created_at/updated_at"""
+    return datetime.combine(day, dt_time(8), tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(10 * 3600))
+
+
+class Generator:
+    def __init__(self, args, start_ids: Dict[str, int]):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.today = date.today()
+        self.next_id = dict(start_ids)
+        self.batch: Dict[str, List[tuple]] = {table: [] for table in TABLES}
+        self.counts: Dict[str, int] = {table: 0 for table in TABLES}
+
+    def _id(self, table: str) -> int:
+        value = self.next_id[table]
+        self.next_id[table] += 1
+        return value
+
+    def school_sizes(self) -> List[int]:
+        """Estudiantes por colegio: Pareto (pocos colegios concentran muchos estudiantes)"""
+        weights = [self.rng.paretovariate(1.2) for _ in range(self.args.schools)]
+        scale = (self.args.students - 5 * self.args.schools) / sum(weights)
+        sizes = [5 + int(weight * scale) for weight in weights]
+        sizes[sizes.index(max(sizes))] += self.args.students - sum(sizes)
+        return sizes
+
+    def school(self) -> tuple:
+        rng = self.rng
+        school_id = self._id("schools")
+        created = stamp(month_start(self.today, self.args.months + rng.randrange(24)), rng)
+        row = (school_id, f"Colegio {rng.choice(SCHOOL_NAMES)} {school_id}", f"school{school_id}@example.com",
+               rng.random() > 0.03, created, created)
+        self.batch["schools"].append(row)
+        # Colegiatura mensual del colegio, en múltiplos de 5
+        return school_id, rng.randrange(16, 120) * 500
+
+    def student(self, school_id: int, tuition: int) -> None:
+        rng = self.rng
+        student_id = self._id("students")
+        # Matrícula escalonada: la mitad desde el inicio del período, el resto después
+        months = self.args.months
+        enrolled_months_back = months - 1 if rng.random() < 0.5 else rng.randrange(months)
+        enrollment = month_start(self.today, enrolled_months_back)
+        active = rng.random() > 0.04
+        created = stamp(enrollment, rng)
+        self.batch["students"].append((
+            student_id, rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+            f"student{student_id}@example.com" if rng.random() < 0.3 else None,
+            f"GEN{student_id:09d}", enrollment,
+            enrollment - timedelta(days=rng.randrange(5 * 365, 17 * 365)),
+            active, school_id, created, created,
+        ))
+
+        profile = rng.choices(list(PROFILES), [weight for weight, _, _ in PROFILES.values()])[0]
+        self.invoice(student_id, "REGISTRATION", tuition * 3 // 2, enrollment, profile)
+        transport = rng.random() < TRANSPORT_RATE
+        for months_back in range(enrolled_months_back, -1, -1):
+            issue = month_start(self.today, months_back)
+            self.invoice(student_id, "TUITION", tuition, issue, profile)
+            if transport:
+                self.invoice(student_id, "TRANSPORT", 4000, issue, profile)
+
+    def invoice(self, student_id: int, invoice_type: str, cents: int, issue: date, profile: str) -> None:
+        rng = self.rng
+        invoice_id = self._id("invoices")
+        # Vencimiento a 30 días: las del mes en curso quedan pendientes
+        due = issue + timedelta(days=30)
+        amount = money(cents)
+        created = stamp(issue, rng)
+        updated = created
+        paid_date = None
+        _, pay_rate, (min_days, max_days) = PROFILES[profile]
+
+        if rng.random() < CANCELLED_RATE:
+            status = "CANCELLED"
+            updated = stamp(min(issue + timedelta(days=rng.randrange(1, 20)), self.today), rng)
+        else:
+            pay_day = due + timedelta(days=rng.randrange(min_days, max_days + 1))
+            if pay_day <= self.today and rng.random() < pay_rate:
+                # Pagada en una o dos cuotas; la última fija paid_date
+                installments = 2 if rng.random() < INSTALLMENTS_RATE else 1
+                first = cents // 2 if installments == 2 else cents
+                if installments == 2:
+                    self.payment(invoice_id, money(first), max(issue, pay_day - timedelta(days=rng.randrange(7, 30))))
+                self.payment(invoice_id, money(cents - first) if installments == 2 else amount, pay_day)
+                status, paid_date = "PAID", pay_day
+                updated = stamp(pay_day, rng)
+            else:
+                # Impaga (o con un pago parcial): vencida si ya pasó el vencimiento
+                status = "OVERDUE" if due < self.today else "PENDING"
+                partial_day = issue + timedelta(days=rng.randrange(0, 60))
+                if profile != "punctual" and partial_day <= self.today and rng.random() < 0.4:
+                    self.payment(invoice_id, money(cents * rng.randrange(20, 80) // 100), partial_day,
+                                 confirmed=rng.random() > UNCONFIRMED_RATE)
+                    updated = stamp(partial_day, rng)
+                if status == "OVERDUE":
+                    updated = max(updated, stamp(due + timedelta(days=1), rng))
+
+        self.batch["invoices"].append((
+            invoice_id, f"GEN-{issue:%Y%m%d}-{invoice_id:09d}", None, amount, issue, due, paid_date,
+            status, invoice_type, student_id, created, updated,
+        ))
+
+    def payment(self, invoice_id: int, amount: Decimal, day: date, confirmed: bool = True) -> None:
+        rng = self.rng
+        payment_id = self._id("payments")
+        method = rng.choice(METHODS)
+        created = stamp(day, rng)
+        self.batch["payments"].append((
+            payment_id, amount, day, method,
+            f"REF-{payment_id:010d}" if method != "CASH" else None,
+            confirmed, invoice_id, created, created,
+        ))
+
+
+async def copy_batches(driver_connection, generator: Generator) -> None:
+    # Orden de las llaves foráneas: colegios, estudiantes, facturas, pagos
+    for table, columns in TABLES.items():
+        rows = generator.batch[table]
+        if rows:
+            await driver_connection.copy_records_to_table(table, records=rows, columns=columns)
+            generator.counts[table] += len(rows)
+            generator.batch[table] = []
+
+
+async def run(args) -> None:
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            # Los ids se asignan aquí: nadie más puede escribir en estas tablas durante la carga
+            lock_mode = "SHARE ROW EXCLUSIVE" if args.keep_indexes else "ACCESS EXCLUSIVE"
+            await session.execute(text(f"LOCK TABLE {', '.join(TABLES)} IN {lock_mode} MODE"))
+            indexes = []
+            if not args.keep_indexes:
+                indexes = (await session.execute(text(SECONDARY_INDEXES_SQL), {"tables": list(TABLES)})).all()
+                for index in indexes:
+                    await session.execute(text(f"DROP INDEX {index.name}"))
+            start_ids = {
+                table: (await session.scalar(text(f"SELECT COALESCE(max(id), 0) + 1 FROM {table}")))
+                for table in TABLES
+            }
+            connection = await session.connection()
+            driver_connection = (await connection.get_raw_connection()).driver_connection
+
+            generator = Generator(args, start_ids)
+            sizes = generator.school_sizes()
+            print(f"Schools: largest {max(sizes)} students, median {sorted(sizes)[len(sizes) // 2]}, "
+                  f"smallest {min(sizes)}")
+            generated = 0
+            for size in sizes:
+                school_id, tuition = generator.school()
+                for _ in range(size):
+                    generator.student(school_id, tuition)
+                generated += size
+                if len(generator.batch["invoices"]) >= args.batch_size:
+                    await copy_batches(driver_connection, generator)
+                    elapsed = time.perf_counter() - started
+                    print(f"  {generated}/{args.students} students, {generator.counts['invoices']} invoices "
+                          f"({elapsed:.0f}s)")
+            await copy_batches(driver_connection, generator)
+
+            # Las secuencias deben continuar después de los ids generados
+            for table in TABLES:
+                await session.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                ))
+            loaded = time.perf_counter() - started
+            if indexes:
+                print(f"Rebuilding {len(indexes)} secondary indexes")
+                await session.execute(text("SET LOCAL maintenance_work_mem = '512MB'"))
+                for index in indexes:
+                    await session.execute(text(index.definition))
+            indexed = time.perf_counter() - started
+            print("Rebuilding student balances and school rollups")
+            await SQLAlchemyStudentBalanceRepository(session).rebuild()
+            await SQLAlchemySchoolBalanceRepository(session).refresh()
+            await session.commit()
+
+            for table in (*TABLES, "student_balances", "school_balances"):
+                await session.execute(text(f"ANALYZE {table}"))
+            await session.commit()
+
+        total = sum(generator.counts.values())
+        print(", ".join(f"{count} {table}" for table, count in generator.counts.items()))
+        print(f"Loaded {total} rows in {loaded:.0f}s ({total / loaded:,.0f} rows/s), indexed at {indexed:.0f}s; "
+              f"total with balances and ANALYZE {time.perf_counter() - started:.0f}s")
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--students", type=int, default=500_000, help="Total de estudiantes")
+    parser.add_argument("--months", type=int, default=12, help="Meses de facturación hacia atrás")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=200_000, help="Facturas por lote de COPY")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="Mantener los índices durante la carga (más lento, no bloquea lecturas)")
+    args = parser.parse_args()
+    if args.students < 5 * args.schools:
+        parser.error("--students must be at least 5 per school")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Consultas SQL por request en los listados de facturas.
+
+Compara el camino anterior (sumar ``Invoice.payments`` en Python, una carga
+perezosa por factura) con ``Invoice.paid_amount`` calculado en SQL.
+
+Uso (contra una base de desarrollo, crea y elimina su propio colegio):
+
+    python -m benchmarks.invoice_list_queries --invoices 1000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import httpx
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.domain.models import Invoice, Payment, PaymentMethod, School, Student
+from app.infrastructure.database.database import async_engine, sync_engine
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def seed(invoices: int) -> int:
+    with Session(sync_engine) as session:
+        school = School(name="Benchmark school")
+        session.add(school)
+        session.flush()
+        student = Student(
+            first_name="Bench", last_name="Mark", student_id=f"BENCH-{school.id}",
+            enrollment_date=date.today(), school_id=school.id,
+        )
+        session.add(student)
+        session.flush()
+        for i in range(invoices):
+            invoice = Invoice(
+                invoice_number=f"BENCH-{school.id}-{i:07d}", amount=Decimal("100.00"),
+                due_date=date.today() + timedelta(days=30), student_id=student.id,
+            )
+            invoice.payments = [
+                Payment(amount=Decimal("25.00"), payment_date=date.today(), payment_method=PaymentMethod.CASH)
+                for _ in range(i % 3)
+            ]
+            session.add(invoice)
+        session.commit()
+        return school.id
+
+
+def cleanup(school_id: int) -> None:
+    with Session(sync_engine) as session:
+        session.delete(session.get(School, school_id))
+        session.commit()
+
+
+def before(school_id: int, limit: int) -> tuple:
+    """Camino anterior: sumar los pagos recorriendo la relación"""
+    with Session(sync_engine) as session, QueryCounter(sync_engine) as counter:
+        started = time.perf_counter()
+        stmt = (
+            select(Invoice)
+            .join(Student)
+            .where(Student.school_id == school_id)
+            .order_by(Invoice.created_at.desc(), Invoice.id.desc())
+            .limit(limit)
+        )
+        invoices = session.execute(stmt).scalars().all()
+        for invoice in invoices:
+            sum(p.amount for p in invoice.payments if p.is_confirmed)
+        return counter.count, time.perf_counter() - started
+
+
+async def after(school_id: int, limit: int) -> tuple:
+    """Camino actual: request completo al endpoint de listado"""
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        with QueryCounter(async_engine.sync_engine) as counter:
+            started = time.perf_counter()
+            response = await client.get(f"/api/v1/invoices/school/{school_id}", params={"limit": limit})
+            response.raise_for_status()
+            return counter.count, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invoices", type=int, default=1000)
+    args = parser.parse_args()
+
+    school_id = seed(args.invoices)
+    try:
+        limit = min(args.invoices, 1000)
+        q_before, t_before = before(school_id, limit)
+        q_after, t_after = asyncio.run(after(school_id, limit))
+        print(f"{'path':<28}{'rows':>8}{'queries':>10}{'ms':>10}")
+        print(f"{'before (walk payments)':<28}{limit:>8}{q_before:>10}{t_before * 1000:>10.1f}")
+        print(f"{'after (SQL paid_amount)':<28}{limit:>8}{q_after:>10}{t_after * 1000:>10.1f}")
+    finally:
+        cleanup(school_id)
+
+
+if __name__ == "__main__":
+    main()
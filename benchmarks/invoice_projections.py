@@ -0,0 +1,146 @@
+"""Memoria y rendimiento de los listados de facturas: entidades ORM contra proyecciones.
+
+Compara el camino anterior de ``get_by_date_range`` (entidades ``Invoice`` con
+``selectinload(Invoice.student)``, registradas en el identity map de la
+sesión hasta que termina el request) con el actual (``InvoiceRow``: solo las
+columnas de la respuesta, en tuplas). Mide la memoria retenida por cada 1.000
+filas mientras la sesión sigue abierta y las filas por segundo recorriendo
+todas las páginas, con y sin serializar la respuesta.
+
+Uso (contra una base de desarrollo, crea y elimina su propio colegio):
+
+    python -m benchmarks.invoice_projections --invoices 50000 --page-size 1000
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from datetime import date
+
+from fastapi import Response
+from sqlalchemy import and_, select, text
+from sqlalchemy.orm import selectinload
+
+from app.api.schemas.invoice import InvoiceResponse
+from app.api.serialization import fast_json
+from app.domain.models import Invoice
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories import SQLAlchemyInvoiceRepository
+from app.infrastructure.repositories.invoice_repository import ISSUE_DATE_KEY
+from app.infrastructure.repositories.pagination import build_page, paginate
+
+SCHOOL_NAME = "Projection benchmark school"
+
+# Fechas de emisión en 2001: el rango del benchmark solo incluye las facturas sembradas
+DATE_FROM, DATE_TO = date(2001, 1, 1), date(2001, 12, 31)
+
+SEED_SQL = """
+    WITH school AS (
+        INSERT INTO schools (name) VALUES (:name) RETURNING id
+    ), students AS (
+        INSERT INTO students (first_name, last_name, student_id, enrollment_date, school_id)
+        SELECT 'Bench', 'Proyección ' || g, 'PROJ-' || school.id || '-' || g, CURRENT_DATE, school.id
+        FROM school, generate_series(1, 100) g
+        RETURNING id
+    ), numbered AS (
+        SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM students
+    )
+    INSERT INTO invoices (invoice_number, description, amount, issue_date, due_date, invoice_type, student_id)
+    SELECT 'PROJ-' || numbered.id || '-' || g,
+           CASE WHEN g % 2 = 0 THEN 'Cuota ' || g END,
+           100 + g % 50, DATE '2001-01-01' + g % 365, DATE '2001-01-01' + g % 365 + 30, 'TUITION', numbered.id
+    FROM generate_series(1, CAST(:invoices AS INTEGER)) g
+    JOIN numbered ON numbered.n = g % 100
+"""
+
+
+async def seed(invoices: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(SEED_SQL), {"name": SCHOOL_NAME, "invoices": invoices})
+        await session.commit()
+        await session.execute(text("ANALYZE invoices"))
+        await session.commit()
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM schools WHERE name = :name"), {"name": SCHOOL_NAME})
+        await session.commit()
+
+
+async def before(session, limit: int, cursor):
+    """Camino anterior: entidades con su estudiante"""
+    stmt = (
+        select(Invoice)
+        .options(selectinload(Invoice.student))
+        .where(and_(Invoice.issue_date >= DATE_FROM, Invoice.issue_date <= DATE_TO))
+    )
+    stmt = paginate(stmt, ISSUE_DATE_KEY, 0, limit, cursor, descending=True)
+    result = await session.execute(stmt)
+    return build_page(result.scalars().all(), ISSUE_DATE_KEY, limit)
+
+
+async def after(session, limit: int, cursor):
+    return await SQLAlchemyInvoiceRepository(session).get_by_date_range(DATE_FROM, DATE_TO, limit=limit, cursor=cursor)
+
+
+async def retained_memory(load, limit: int) -> tuple:
+    """Bytes retenidos (y pico) por una página mientras la sesión sigue abierta"""
+    async with AsyncSessionLocal() as session:
+        await load(session, limit, None)  # calentar conexión y caché de sentencias
+        session.expunge_all()
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        page = await load(session, limit, None)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows = len(page)
+        del page
+    return (current - baseline) / rows * 1000, (peak - baseline) / rows * 1000
+
+
+async def throughput(load, limit: int, serialize: bool) -> float:
+    """Filas por segundo recorriendo todas las páginas, una sesión por página (como un request)"""
+    rows, cursor = 0, None
+    started = time.perf_counter()
+    while True:
+        async with AsyncSessionLocal() as session:
+            page = await load(session, limit, cursor)
+            if serialize:
+                fast_json(Response(), InvoiceResponse, page)
+        rows += len(page)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    return rows / (time.perf_counter() - started)
+
+
+async def run(args) -> None:
+    await cleanup()
+    await seed(args.invoices)
+    try:
+        print(f"{'path':<12}{'KB/1000 rows':>14}{'peak KB':>10}{'rows/s':>10}{'rows/s+json':>13}")
+        for label, load in (("orm", before), ("projection", after)):
+            retained, peak = await retained_memory(load, args.page_size)
+            await throughput(load, args.page_size, serialize=False)  # calentar
+            rate = await throughput(load, args.page_size, serialize=False)
+            rate_json = await throughput(load, args.page_size, serialize=True)
+            print(f"{label:<12}{retained / 1024:>14.0f}{peak / 1024:>10.0f}{rate:>10.0f}{rate_json:>13.0f}")
+    finally:
+        await cleanup()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invoices", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Pruebas de carga reproducibles: datos sintéticos, cargas mixtas de lectura y
+escritura, reporte de latencias por endpoint y comparación con una línea base.
+
+    python -m benchmarks.load seed --schools 100 --students 1000 --invoices 24
+    python -m benchmarks.load run --duration 60 --output report.json --baseline baseline.json
+    python -m benchmarks.load compare report.json baseline.json
+    python -m benchmarks.load cleanup
+"""
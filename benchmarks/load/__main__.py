@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import sys
+
+from app.infrastructure.database.database import async_engine
+from benchmarks.load import __doc__ as usage
+from benchmarks.load import report as reports
+from benchmarks.load.seed import cleanup, seed
+from benchmarks.load.workload import run_workload
+
+# Parámetros que deben coincidir para que la comparación con la línea base tenga sentido
+COMPARABLE = ("target", "concurrency", "duration", "seed")
+
+
+async def _with_engine(coroutine) -> None:
+    try:
+        await coroutine
+    finally:
+        await async_engine.dispose()
+
+
+def _compare(report: dict, baseline_path: str, tolerance: float) -> int:
+    baseline = reports.load(baseline_path)
+    differing = [key for key in COMPARABLE if baseline["meta"].get(key) != report["meta"].get(key)]
+    if differing:
+        print(f"warning: baseline was recorded with different {', '.join(differing)}")
+    regressions = reports.compare(report, baseline, tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regressions against {baseline_path} "
+          f"(baseline commit {baseline['meta'].get('commit')}, tolerance {tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+def run(args) -> int:
+    config = {
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "seed": args.seed,
+    }
+    recorder, measured = asyncio.run(_run_workload(args))
+    report = reports.build_report(recorder, measured, config)
+    reports.print_report(report)
+    if args.output:
+        reports.save(report, args.output)
+        print(f"Report written to {args.output}")
+    if args.save_baseline:
+        reports.save(report, args.save_baseline)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.baseline:
+        return _compare(report, args.baseline, args.tolerance)
+    return 0
+
+
+async def _run_workload(args):
+    try:
+        return await run_workload(args.base_url, args.concurrency, args.duration, args.warmup, args.seed)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=usage.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=usage)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = subparsers.add_parser("seed", help="Sembrar colegios, estudiantes, facturas y pagos sintéticos")
+    seed_parser.add_argument("--schools", type=int, default=100)
+    seed_parser.add_argument("--students", type=int, default=1000, help="Estudiantes por colegio")
+    seed_parser.add_argument("--invoices", type=int, default=24, help="Facturas mensuales por estudiante")
+
+    subparsers.add_parser("cleanup", help="Eliminar los datos sembrados")
+
+    run_parser = subparsers.add_parser("run", help="Ejecutar la carga mixta y reportar latencias por endpoint")
+    run_parser.add_argument("--base-url", default=None,
+                            help="API por HTTP (p. ej. http://localhost:8000); por defecto, la app en este proceso")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Clientes concurrentes")
+    run_parser.add_argument("--duration", type=float, default=60, help="Segundos medidos")
+    run_parser.add_argument("--warmup", type=float, default=5, help="Segundos iniciales que no se miden")
+    run_parser.add_argument("--seed", type=int, default=42, help="Semilla de la secuencia de operaciones")
+    run_parser.add_argument("--output", default=None, help="Escribir el reporte JSON")
+    run_parser.add_argument("--save-baseline", default=None, help="Guardar el reporte como línea base")
+    run_parser.add_argument("--baseline", default=None, help="Comparar con esta línea base (sale con 1 si hay regresiones)")
+    run_parser.add_argument("--tolerance", type=float, default=0.2, help="Empeoramiento relativo tolerado")
+
+    compare_parser = subparsers.add_parser("compare", help="Comparar un reporte con una línea base")
+    compare_parser.add_argument("report")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--tolerance", type=float, default=0.2)
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        asyncio.run(_with_engine(seed(args.schools, args.students, args.invoices)))
+        return 0
+    if args.command == "cleanup":
+        asyncio.run(_with_engine(cleanup()))
+        return 0
+    if args.command == "run":
+        return run(args)
+    return _compare(reports.load(args.report), args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
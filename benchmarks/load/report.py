@@ -0,0 +1,112 @@
+"""Reporte JSON de latencias por endpoint y comparación con una línea base"""
+import json
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.load.workload import Recorder
+
+# Un endpoint empeora si su p95 crece más que la tolerancia relativa *y* más que
+# este mínimo absoluto: en endpoints de pocos ms el ruido supera cualquier porcentaje
+MIN_P95_DELTA_MS = 2.0
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    ms = sorted(latency * 1000 for latency in latencies)
+    if len(ms) == 1:
+        p50 = p95 = p99 = ms[0]
+    else:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    return {
+        "p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2),
+        "mean_ms": round(statistics.fmean(ms), 2), "max_ms": round(ms[-1], 2),
+    }
+
+
+def _is_error(status: str) -> bool:
+    # 4xx esperables (p. ej. pagar una factura ya pagada) no son errores del servidor
+    return not status.isdigit() or int(status) >= 500
+
+
+def _summary(latencies: List[float], statuses: Dict[str, int], duration: float) -> dict:
+    errors = sum(count for status, count in statuses.items() if _is_error(status))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4),
+        "rps": round(len(latencies) / duration, 2),
+        **_percentiles(latencies),
+        "status": dict(sorted(statuses.items())),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_report(recorder: Recorder, duration: float, config: dict) -> dict:
+    all_latencies = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    all_statuses: Dict[str, int] = {}
+    for counts in recorder.statuses.values():
+        for status, count in counts.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "measured_seconds": round(duration, 2),
+            **config,
+        },
+        "total": _summary(all_latencies, all_statuses, duration) if all_latencies else {},
+        "endpoints": {
+            endpoint: _summary(latencies, recorder.statuses[endpoint], duration)
+            for endpoint, latencies in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{'endpoint':<45}{'requests':>9}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for endpoint, row in [*report["endpoints"].items(), ("TOTAL", report["total"])]:
+        print(f"{endpoint:<45}{row['requests']:>9}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}"
+              f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['errors']:>8}")
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regresiones de ``report`` respecto de ``baseline`` (lista vacía si no hay)"""
+    regressions = []
+    rows = [*((endpoint, row) for endpoint, row in report["endpoints"].items()), ("TOTAL", report["total"])]
+    print(f"{'endpoint':<45}{'p95 base':>10}{'p95 now':>10}{'rps base':>10}{'rps now':>10}  result")
+    for endpoint, row in rows:
+        base = baseline["total"] if endpoint == "TOTAL" else baseline["endpoints"].get(endpoint)
+        if base is None:
+            print(f"{endpoint:<45}{'-':>10}{row['p95_ms']:>10.1f}{'-':>10}{row['rps']:>10.1f}  new")
+            continue
+        problems = []
+        if row["p95_ms"] > base["p95_ms"] * (1 + tolerance) and row["p95_ms"] - base["p95_ms"] > MIN_P95_DELTA_MS:
+            problems.append(f"p95 {base['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+        if row["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"throughput {base['rps']:.1f} -> {row['rps']:.1f} rps")
+        if row["error_rate"] > base["error_rate"] + 0.01:
+            problems.append(f"error rate {base['error_rate']:.2%} -> {row['error_rate']:.2%}")
+        print(f"{endpoint:<45}{base['p95_ms']:>10.1f}{row['p95_ms']:>10.1f}{base['rps']:>10.1f}{row['rps']:>10.1f}  "
+              f"{'REGRESSION' if problems else 'ok'}")
+        regressions.extend(f"{endpoint}: {problem}" for problem in problems)
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(report: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,97 @@
+"""Datos sintéticos para las pruebas de carga (colegios × estudiantes × facturas mensuales).
+
+Todo lo sembrado cuelga de colegios llamados ``Load school N``, así ``cleanup``
+lo elimina sin tocar el resto de la base. Las facturas son mensuales hacia
+atrás desde el mes actual: las de hace tres meses o más están pagadas, las
+recientes pendientes y una de cada cuatro de ellas con un pago parcial.
+"""
+import time
+from typing import List
+
+from sqlalchemy import text
+
+from app.infrastructure.database.database import AsyncSessionLocal
+from app.infrastructure.repositories.school_balance_repository import SQLAlchemySchoolBalanceRepository
+from app.infrastructure.repositories.student_balance_repository import SQLAlchemyStudentBalanceRepository
+from app.infrastructure.repositories.unit_of_work import SQLAlchemyUnitOfWork
+
+SCHOOL_PREFIX = "Load school "
+INVOICE_AMOUNT = 150
+
+SCHOOLS_SQL = """
+    INSERT INTO schools (name, is_active)
+    SELECT :prefix || g, true FROM generate_series(1, CAST(:schools AS INTEGER)) g
+    RETURNING id
+"""
+
+STUDENTS_SQL = """
+    INSERT INTO students (first_name, last_name, student_id, enrollment_date, school_id, is_active)
+    SELECT 'Load', 'Student ' || g, 'LOAD-' || s.id || '-' || g, DATE '2020-01-01', s.id, true
+    FROM schools s, generate_series(1, CAST(:students AS INTEGER)) g
+    WHERE s.id = ANY(:school_ids)
+"""
+
+# m = meses hacia atrás; vencimiento a los 10 días de la emisión
+INVOICES_SQL = """
+    INSERT INTO invoices (invoice_number, amount, issue_date, due_date, paid_date, status, invoice_type, student_id)
+    SELECT 'LOAD-' || st.id || '-' || m, :amount, d.issue_date, d.issue_date + 10,
+           CASE WHEN m >= 3 THEN d.issue_date + 5 END,
+           CAST(CASE WHEN m >= 3 THEN 'PAID' ELSE 'PENDING' END AS invoicestatus),
+           'TUITION', st.id
+    FROM students st
+    CROSS JOIN generate_series(0, CAST(:invoices AS INTEGER) - 1) m
+    CROSS JOIN LATERAL (
+        SELECT CAST(date_trunc('month', CURRENT_DATE) - make_interval(months => m) AS DATE) AS issue_date
+    ) d
+    WHERE st.school_id = ANY(:school_ids)
+"""
+
+PAYMENTS_SQL = """
+    INSERT INTO payments (amount, payment_date, payment_method, is_confirmed, invoice_id)
+    SELECT CASE WHEN i.status = 'PAID' THEN i.amount ELSE round(i.amount / 2, 2) END,
+           COALESCE(i.paid_date, CURRENT_DATE), 'BANK_TRANSFER', true, i.id
+    FROM invoices i
+    JOIN students st ON st.id = i.student_id
+    WHERE st.school_id = ANY(:school_ids) AND (i.status = 'PAID' OR i.id % 4 = 0)
+"""
+
+
+def _chunks(ids: List[int], size: int):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+async def seed(schools: int, students: int, invoices: int, chunk: int = 10) -> None:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(text(SCHOOLS_SQL), {"prefix": SCHOOL_PREFIX, "schools": schools})
+        school_ids = list(result.scalars())
+        await session.commit()
+
+        # Por grupos de colegios: transacciones acotadas y progreso visible
+        for done, school_chunk in enumerate(_chunks(school_ids, chunk), start=1):
+            params = {"school_ids": school_chunk, "students": students, "invoices": invoices, "amount": INVOICE_AMOUNT}
+            await session.execute(text(STUDENTS_SQL), params)
+            await session.execute(text(INVOICES_SQL), params)
+            await session.execute(text(PAYMENTS_SQL), params)
+            await session.commit()
+            print(f"  {min(done * chunk, len(school_ids))}/{len(school_ids)} schools "
+                  f"({time.perf_counter() - started:.0f}s)")
+
+        # Saldos y resúmenes los mantiene la aplicación: recalcularlos para lo sembrado
+        async with SQLAlchemyUnitOfWork(session):
+            await SQLAlchemyStudentBalanceRepository(session).rebuild()
+            await SQLAlchemySchoolBalanceRepository(session).refresh()
+        for table in ("schools", "students", "invoices", "payments", "student_balances", "school_balances"):
+            await session.execute(text(f"ANALYZE {table}"))
+        await session.commit()
+    print(f"Seeded {schools} schools x {students} students x {invoices} invoices "
+          f"in {time.perf_counter() - started:.0f}s")
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(text("DELETE FROM schools WHERE name LIKE :pattern"),
+                                       {"pattern": f"{SCHOOL_PREFIX}%"})
+        await session.commit()
+    print(f"Deleted {result.rowcount} load-test schools (and their students, invoices and payments)")
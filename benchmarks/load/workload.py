@@ -0,0 +1,151 @@
+"""Carga mixta de lecturas y escrituras contra la API, en proceso o por HTTP.
+
+Cada worker elige un escenario según su peso y con ids tomados de los datos
+sembrados, con un generador aleatorio con semilla fija (``--seed``): la misma
+configuración repite la misma secuencia de operaciones por worker. Las
+latencias se agrupan por plantilla de ruta (``GET /account-statements/student/{id}``).
+"""
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+
+from app.infrastructure.database.database import AsyncSessionLocal
+from benchmarks.load.seed import SCHOOL_PREFIX
+
+API = "/api/v1"
+SAMPLE_SIZE = 5000
+
+
+@dataclass
+class Targets:
+    """Ids de los datos sembrados sobre los que opera la carga"""
+    schools: List[int]
+    students: List[int]
+    pending_invoices: List[int]
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: int
+    method: str
+    route: str
+    # Devuelve (url, cuerpo JSON) para una operación
+    build: Callable[[random.Random, Targets], tuple]
+
+
+def _future_due_date() -> str:
+    return (date.today() + timedelta(days=30)).isoformat()
+
+
+SCENARIOS = [
+    Scenario("student_statement", 25, "GET", "/account-statements/student/{id}",
+             lambda rng, t: (f"/account-statements/student/{rng.choice(t.students)}", None)),
+    Scenario("school_statement", 10, "GET", "/account-statements/school/{id}",
+             lambda rng, t: (f"/account-statements/school/{rng.choice(t.schools)}", None)),
+    Scenario("student_invoices", 15, "GET", "/invoices/student/{id}",
+             lambda rng, t: (f"/invoices/student/{rng.choice(t.students)}", None)),
+    Scenario("school_invoices", 10, "GET", "/invoices/school/{id}",
+             lambda rng, t: (f"/invoices/school/{rng.choice(t.schools)}?limit=100", None)),
+    Scenario("student_payments", 10, "GET", "/payments/student/{id}",
+             lambda rng, t: (f"/payments/student/{rng.choice(t.students)}", None)),
+    Scenario("overdue_invoices", 5, "GET", "/invoices/overdue/list",
+             lambda rng, t: ("/invoices/overdue/list?limit=100", None)),
+    Scenario("create_payment", 15, "POST", "/payments/",
+             lambda rng, t: ("/payments/", {
+                 "amount": "1.00", "payment_date": date.today().isoformat(), "payment_method": "CASH",
+                 "invoice_id": rng.choice(t.pending_invoices)
+             })),
+    Scenario("create_invoice", 10, "POST", "/invoices/",
+             lambda rng, t: ("/invoices/", {
+                 "amount": "80.00", "due_date": _future_due_date(), "invoice_type": "EXTRA",
+                 "student_id": rng.choice(t.students)
+             })),
+]
+
+
+async def load_targets(seed: int) -> Targets:
+    """Muestra de ids de los colegios sembrados (``benchmarks.load seed``)"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("SELECT setseed(:seed)"), {"seed": (seed % 1000) / 1000})
+        schools = list((await session.execute(text(
+            "SELECT id FROM schools WHERE name LIKE :pattern ORDER BY id"
+        ), {"pattern": f"{SCHOOL_PREFIX}%"})).scalars())
+        if not schools:
+            raise SystemExit("No load-test data found: run `python -m benchmarks.load seed` first")
+        students = list((await session.execute(text(
+            "SELECT id FROM students WHERE school_id = ANY(:schools) ORDER BY random() LIMIT :n"
+        ), {"schools": schools, "n": SAMPLE_SIZE})).scalars())
+        invoices = list((await session.execute(text("""
+            SELECT i.id FROM invoices i JOIN students st ON st.id = i.student_id
+            WHERE st.school_id = ANY(:schools) AND i.status = 'PENDING'
+            ORDER BY random() LIMIT :n
+        """), {"schools": schools, "n": SAMPLE_SIZE})).scalars())
+    return Targets(sorted(schools), sorted(students), sorted(invoices))
+
+
+@asynccontextmanager
+async def api_client(base_url: Optional[str]):
+    """Cliente HTTP contra ``base_url``, o contra la app en este proceso (con su lifespan)"""
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            yield client
+        return
+    from main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=30) as client:
+            yield client
+
+
+class Recorder:
+    """Latencias (segundos) y códigos de estado por endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, status: str, elapsed: float) -> None:
+        self.latencies.setdefault(endpoint, []).append(elapsed)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+
+
+async def _worker(client: httpx.AsyncClient, targets: Targets, rng: random.Random,
+                  warmup_until: float, stop_at: float, recorder: Recorder) -> None:
+    weights = [scenario.weight for scenario in SCENARIOS]
+    while (now := time.perf_counter()) < stop_at:
+        scenario = rng.choices(SCENARIOS, weights)[0]
+        url, body = scenario.build(rng, targets)
+        started = time.perf_counter()
+        try:
+            response = await client.request(scenario.method, API + url, json=body)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - started
+        if now >= warmup_until:
+            recorder.record(f"{scenario.method} {scenario.route}", status, elapsed)
+
+
+async def run_workload(base_url: Optional[str], concurrency: int, duration: float,
+                       warmup: float, seed: int) -> tuple:
+    """Ejecutar la carga; devuelve el registro y la duración medida (sin el calentamiento)"""
+    targets = await load_targets(seed)
+    recorder = Recorder()
+    async with api_client(base_url) as client:
+        start = time.perf_counter()
+        warmup_until, stop_at = start + warmup, start + warmup + duration
+        await asyncio.gather(*(
+            _worker(client, targets, random.Random(seed + worker), warmup_until, stop_at, recorder)
+            for worker in range(concurrency)
+        ))
+        measured = time.perf_counter() - warmup_until
+    return recorder, measured
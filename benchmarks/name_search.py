@@ -0,0 +1,134 @@
+"""Latencia de la búsqueda de estudiantes por nombre según el tamaño de la tabla.
+
+Compara el camino anterior (tres ``ILIKE '%texto%'``, que recorren la tabla
+completa) con ``search_by_name`` sobre el índice GIN ``ix_students_search``,
+creciendo la tabla por etapas (por defecto 10 mil, 100 mil y 1 millón de
+estudiantes).
+
+Uso (contra una base de desarrollo, crea y elimina su propio colegio):
+
+    python -m benchmarks.name_search --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import func, or_, select, text
+
+from app.domain.models import Student
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories import SQLAlchemyStudentRepository
+
+SCHOOL_NAME = "Search benchmark school"
+FIRST_NAMES = [
+    "María", "José", "Ana", "Luis", "Sofía", "Andrés", "Lucía", "Mateo", "Valentina", "Sebastián",
+    "Camila", "Nicolás", "Isabella", "Martín", "Daniela", "Tomás", "Gabriela", "Joaquín", "Mariana", "Emilio",
+]
+SYLLABLES = ["al", "ber", "ca", "do", "fer", "gon", "her", "ja", "lo", "mar",
+             "nu", "ñez", "or", "pe", "qui", "ro", "sal", "ta", "ur", "zá"]
+
+# Apellidos de tres sílabas elegidas por hash (8000 combinaciones) y nombre independiente del apellido
+SEED_SQL = """
+    INSERT INTO students (first_name, last_name, student_id, enrollment_date, school_id)
+    SELECT n.first_names[1 + (h / 8000) % cardinality(n.first_names)],
+           initcap(n.syllables[1 + h % 20] || n.syllables[1 + (h / 20) % 20] || n.syllables[1 + (h / 400) % 20]),
+           'SEARCH-' || CAST(:school_id AS INTEGER) || '-' || g, CURRENT_DATE, :school_id
+    FROM (SELECT CAST(:first_names AS TEXT[]) AS first_names, CAST(:syllables AS TEXT[]) AS syllables) n,
+         generate_series(CAST(:start AS INTEGER), CAST(:stop AS INTEGER)) g,
+         abs(hashtext(g::text)) h
+"""
+
+# (etiqueta, texto buscado): nombre completo, apellido y el mismo apellido con otra grafía
+TERMS = [
+    ("full name", "María Gonzalo"),
+    ("last name", "Gonzalo"),
+    ("accents/case", "GONZÁLO"),
+]
+
+
+async def seed_school() -> int:
+    async with AsyncSessionLocal() as session:
+        school_id = await session.scalar(text("INSERT INTO schools (name) VALUES (:name) RETURNING id"),
+                                         {"name": SCHOOL_NAME})
+        await session.commit()
+        return school_id
+
+
+async def grow(school_id: int, start: int, stop: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(SEED_SQL), {
+            "first_names": FIRST_NAMES, "syllables": SYLLABLES,
+            "school_id": school_id, "start": start, "stop": stop,
+        })
+        await session.commit()
+        await session.execute(text("ANALYZE students"))
+        await session.commit()
+
+
+async def cleanup(school_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM schools WHERE id = :id"), {"id": school_id})
+        await session.commit()
+
+
+async def before(session, name: str, limit: int) -> int:
+    """Camino anterior: ILIKE sobre nombre, apellido y nombre completo"""
+    full_name = func.concat(Student.first_name, " ", Student.last_name)
+    stmt = (
+        select(Student)
+        .where(or_(
+            Student.first_name.ilike(f"%{name}%"),
+            Student.last_name.ilike(f"%{name}%"),
+            full_name.ilike(f"%{name}%"),
+        ))
+        .order_by(Student.first_name, Student.last_name, Student.id)
+        .limit(limit)
+    )
+    return len((await session.execute(stmt)).scalars().all())
+
+
+async def after(session, name: str, limit: int) -> int:
+    """Camino actual: búsqueda por relevancia del repositorio"""
+    return len(await SQLAlchemyStudentRepository(session).search_by_name(name, limit=limit))
+
+
+async def measure(search, name: str, limit: int, repeats: int) -> tuple:
+    timings = []
+    async with AsyncSessionLocal() as session:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            rows = await search(session, name, limit)
+            timings.append(time.perf_counter() - started)
+            session.expunge_all()
+    return rows, statistics.median(timings)
+
+
+async def run(args) -> None:
+    school_id = await seed_school()
+    try:
+        print(f"{'students':>10}  {'term':<14}{'rows':>6}{'before ms':>12}{'after ms':>12}")
+        seeded = 0
+        for size in sorted(args.sizes):
+            await grow(school_id, seeded + 1, size)
+            seeded = size
+            for label, name in TERMS:
+                _, t_before = await measure(before, name, args.limit, args.repeats)
+                rows, t_after = await measure(after, name, args.limit, args.repeats)
+                print(f"{size:>10}  {label:<14}{rows:>6}{t_before * 1000:>12.1f}{t_after * 1000:>12.1f}")
+    finally:
+        await cleanup(school_id)
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Pagos simultáneos contra una misma factura.
+
+Compara el camino anterior (leer el total pagado, validar e insertar sin
+bloqueo) con ``POST /api/v1/payments/``, que bloquea la fila de la factura y
+calcula el saldo restante en el mismo statement que inserta el pago.
+
+Uso (contra una base de desarrollo, crea y elimina su propio colegio):
+
+    python -m benchmarks.payment_concurrency --payments 200 --amount 10
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.domain.models import Invoice, Payment, PaymentMethod, School, Student
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine, sync_engine
+
+
+def seed(invoice_amount: Decimal) -> tuple:
+    with Session(sync_engine) as session:
+        school = School(name="Benchmark school")
+        session.add(school)
+        session.flush()
+        student = Student(
+            first_name="Bench", last_name="Mark", student_id=f"BENCH-{school.id}",
+            enrollment_date=date.today(), school_id=school.id,
+        )
+        session.add(student)
+        session.flush()
+        invoices = [
+            Invoice(amount=invoice_amount, due_date=date.today() + timedelta(days=30), student_id=student.id)
+            for _ in range(2)
+        ]
+        session.add_all(invoices)
+        session.commit()
+        return school.id, [invoice.id for invoice in invoices]
+
+
+def cleanup(school_id: int) -> None:
+    with Session(sync_engine) as session:
+        session.delete(session.get(School, school_id))
+        session.commit()
+
+
+def summary(invoice_id: int) -> tuple:
+    with Session(sync_engine) as session:
+        invoice = session.get(Invoice, invoice_id)
+        return invoice.paid_amount, invoice.status.value
+
+
+async def post_unlocked(invoice_id: int, amount: Decimal) -> bool:
+    """Camino anterior: validar el saldo con una lectura y luego insertar"""
+    async with AsyncSessionLocal() as session:
+        invoice_amount = await session.scalar(select(Invoice.amount).where(Invoice.id == invoice_id))
+        paid = await session.scalar(
+            select(func.coalesce(func.sum(Payment.amount), 0))
+            .where(Payment.invoice_id == invoice_id, Payment.is_confirmed == True)
+        )
+        if amount > invoice_amount - paid:
+            return False
+        session.add(Payment(
+            amount=amount, payment_date=date.today(), payment_method=PaymentMethod.CASH, invoice_id=invoice_id,
+        ))
+        await session.commit()
+        return True
+
+
+async def before(invoice_id: int, payments: int, amount: Decimal) -> tuple:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(post_unlocked(invoice_id, amount) for _ in range(payments)))
+    return sum(results), time.perf_counter() - started
+
+
+async def after(invoice_id: int, payments: int, amount: Decimal) -> tuple:
+    """Camino actual: requests simultáneos al endpoint de pagos"""
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        body = {
+            "amount": str(amount), "payment_date": date.today().isoformat(),
+            "payment_method": PaymentMethod.CASH.value, "invoice_id": invoice_id,
+        }
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/api/v1/payments/", json=body) for _ in range(payments)))
+        elapsed = time.perf_counter() - started
+
+    unexpected = [r for r in responses if r.status_code not in (201, 400)]
+    if unexpected:
+        raise RuntimeError(f"{len(unexpected)} unexpected responses, first: {unexpected[0].status_code} {unexpected[0].text}")
+    return sum(r.status_code == 201 for r in responses), elapsed
+
+
+async def run(invoice_ids: list, payments: int, amount: Decimal) -> tuple:
+    try:
+        return (
+            await before(invoice_ids[0], payments, amount),
+            await after(invoice_ids[1], payments, amount),
+        )
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payments", type=int, default=200)
+    parser.add_argument("--amount", type=Decimal, default=Decimal("10.00"))
+    parser.add_argument("--invoice-amount", type=Decimal, default=None,
+                        help="Monto de la factura (por defecto cubre la mitad de los pagos)")
+    args = parser.parse_args()
+
+    invoice_amount = args.invoice_amount or args.amount * (args.payments // 2)
+    school_id, invoice_ids = seed(invoice_amount)
+    try:
+        results = asyncio.run(run(invoice_ids, args.payments, args.amount))
+        print(f"invoice amount {invoice_amount}, {args.payments} simultaneous payments of {args.amount}")
+        print(f"{'path':<24}{'accepted':>10}{'paid':>12}{'status':>10}{'ms':>10}{'pay/s':>10}")
+        for label, invoice_id, (accepted, elapsed) in zip(
+            ["before (check, insert)", "after (row lock)"], invoice_ids, results
+        ):
+            paid, status = summary(invoice_id)
+            print(f"{label:<24}{accepted:>10}{paid:>12}{status:>10}{elapsed * 1000:>10.1f}{args.payments / elapsed:>10.0f}")
+    finally:
+        cleanup(school_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Verificar que las consultas de los repositorios usan índices.
+
+Carga un conjunto sintético grande, ejecuta cada método de los repositorios
+de ``app/infrastructure/repositories`` dentro de una transacción que se
+revierte y obtiene ``EXPLAIN`` de cada statement que emiten. Falla si algún
+plan hace ``Seq Scan`` sobre una tabla principal.
+
+Uso (contra una base de desarrollo, crea y elimina sus propios colegios):
+
+    python -m benchmarks.query_plans --schools 1000 --students 20 --invoices 5
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event, text
+
+from app.domain.models import InvoiceStatus, InvoiceType, Payment, PaymentMethod
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories import (
+    SQLAlchemyInvoiceRepository,
+    SQLAlchemyPaymentRepository,
+    SQLAlchemySchoolBalanceRepository,
+    SQLAlchemySchoolRepository,
+    SQLAlchemyStudentBalanceRepository,
+    SQLAlchemyStudentRepository,
+)
+
+SCHOOL_PREFIX = "Plan check school"
+CHECKED_TABLES = {"schools", "students", "invoices", "payments", "student_balances", "school_balances"}
+# Por debajo de este tamaño un Seq Scan es más barato que el índice y no se reporta
+SMALL_TABLE_PAGES = 100
+
+SEED_SQL = [
+    """
+    INSERT INTO schools (name, email)
+    SELECT :prefix || ' ' || g, 'plan-check-' || g || '@example.com'
+    FROM generate_series(1, :schools) g
+    """,
+    """
+    INSERT INTO students (first_name, last_name, student_id, enrollment_date, is_active, school_id)
+    SELECT 'Name' || (g % 997), 'Last' || (g % 991), 'PLAN-' || sc.id || '-' || g,
+           CURRENT_DATE - 365, g % 10 <> 0, sc.id
+    FROM schools sc, generate_series(1, :students) g
+    WHERE sc.name LIKE :prefix || '%'
+    """,
+    """
+    INSERT INTO invoices (amount, due_date, issue_date, status, invoice_type, student_id)
+    SELECT 100, CURRENT_DATE + (g * 30 - 60), CURRENT_DATE + (g * 30 - 90),
+           (ARRAY['PENDING', 'PAID', 'OVERDUE', 'CANCELLED'])[1 + (s.id + g) % 4]::invoicestatus,
+           'TUITION', s.id
+    FROM students s
+    JOIN schools sc ON sc.id = s.school_id AND sc.name LIKE :prefix || '%'
+    CROSS JOIN generate_series(1, :invoices) g
+    """,
+    """
+    INSERT INTO payments (amount, payment_date, payment_method, is_confirmed, invoice_id)
+    SELECT 50, i.issue_date + 5, (ARRAY['CASH', 'CREDIT_CARD', 'BANK_TRANSFER'])[1 + i.id % 3]::paymentmethod,
+           i.id % 7 <> 0, i.id
+    FROM invoices i
+    JOIN students s ON s.id = i.student_id
+    JOIN schools sc ON sc.id = s.school_id AND sc.name LIKE :prefix || '%'
+    """,
+]
+
+
+async def seed(schools: int, students: int, invoices: int) -> dict:
+    async with AsyncSessionLocal() as session:
+        params = {"prefix": SCHOOL_PREFIX, "schools": schools, "students": students, "invoices": invoices}
+        for sql in SEED_SQL:
+            await session.execute(text(sql), params)
+        await SQLAlchemyStudentBalanceRepository(session).rebuild()
+        await SQLAlchemySchoolBalanceRepository(session).refresh()
+        await session.commit()
+        for table in sorted(CHECKED_TABLES):
+            await session.execute(text(f"ANALYZE {table}"))
+        await session.commit()
+
+        # Ids de muestra para los parámetros de las consultas
+        row = (await session.execute(text("""
+            SELECT sc.id AS school_id, s.id AS student_id, i.id AS invoice_id, p.id AS payment_id,
+                   s.student_id AS student_code, i.invoice_number
+            FROM schools sc
+            JOIN students s ON s.school_id = sc.id
+            JOIN invoices i ON i.student_id = s.id
+            JOIN payments p ON p.invoice_id = i.id
+            WHERE sc.name LIKE :prefix || '%'
+            ORDER BY sc.id, s.id, i.id, p.id
+            LIMIT 1
+        """), {"prefix": SCHOOL_PREFIX})).one()
+        return dict(row._mapping)
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM schools WHERE name LIKE :prefix || '%'"), {"prefix": SCHOOL_PREFIX})
+        await session.commit()
+
+
+def cases(ids: dict) -> list:
+    """(etiqueta, llamada) por cada método de repositorio que consulta la base"""
+    today = date.today()
+    page = {"skip": 0, "limit": 100}
+    payment = Payment(
+        amount=Decimal("1.00"), payment_date=today, payment_method=PaymentMethod.CASH, invoice_id=ids["invoice_id"]
+    )
+    return [
+        ("school.get_by_id", lambda r: r.school.get_by_id(ids["school_id"])),
+        ("school.get_by_email", lambda r: r.school.get_by_email("plan-check-1@example.com")),
+        ("school.get_all", lambda r: r.school.get_all(**page)),
+        ("school.get_all_version", lambda r: r.school.get_all_version(**page)),
+        ("school.search_by_name", lambda r: r.school.search_by_name("check", **page)),
+        ("school.get_students_count", lambda r: r.school.get_students_count(ids["school_id"])),
+        ("school.update", lambda r: r.school.update(ids["school_id"], {"phone": "000"})),
+        ("student.get_by_id", lambda r: r.student.get_by_id(ids["student_id"])),
+        ("student.get_by_id (lote)", lambda r: asyncio.gather(
+            *(r.student.get_by_id(ids["student_id"] + offset) for offset in range(1, 51)))),
+        ("student.get_by_student_id", lambda r: r.student.get_by_student_id(ids["student_code"])),
+        ("student.get_by_email", lambda r: r.student.get_by_email("nobody@example.com")),
+        ("student.get_all", lambda r: r.student.get_all(**page)),
+        ("student.get_all_version", lambda r: r.student.get_all_version(**page)),
+        ("student.get_by_school", lambda r: r.student.get_by_school(ids["school_id"], **page)),
+        ("student.get_by_school_version", lambda r: r.student.get_by_school_version(ids["school_id"], **page)),
+        ("student.search_by_name", lambda r: r.student.search_by_name("name1", school_id=ids["school_id"], **page)),
+        ("student.update", lambda r: r.student.update(ids["student_id"], {"phone": "000"})),
+        ("invoice.get_by_id", lambda r: r.invoice.get_by_id(ids["invoice_id"])),
+        ("invoice.get_by_id (lote)", lambda r: asyncio.gather(
+            *(r.invoice.get_by_id(ids["invoice_id"] + offset) for offset in range(1, 51)))),
+        ("invoice.lock_for_payment", lambda r: r.invoice.lock_for_payment(ids["invoice_id"])),
+        ("invoice.get_by_invoice_number", lambda r: r.invoice.get_by_invoice_number(ids["invoice_number"])),
+        ("invoice.get_all", lambda r: r.invoice.get_all(**page)),
+        ("invoice.get_all_version", lambda r: r.invoice.get_all_version(**page)),
+        ("invoice.get_by_student", lambda r: r.invoice.get_by_student(ids["student_id"], **page)),
+        ("invoice.get_by_student_version", lambda r: r.invoice.get_by_student_version(ids["student_id"], **page)),
+        ("invoice.get_by_school", lambda r: r.invoice.get_by_school(ids["school_id"], **page)),
+        ("invoice.get_by_school_version", lambda r: r.invoice.get_by_school_version(ids["school_id"], **page)),
+        ("invoice.get_by_status", lambda r: r.invoice.get_by_status(InvoiceStatus.PAID, **page)),
+        ("invoice.get_by_status_version", lambda r: r.invoice.get_by_status_version(InvoiceStatus.PAID, **page)),
+        ("invoice.get_overdue_invoices", lambda r: r.invoice.get_overdue_invoices(**page)),
+        ("invoice.get_overdue_invoices_version", lambda r: r.invoice.get_overdue_invoices_version(**page)),
+        ("invoice.get_by_date_range", lambda r: r.invoice.get_by_date_range(today - timedelta(days=7), today, **page)),
+        ("invoice.mark_overdue", lambda r: r.invoice.mark_overdue(today, batch_size=1000)),
+        ("invoice.bill_school", lambda r: r.invoice.bill_school(
+            ids["school_id"], InvoiceType.TUITION, Decimal("1.00"), today, dry_run=True)),
+        ("invoice.update", lambda r: r.invoice.update(ids["invoice_id"], {"description": "plan check"})),
+        ("payment.get_by_id", lambda r: r.payment.get_by_id(ids["payment_id"])),
+        ("payment.get_all", lambda r: r.payment.get_all(**page)),
+        ("payment.get_all_version", lambda r: r.payment.get_all_version(**page)),
+        ("payment.get_by_invoice", lambda r: r.payment.get_by_invoice(ids["invoice_id"])),
+        ("payment.get_by_invoice_version", lambda r: r.payment.get_by_invoice_version(ids["invoice_id"])),
+        ("payment.get_by_student", lambda r: r.payment.get_by_student(ids["student_id"], **page)),
+        ("payment.get_by_student_version", lambda r: r.payment.get_by_student_version(ids["student_id"], **page)),
+        ("payment.get_by_date_range", lambda r: r.payment.get_by_date_range(today - timedelta(days=7), today, **page)),
+        ("payment.get_by_method", lambda r: r.payment.get_by_method(PaymentMethod.CHECK, **page)),
+        ("payment.get_total_by_invoice", lambda r: r.payment.get_total_by_invoice(ids["invoice_id"])),
+        ("payment.post", lambda r: r.payment.post(payment)),
+        ("payment.update", lambda r: r.payment.update(ids["payment_id"], {"notes": "plan check"})),
+        ("student_balance.apply", lambda r: r.student_balance.apply(ids["student_id"], Decimal("1.00"))),
+        ("student_balance.get_account_summary", lambda r: r.student_balance.get_account_summary(ids["student_id"])),
+        ("student_balance.get_statement_version", lambda r: r.student_balance.get_statement_version(ids["student_id"])),
+        ("school_balance.apply", lambda r: r.school_balance.apply(ids["school_id"], students_delta=1)),
+        ("school_balance.get_account_summary", lambda r: r.school_balance.get_account_summary(ids["school_id"])),
+        ("school_balance.get_statement_version", lambda r: r.school_balance.get_statement_version(ids["school_id"], 20)),
+        ("payment.delete", lambda r: r.payment.delete(ids["payment_id"])),
+        ("invoice.delete", lambda r: r.invoice.delete(ids["invoice_id"])),
+    ]
+
+
+class Repositories:
+    def __init__(self, session):
+        self.school = SQLAlchemySchoolRepository(session)
+        self.student = SQLAlchemyStudentRepository(session)
+        self.invoice = SQLAlchemyInvoiceRepository(session)
+        self.payment = SQLAlchemyPaymentRepository(session)
+        self.student_balance = SQLAlchemyStudentBalanceRepository(session)
+        self.school_balance = SQLAlchemySchoolBalanceRepository(session)
+
+
+class PlanCollector:
+    """Ejecuta EXPLAIN de cada statement justo antes de que se ejecute, con los mismos parámetros"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.plans = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            return
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchall()[0][0]
+        self.plans.append(json.loads(plan) if isinstance(plan, str) else plan)
+
+    def __enter__(self):
+        self.plans = []
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def seq_scans(node: dict) -> set:
+    found = set()
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in CHECKED_TABLES:
+        found.add(node["Relation Name"])
+    for child in node.get("Plans", []):
+        found |= seq_scans(child)
+    return found
+
+
+async def check(ids: dict) -> list:
+    results = []
+    async with AsyncSessionLocal() as session:
+        small_tables = set((await session.execute(
+            text("SELECT relname FROM pg_class WHERE relname = ANY(:tables) AND relpages < :pages"),
+            {"tables": sorted(CHECKED_TABLES), "pages": SMALL_TABLE_PAGES}
+        )).scalars())
+        repos = Repositories(session)
+        try:
+            for label, call in cases(ids):
+                with PlanCollector(async_engine.sync_engine) as collector:
+                    await call(repos)
+                    await session.flush()
+                tables = set()
+                for plan in collector.plans:
+                    tables |= seq_scans(plan[0]["Plan"])
+                results.append((label, len(collector.plans), sorted(tables - small_tables)))
+        finally:
+            await session.rollback()
+    return results
+
+
+async def run(args) -> int:
+    try:
+        ids = await seed(args.schools, args.students, args.invoices)
+        try:
+            results = await check(ids)
+        finally:
+            await cleanup()
+    finally:
+        await async_engine.dispose()
+
+    failures = 0
+    print(f"{'query':<40}{'stmts':>6}  result")
+    for label, statements, tables in results:
+        if not tables:
+            outcome = "index"
+        else:
+            outcome = f"SEQ SCAN on {', '.join(tables)}"
+            failures += 1
+        print(f"{label:<40}{statements:>6}  {outcome}")
+    print(f"{failures} queries with unexpected sequential scans")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schools", type=int, default=1000)
+    parser.add_argument("--students", type=int, default=20, help="Estudiantes por colegio")
+    parser.add_argument("--invoices", type=int, default=5, help="Facturas por estudiante")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
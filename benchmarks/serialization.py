@@ -0,0 +1,136 @@
+"""Costo de serializar listados de facturas y estados de cuenta.
+
+Compara el camino anterior de FastAPI (``response_model``: validar cada objeto
+ORM con Pydantic ``from_attributes``, convertir a tipos JSON y codificar con
+``json``; en los estados de cuenta, ``jsonable_encoder`` sobre el dict) con
+``fast_json`` (copiar los atributos a un dict y codificar con orjson), y
+verifica que los dos producen el mismo JSON que el esquema declarado.
+
+Uso (contra una base de desarrollo, crea y elimina su propio colegio):
+
+    python -m benchmarks.serialization --sizes 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+from sqlalchemy import text
+
+from app.api.dependencies.invoice_dependency import get_invoice_service
+from app.api.schemas.account_statement import StudentAccountStatement
+from app.api.schemas.invoice import InvoiceResponse
+from app.api.serialization import fast_json
+from app.infrastructure.database.database import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories import SQLAlchemyInvoiceRepository
+
+SCHOOL_NAME = "Serialization benchmark school"
+
+# Facturas variadas: vencidas y no vencidas, con y sin descripción, con 0 a 2 pagos
+SEED_SQL = """
+    WITH school AS (
+        INSERT INTO schools (name) VALUES (:name) RETURNING id
+    ), student AS (
+        INSERT INTO students (first_name, last_name, student_id, enrollment_date, school_id)
+        SELECT 'Bench', 'Serialización', 'SER-' || id, CURRENT_DATE, id FROM school
+        RETURNING id, school_id
+    ), invoices AS (
+        INSERT INTO invoices (invoice_number, description, amount, due_date, invoice_type, student_id)
+        SELECT 'SER-' || student.id || '-' || g,
+               CASE WHEN g % 2 = 0 THEN 'Cuota ' || g END,
+               100 + g % 50, CURRENT_DATE + (g % 60) - 30, 'TUITION', student.id
+        FROM student, generate_series(1, CAST(:invoices AS INTEGER)) g
+        RETURNING id
+    )
+    INSERT INTO payments (amount, payment_date, payment_method, invoice_id)
+    SELECT 25, CURRENT_DATE, 'CASH', invoices.id
+    FROM invoices, generate_series(1, 2) p
+    WHERE invoices.id % 3 >= p
+"""
+
+
+async def seed(invoices: int) -> tuple:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(SEED_SQL), {"name": SCHOOL_NAME, "invoices": invoices})
+        row = (await session.execute(text(
+            "SELECT s.id, st.id FROM schools s JOIN students st ON st.school_id = s.id WHERE s.name = :name"
+        ), {"name": SCHOOL_NAME})).one()
+        await session.commit()
+        return tuple(row)
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM schools WHERE name = :name"), {"name": SCHOOL_NAME})
+        await session.commit()
+
+
+async def before(field, content) -> bytes:
+    """Camino anterior: lo que hace FastAPI con el valor devuelto por la ruta"""
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def after(model, content) -> bytes:
+    return fast_json(Response(), model, content).body
+
+
+async def measure(serialize, repeats: int) -> tuple:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        body = await serialize()
+        timings.append(time.perf_counter() - started)
+    return body, statistics.median(timings)
+
+
+def report(label: str, t_before: float, t_after: float, same: bool) -> None:
+    print(f"{label:<22}{t_before * 1000:>12.1f}{t_after * 1000:>12.1f}{t_before / t_after:>9.1f}x  {'yes' if same else 'NO'}")
+
+
+async def run(args) -> None:
+    await cleanup()
+    _, student_id = await seed(max(args.sizes))
+    list_field = create_response_field(name="Response_list", type_=List[InvoiceResponse])
+    invoices_adapter = TypeAdapter(List[InvoiceResponse])
+    try:
+        print(f"{'response':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}  same JSON")
+        async with AsyncSessionLocal() as session:
+            repo = SQLAlchemyInvoiceRepository(session)
+            for size in sorted(args.sizes):
+                invoices = await repo.get_by_student(student_id, limit=size)
+                old, t_before = await measure(lambda: before(list_field, invoices), args.repeats)
+                new, t_after = await measure(lambda: after(InvoiceResponse, invoices), args.repeats)
+                expected = invoices_adapter.dump_json(invoices_adapter.validate_python(invoices, from_attributes=True))
+                report(f"{size} invoices", t_before, t_after, json.loads(old) == json.loads(new) == json.loads(expected))
+
+            # Estado de cuenta (50 facturas): antes sin response_model, con jsonable_encoder
+            service = await get_invoice_service(session)
+            statement = await service.build_student_account_statement(student_id)
+            _, t_before = await measure(lambda: before(None, statement), args.repeats)
+            new, t_after = await measure(lambda: after(StudentAccountStatement, statement), args.repeats)
+            expected = StudentAccountStatement.model_validate(
+                {**statement, "invoices": invoices_adapter.validate_python(statement["invoices"], from_attributes=True)}
+            ).model_dump_json()
+            report("student statement", t_before, t_after, json.loads(new) == json.loads(expected))
+    finally:
+        await cleanup()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
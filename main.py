@@ -1,10 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from app.api.routers import (
     school_router, student_router, invoice_router, 
-    payment_router, account_statement_router
+    payment_router, account_statement_router, snapshot_router
 )
+from app.api.dependencies import get_student_service
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.etag import ETAG_HEADER
+from app.api.query_stats import DB_QUERIES_HEADER, SERVER_TIMING_HEADER, QueryStatsMiddleware
+from app.api.metrics import MetricsMiddleware
+from app.api.routers.snapshot import SNAPSHOT_WATERMARK_HEADER
+from app.domain.repositories.pagination import InvalidCursorError
 from app.infrastructure.config.settings import settings
+from app.infrastructure.database.database import AsyncSessionLocal
+from app.infrastructure.metrics import CONTENT_TYPE, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+async def reload_student_lookup_index() -> None:
+    async with AsyncSessionLocal() as session:
+        service = await get_student_service(session)
+        count = await service.reload_lookup_index()
+    logger.info("Student lookup index loaded with %d students", count)
+
+async def refresh_student_lookup_index(interval: int) -> None:
+    # Incorpora cambios hechos por otros workers o procesos (CLI, migraciones)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reload_student_lookup_index()
+        except Exception:
+            logger.exception("Student lookup index refresh failed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await reload_student_lookup_index()
+    except Exception:
+        # La API arranca igual (las búsquedas devuelven vacío); el refresco periódico lo carga después
+        logger.exception("Student lookup index initial load failed")
+    refresher = None
+    if settings.STUDENT_LOOKUP_REFRESH_SECONDS > 0:
+        refresher = asyncio.create_task(refresh_student_lookup_index(settings.STUDENT_LOOKUP_REFRESH_SECONDS))
+    yield
+    if refresher:
+        refresher.cancel()
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -12,7 +57,8 @@ app = FastAPI(
     version=settings.VERSION,
     description="Sistema de gestión académica y facturación para colegios",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -22,20 +68,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, SNAPSHOT_WATERMARK_HEADER,
+                    DB_QUERIES_HEADER, SERVER_TIMING_HEADER],
 )
 
+# Sentencias SQL y tiempo de BD por request (cabeceras, log y presupuestos por ruta)
+app.add_middleware(QueryStatsMiddleware)
+
+# Latencia y requests en curso por ruta (el último agregado envuelve a los demás)
+app.add_middleware(MetricsMiddleware)
+
+# Cursor de paginación inválido
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 # Registrar routers
 app.include_router(school_router, prefix="/api/v1")
 app.include_router(student_router, prefix="/api/v1")
 app.include_router(invoice_router, prefix="/api/v1")
 app.include_router(payment_router, prefix="/api/v1")
 app.include_router(account_statement_router, prefix="/api/v1")
+app.include_router(snapshot_router, prefix="/api/v1")
 
 # Endpoint de salud
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": settings.VERSION}
 
+# Métricas en formato de texto de Prometheus (valores de este proceso)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # Endpoint raíz
 @app.get("/")
 async def root():